@@ -1,23 +1,143 @@
-
-from flask import Flask, render_template, request
+import io
+import os
+import time
+import contextlib
+from flask import Flask, Response, render_template, request, jsonify
 import numpy as np
+import pandas as pd
 from src.pipeline import predict_pipeline
-from src.pipeline.predict_pipeline import CustomData, get_data_as_dataframe
+from src.pipeline.predict_pipeline import CustomData, get_data_as_dataframe, get_data_as_dict
+from src.utils.logger import logging
+from src.utils.metrics import metrics
 
 app = Flask(__name__)
 
+# load + warm the newest model version before taking traffic (in the gunicorn master when preloading)
+predict_pipeline.registry.load_version()
+
+# SERVING_MODE=microbatch queues concurrent /predict calls into shared model calls (needs
+# several threads per worker, gunicorn.conf.py defaults GUNICORN_THREADS to 8 for it),
+# SERVING_MODE=table answers from the active model version's precomputed price table
+# (exact for tree ensembles; the model answers inputs whose categorical values were never
+# seen together in training), the registry loads the table together with the model
+SERVING_MODE = os.environ.get("SERVING_MODE", "direct")
+batcher = None
+
+_threads_pid = None
+
+def start_background_threads():
+    """
+    Starts the registry watcher, the metrics flusher and the micro-batcher worker for this process.
+    Threads don't survive fork, so gunicorn calls this again in post_fork.
+    """
+    global batcher, _threads_pid
+    if _threads_pid == os.getpid():
+        return
+    _threads_pid = os.getpid()
+
+    predict_pipeline.registry.start_watching(int(os.environ.get("MODEL_RELOAD_INTERVAL", 30)))
+    metrics.start_flushing(float(os.environ.get("METRICS_FLUSH_SECONDS", 1)))
+    if SERVING_MODE == "microbatch":
+        from src.pipeline.micro_batcher import MicroBatcher, MicroBatcherConfig
+        batcher_config = MicroBatcherConfig()
+        batcher = MicroBatcher(predict_pipeline.predict, batcher_config.max_batch_size, batcher_config.max_wait_us)
+
+# gunicorn.conf.py sets this when preloading, so the master doesn't run threads of its own
+if os.environ.get("DEFER_BACKGROUND_THREADS") != "1":
+    start_background_threads()
+
 @app.route('/', methods=['GET', "POST"])
 def home():
     return render_template('index.html')
 
 @app.route('/predict', methods=['GET', "POST"])
 def predict():
-    form = request.form
-    df = get_data_as_dataframe(CustomData(form))
-    
-    prediction = predict_pipeline.predict(df)[0]
+    request_start = time.perf_counter()
+    # tell the micro-batcher a request is coming, so a forming batch waits for it
+    with batcher.expect() if batcher else contextlib.nullcontext():
+        form = request.form
+        data = CustomData(form)
+        start = metrics.since("form_parsing", request_start)
+
+        price_table = predict_pipeline.registry.active.price_table
+        prediction = price_table.lookup(get_data_as_dict(data)) if price_table is not None else None
+        if prediction is None:
+            df = get_data_as_dataframe(data)
+            prediction = (batcher.predict(df) if batcher else predict_pipeline.predict(df))[0]
+            metrics.inc("predict_requests_total", path="model", mode=SERVING_MODE)
+        else:
+            metrics.inc("predict_requests_total", path="table", mode=SERVING_MODE)
+    start = time.perf_counter()
+
+    elapsed = start - request_start
+    logging.info(f"single-row predict: 1 row in {elapsed:.6f}s ({1 / elapsed:.2f} rows/sec)")
+
+    page = render_template('index.html', prediction=int(np.exp(prediction)))
+    end = metrics.since("template_rendering", start)
+    metrics.observe("total", end - request_start)
+
+    return page
+
+@app.route('/predict_batch', methods=["POST"])
+def predict_batch():
+    """
+    Accepts either a JSON list of records (or {"records": [...]}) or a CSV body /
+    uploaded file with the same fields as the form, and scores them in one call.
+    """
+    try:
+        if request.is_json:
+            payload = request.get_json()
+            records = payload.get("records", []) if isinstance(payload, dict) else payload
+            if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+                raise ValueError('JSON body must be a list of records or {"records": [...]}')
+        elif "file" in request.files:
+            records = pd.read_csv(request.files["file"])
+        else:
+            records = pd.read_csv(io.StringIO(request.get_data(as_text=True)))
+
+        preds, stats = predict_pipeline.predict_batch(records)
+    except (ValueError, KeyError, pd.errors.ParserError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    logging.info(f"batch predict: {stats['rows']} rows in {stats['seconds']}s ({stats['rows_per_sec']} rows/sec)")
+    metrics.observe("batch_total", stats["seconds"])
+    metrics.inc("predict_batch_rows_total", stats["rows"])
+
+    return jsonify({
+        "predictions": np.exp(preds).astype(int).tolist(),
+        **stats
+    })
+
+@app.route('/model', methods=['GET'])
+def model_status():
+    return jsonify(predict_pipeline.registry.status())
+
+@app.route('/model/reload', methods=["POST"])
+def model_reload():
+    version = request.args.get("version")
+    if version and not predict_pipeline.registry.has_version(version):
+        return jsonify({"error": f"Unknown model version {version!r}", **predict_pipeline.registry.status()}), 404
+    predict_pipeline.registry.load_version(version, background=True)
+    return jsonify({"loading": version or predict_pipeline.registry.latest_version(), **predict_pipeline.registry.status()}), 202
+
+def _prediction_cache_counters():
+    cache = predict_pipeline.prediction_cache.stats()
+    return {
+        "prediction_cache_hits_total": cache["hits"],
+        "prediction_cache_misses_total": cache["misses"],
+        "prediction_cache_evictions_total": cache["evictions"]
+    }
+
+metrics.add_collector(_prediction_cache_counters)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    # summed over every gunicorn worker when PROMETHEUS_MULTIPROC_DIR is set, this worker's only otherwise
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
-    return render_template('index.html', prediction=int(np.exp(prediction)))
+@app.route('/cache', methods=['GET'])
+def cache_status():
+    return jsonify(predict_pipeline.prediction_cache.stats())
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8080, )
\ No newline at end of file
@@ -0,0 +1,26 @@
+## gunicorn -c gunicorn.conf.py wsgi:app
+import os
+import multiprocessing
+
+bind = os.environ.get("BIND", "0.0.0.0:8080")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# micro-batching only helps when a worker handles several requests at once: with more
+# than one thread gunicorn runs gthread workers instead of sync ones
+threads = int(os.environ.get("GUNICORN_THREADS", 8 if os.environ.get("SERVING_MODE") == "microbatch" else 1))
+
+# import the app and load + warm the model once in the master; workers fork with
+# everything already in memory (shared copy-on-write) and are ready immediately
+preload_app = True
+os.environ.setdefault("DEFER_BACKGROUND_THREADS", "1")
+
+
+def on_starting(server):
+    # per-worker metric snapshots (PROMETHEUS_MULTIPROC_DIR) of a previous run would be summed in
+    from src.utils.metrics import metrics
+    metrics.clear_multiproc_dir()
+
+
+def post_fork(server, worker):
+    # threads started in the master are not carried over by fork
+    from wsgi import start_background_threads
+    start_background_threads()
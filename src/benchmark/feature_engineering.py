@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from src.components.data_cleaning import DataCleaning
+from src.components.feature_engg import FeatureEngineering
+
+
+@dataclass
+class FeatureEngineeringBenchmarkConfig:
+    data_path: str = os.path.join("notebook", "data", "laptop_data.csv")
+    n_rows: int = 10_000_000
+    # the row-wise reference is ~100x slower, it is timed on a smaller sample
+    reference_rows: int = 1_000_000
+    seed: int = 42
+
+
+def reference_feature_engineering(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    The former row-wise FeatureEngineering.feature_engineering, kept verbatim as the
+    ground truth for check_equivalence.
+    """
+    df["ips"] = df["ScreenResolution"].apply(lambda x: 1 if "IPS" in x else 0)
+    df["touch_screen"] = df["ScreenResolution"].apply(lambda x: 1 if "Touchscreen" in x else 0)
+
+    df[["x_res", "y_res"]] = df["ScreenResolution"].str.split("x", n=1, expand=True)
+    df['x_res'] = df['x_res'].str.replace(',', '').str.findall(r'(\d+\.?\d+)').apply(lambda x: x[0])
+    df['x_res'] = df['x_res'].astype('int')
+    df['y_res'] = df['y_res'].astype('int')
+    df['ppi'] = (((df['x_res']**2) + (df['y_res']**2))**0.5/df['Inches']).astype('float')
+
+    df['Cpu Name'] = df['Cpu'].apply(lambda x: " ".join(x.split()[0:3]))
+
+    def fetch_processor(text):
+        if text == 'Intel Core i7' or text == 'Intel Core i5' or text == 'Intel Core i3':
+            return text
+        else:
+            if text.split()[0] == 'Intel':
+                return 'Other Intel Processor'
+            else:
+                return 'AMD Processor'
+
+    df['Cpu brand'] = df['Cpu Name'].apply(fetch_processor)
+
+    ssd_match = df["Memory"].str.extract(r'(\d+)(GB|TB)\sSSD')
+    df["ssd"] = np.where(ssd_match[1] == "TB", ssd_match[0].astype(float) * 1024, ssd_match[0].astype(float))
+    hdd_match = df["Memory"].str.extract(r'(\d+(?:\.\d+)?)(GB|TB)\s(?:HDD|Hybrid)')
+    df["hdd"] = np.where(hdd_match[1] == "TB", hdd_match[0].astype(float) * 1024, hdd_match[0].astype(float))
+    flash_match = df["Memory"].str.extract(r'(\d+(?:\.\d+)?)(GB|TB)\sFlash')
+    df["flash"] = np.where(flash_match[1] == "TB", flash_match[0].astype(float) * 1024, flash_match[0].astype(float))
+
+    df.fillna(0, inplace=True)
+    df[['ssd', 'hdd', 'flash']] = df[['ssd', 'hdd', 'flash']].astype('int')
+
+    df["gpu_name"] = df["Gpu"].str.split(" ", n=1, expand=True)[0]
+    df = df[df['gpu_name'] != 'ARM'].copy()
+
+    def cat_os(inp):
+        if inp == 'Windows 10' or inp == 'Windows 7' or inp == 'Windows 10 S':
+            return 'Windows'
+        elif inp == 'macOS' or inp == 'Mac OS X':
+            return 'Mac'
+        else:
+            return 'Others/No OS/Linux'
+
+    df['os'] = df['OpSys'].apply(cat_os)
+
+    return df.drop(columns=["Gpu", "x_res", "y_res", "OpSys", "Inches", "ScreenResolution", 'Cpu', 'Cpu Name', "Memory"])
+
+
+def synthetic_frame(cleaned: pd.DataFrame, n_rows, seed=42) -> pd.DataFrame:
+    """
+    n_rows cleaned listings resampled from the real ones, with extra storage strings
+    covering the formats the real data barely has (decimal TB sizes, three devices).
+    """
+    rng = np.random.default_rng(seed)
+    df = cleaned.iloc[rng.integers(len(cleaned), size=n_rows)].reset_index(drop=True)
+
+    extra_memory = np.array(["1.5TB SSD", "2TB SSD +  1.0TB Hybrid", "128GB Flash Storage +  1TB HDD",
+                             "256GB SSD +  512GB SSD +  2TB HDD", "32GB Flash Storage", "1.0TB HDD +  1TB HDD"], dtype=object)
+    swap = rng.random(n_rows) < 0.05
+    df.loc[swap, "Memory"] = extra_memory[rng.integers(len(extra_memory), size=int(swap.sum()))]
+    return df
+
+
+def check_equivalence(df: pd.DataFrame):
+    """
+    Raises AssertionError unless the vectorized feature engineering matches the
+    row-wise reference exactly (values, dtypes, column order and index).
+    """
+    expected = reference_feature_engineering(df.copy())
+    actual = FeatureEngineering().feature_engineering(df.copy())
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+
+
+def _time(fn, df) -> float:
+    start = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - start
+
+
+def run_benchmark(config: FeatureEngineeringBenchmarkConfig = None) -> dict:
+    config = config or FeatureEngineeringBenchmarkConfig()
+    cleaned = DataCleaning().data_cleaning(pd.read_csv(config.data_path))
+
+    check_equivalence(cleaned)
+    reference_sample = synthetic_frame(cleaned, config.reference_rows, config.seed)
+    check_equivalence(reference_sample)
+
+    reference_seconds = _time(reference_feature_engineering, reference_sample)
+    vectorized_sample_seconds = _time(FeatureEngineering().feature_engineering, reference_sample)
+    del reference_sample
+
+    df = synthetic_frame(cleaned, config.n_rows, config.seed)
+    vectorized_seconds = _time(FeatureEngineering().feature_engineering, df)
+
+    return {
+        "equivalent": True,
+        "n_rows": config.n_rows,
+        "vectorized_seconds": round(vectorized_seconds, 3),
+        "vectorized_rows_per_sec": round(config.n_rows / vectorized_seconds),
+        "reference_rows": config.reference_rows,
+        "reference_seconds": round(reference_seconds, 3),
+        "vectorized_seconds_on_reference_rows": round(vectorized_sample_seconds, 3),
+        "speedup": round(reference_seconds / vectorized_sample_seconds, 1)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized vs row-wise feature engineering: equivalence and speed.")
+    parser.add_argument("--rows", type=int, default=FeatureEngineeringBenchmarkConfig.n_rows)
+    parser.add_argument("--reference-rows", type=int, default=FeatureEngineeringBenchmarkConfig.reference_rows)
+    args = parser.parse_args()
+
+    config = FeatureEngineeringBenchmarkConfig(n_rows=args.rows, reference_rows=args.reference_rows)
+    try:
+        print(json.dumps(run_benchmark(config), indent=2))
+    except AssertionError as e:
+        print(f"Vectorized feature engineering differs from the reference:\n{e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import urllib.error
+import urllib.parse
+import urllib.request
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.components.data_cleaning import DataCleaning
+from src.components.feature_engg import FeatureEngineering
+
+
+@dataclass
+class HttpLoadConfig:
+    data_path: str = os.path.join("notebook", "data", "laptop_data.csv")
+    servers: list = field(default_factory=lambda: ["flask", "gunicorn"])
+    gunicorn_workers: list = field(default_factory=lambda: [2, 4])
+    concurrency_levels: list = field(default_factory=lambda: [1, 8, 32])
+    requests_per_level: int = 500
+    startup_timeout: float = 60.0
+    request_timeout: float = 30.0
+    # PREDICTION_CACHE_SIZE of the server under test: every level replays the same listings,
+    # so with the LRU cache on the later levels would mostly measure cache hits
+    prediction_cache_size: int = 0
+
+
+def build_payloads(data_path) -> list:
+    """
+    Realistic /predict form payloads, one per listing in laptop_data.csv, derived with
+    the same cleaning and feature engineering as training.
+    """
+    raw = pd.read_csv(data_path)
+    df = FeatureEngineering().feature_engineering(DataCleaning().data_cleaning(raw.copy()))
+    resolution = raw.loc[df.index, "ScreenResolution"].str.extract(r'(\d+x\d+)')[0]
+
+    return [
+        {
+            "company": row["Company"],
+            "typename": row["TypeName"],
+            "ram": str(row["Ram"]),
+            "screen_size": str(raw.at[i, "Inches"]),
+            "resolution": resolution[i],
+            "cpu_brand": row["Cpu brand"],
+            "ssd": str(row["ssd"]),
+            "hdd": str(row["hdd"]),
+            "gpu_name": row["gpu_name"],
+            "os": row["os"]
+        }
+        for i, row in df.iterrows()
+    ]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, workers=1, env=None):
+    env = {**os.environ, "PYTHONPATH": os.getcwd(), **(env or {})}
+    if kind == "flask":
+        cmd = [sys.executable, "-c", f"from app import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    elif kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-w", str(workers),
+               "-b", f"127.0.0.1:{port}", "wsgi:app"]
+    else:
+        raise ValueError(f"Unknown server kind {kind!r}")
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_ready(base_url, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/model", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.2)
+    raise TimeoutError(f"Server at {base_url} not ready after {timeout}s")
+
+
+def run_level(base_url, payloads, concurrency, n_requests, timeout) -> dict:
+    """
+    Drives /predict with n_requests form posts from `concurrency` threads.
+    """
+    bodies = [urllib.parse.urlencode(payloads[i % len(payloads)]).encode() for i in range(n_requests)]
+    latencies, errors = [], 0
+
+    def _post(body):
+        start = time.perf_counter()
+        try:
+            request = urllib.request.Request(f"{base_url}/predict", data=body, method="POST")
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+                ok = response.status == 200
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for ok, latency in pool.map(_post, bodies):
+            if ok:
+                latencies.append(latency)
+            else:
+                errors += 1
+    elapsed = time.perf_counter() - start
+
+    # no successful request: no latency percentiles (None in the report, not NaN)
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        **{f"p{q}_ms": round(float(np.percentile(latencies_ms, q)), 3) if latencies else None for q in (50, 95, 99)}
+    }
+
+
+def run_benchmark(config: HttpLoadConfig = None, env=None) -> list:
+    config = config or HttpLoadConfig()
+    env = {"PREDICTION_CACHE_SIZE": str(config.prediction_cache_size), **(env or {})}
+    payloads = build_payloads(config.data_path)
+    targets = [(server, 1) for server in config.servers if server == "flask"] + \
+              [(server, w) for server in config.servers if server == "gunicorn" for w in config.gunicorn_workers]
+
+    results = []
+    for server, workers in targets:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = start_server(server, port, workers, env)
+        try:
+            wait_ready(base_url, config.startup_timeout)
+            # one untimed pass so per-worker warm-up doesn't land in the first level
+            run_level(base_url, payloads, max(config.concurrency_levels), 2 * workers, config.request_timeout)
+            for concurrency in config.concurrency_levels:
+                level = run_level(base_url, payloads, concurrency, config.requests_per_level, config.request_timeout)
+                results.append({"server": server, "workers": workers, **level})
+                print(json.dumps(results[-1]), file=sys.stderr)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    return results
+
+
+def compare_to_baseline(results, baseline, max_regression=0.2) -> list:
+    """
+    Returns the (server, workers, concurrency) levels whose p99 latency grew or throughput
+    dropped by more than max_regression relative to a previous report. A level where every
+    request failed (p99_ms None) always counts as a regression.
+    """
+    previous = {(r["server"], r["workers"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["server"], r["workers"], r["concurrency"]))
+        if r["p99_ms"] is None:
+            regressions.append({"server": r["server"], "workers": r["workers"], "concurrency": r["concurrency"],
+                                "errors": r["errors"], "requests": r["requests"]})
+            continue
+        if old is None or old["p99_ms"] is None:
+            continue
+        if r["p99_ms"] > old["p99_ms"] * (1 + max_regression) or r["throughput_rps"] < old["throughput_rps"] * (1 - max_regression):
+            regressions.append({"server": r["server"], "workers": r["workers"], "concurrency": r["concurrency"],
+                                "p99_ms": [old["p99_ms"], r["p99_ms"]],
+                                "throughput_rps": [old["throughput_rps"], r["throughput_rps"]]})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP load test of /predict under the Flask dev server and gunicorn.")
+    parser.add_argument("--servers", nargs="+", default=HttpLoadConfig().servers)
+    parser.add_argument("--workers", nargs="+", type=int, default=HttpLoadConfig().gunicorn_workers)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=HttpLoadConfig().concurrency_levels)
+    parser.add_argument("--requests", type=int, default=HttpLoadConfig.requests_per_level)
+    parser.add_argument("--serving-mode", default=None, help="SERVING_MODE passed to the server (direct, microbatch, table)")
+    parser.add_argument("--prediction-cache-size", type=int, default=HttpLoadConfig.prediction_cache_size,
+                        help="PREDICTION_CACHE_SIZE of the server (0, the default, measures inference rather than cache hits)")
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", default=None, help="previous JSON report; exit 1 on regressions beyond --max-regression")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    config = HttpLoadConfig(servers=args.servers, gunicorn_workers=args.workers,
+                            concurrency_levels=args.concurrency, requests_per_level=args.requests,
+                            prediction_cache_size=args.prediction_cache_size)
+    env = {"SERVING_MODE": args.serving_mode} if args.serving_mode else None
+    report = {"serving_mode": args.serving_mode or os.environ.get("SERVING_MODE", "direct"),
+              "prediction_cache_size": config.prediction_cache_size, "results": run_benchmark(config, env)}
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            report["regressions"] = compare_to_baseline(report["results"], json.load(file), args.max_regression)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    # a level where every request failed fails the run, with or without a baseline
+    if report.get("regressions") or any(r["p99_ms"] is None for r in report["results"]):
+        sys.exit(1)
@@ -0,0 +1,145 @@
+import os
+import json
+import shutil
+import tempfile
+import time
+import argparse
+import pandas as pd
+from dataclasses import dataclass
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.model_selection import cross_val_predict
+from sklearn.metrics import r2_score, mean_absolute_error
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler, OrdinalEncoder
+from sklearn.svm import SVR
+
+from src.utils.artifact_io import read_frame
+from src.utils.fit_cache import fit_cache
+from src.utils.model_selection_utils import FoldCache, default_cv, evaluate_pipeline, evaluate_candidates
+
+
+@dataclass
+class ModelSelectionBenchmarkConfig:
+    data_path: str = os.path.join("artifacts", "post_outlier_treatment.csv")
+
+
+def seeded_models() -> dict:
+    # the default candidates with fixed seeds, so two evaluations can be compared exactly
+    from xgboost import XGBRegressor
+
+    return {
+        "linear_regression": LinearRegression(),
+        "random_forest": RandomForestRegressor(random_state=42),
+        "gradient_boosting": GradientBoostingRegressor(random_state=42),
+        "svr": SVR(),
+        "xgboost": XGBRegressor(random_state=42)
+    }
+
+
+def preprocessors(X: pd.DataFrame) -> dict:
+    # the two preprocessors built by ModelSelection.initiate_model_selection
+    from category_encoders import TargetEncoder
+
+    cat_columns = [x for x in X.columns if X[x].dtype == 'object']
+    num_columns = [x for x in X.columns if X[x].dtype != 'object']
+    return {
+        "ordinal": ColumnTransformer([
+            ("cat_encode", OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1), cat_columns),
+            ("num_scale", StandardScaler(), num_columns)], remainder="passthrough"),
+        "target": ColumnTransformer([
+            ("cat_encode", TargetEncoder(), cat_columns),
+            ("num_scale", StandardScaler(), num_columns)], remainder="passthrough")
+    }
+
+
+def uncached_leaderboard(X, y) -> pd.DataFrame:
+    """
+    The former evaluation: cross_val_predict over Pipeline(preprocessor, model) per model.
+    """
+    results = []
+    for encoding, preprocessor in preprocessors(X).items():
+        for name, model in seeded_models().items():
+            pipeline = Pipeline(steps=[("preprocessor", preprocessor), ("model", model)])
+            y_pred = cross_val_predict(pipeline, X, y, cv=default_cv(), n_jobs=-1)
+            results.append((name, r2_score(y, y_pred), mean_absolute_error(y, y_pred), encoding))
+    return pd.DataFrame(results, columns=["Model", "R2", "MAE", "Encoding"])
+
+
+def cached_leaderboard(X, y, fold_cache: FoldCache) -> pd.DataFrame:
+    frames = []
+    for encoding, preprocessor in preprocessors(X).items():
+        results = evaluate_pipeline(preprocessor, X, y, fold_cache, models=seeded_models())
+        results["Encoding"] = encoding
+        frames.append(results)
+    return pd.concat(frames, ignore_index=True)
+
+
+def fit_cache_rerun(X, y, expected: pd.DataFrame) -> dict:
+    """
+    Cold and warm runs of the leaderboard against an empty on-disk fit cache: the warm
+    run must fit nothing and give the same leaderboard.
+    """
+    cache_dir = tempfile.mkdtemp(prefix="fit_cache_")
+    fit_cache.cache_dir, fit_cache.enabled, fit_cache.hits, fit_cache.misses = cache_dir, True, 0, 0
+    try:
+        seconds = []
+        for _ in range(2):
+            start = time.perf_counter()
+            leaderboard = cached_leaderboard(X, y, FoldCache(X, y))
+            seconds.append(time.perf_counter() - start)
+            pd.testing.assert_frame_equal(expected, leaderboard, check_exact=True)
+        cache_mb = sum(entry.stat().st_size for entry in os.scandir(cache_dir)) / 1024 / 1024
+        return {"cold_seconds": round(seconds[0], 2), "warm_seconds": round(seconds[1], 2),
+                "cache_mb": round(cache_mb, 1), **fit_cache.stats()}
+    finally:
+        fit_cache.enabled = False
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def run_benchmark(config: ModelSelectionBenchmarkConfig = None) -> dict:
+    config = config or ModelSelectionBenchmarkConfig()
+    df = read_frame(config.data_path)
+    X = df.drop(columns=['price', "weight"])
+    y = df['price']
+    # timings below are for fitting, the on-disk fit cache is measured on its own
+    fit_cache.enabled = False
+
+    start = time.perf_counter()
+    uncached = uncached_leaderboard(X, y)
+    uncached_seconds = time.perf_counter() - start
+
+    fold_cache = FoldCache(X, y)
+    start = time.perf_counter()
+    cached = cached_leaderboard(X, y, fold_cache)
+    cached_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(uncached, cached, check_exact=True)
+    n_models = len(seeded_models())
+
+    # same candidates, run concurrently on the core scheduler over the warm fold cache
+    start = time.perf_counter()
+    scheduled, scheduler = evaluate_candidates(preprocessors(X), X, y, fold_cache, models=seeded_models())
+    scheduled_seconds = time.perf_counter() - start
+    pd.testing.assert_frame_equal(cached, scheduled, check_exact=True)
+
+    return {
+        "leaderboard_identical": True,
+        "leaderboard": cached.sort_values("R2", ascending=False).to_dict(orient="records"),
+        "uncached_seconds": round(uncached_seconds, 2),
+        "cached_seconds": round(cached_seconds, 2),
+        "scheduled_seconds": round(scheduled_seconds, 2),
+        "scheduler": {"summary": scheduler.summary, "candidates": scheduler.report},
+        "preprocessor_fits_uncached": len(fold_cache.splits) * n_models * 2,
+        **fold_cache.stats(),
+        "fit_cache": fit_cache_rerun(X, y, cached)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Model selection leaderboard with and without the fold cache.")
+    parser.add_argument("--data-path", default=ModelSelectionBenchmarkConfig.data_path)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(ModelSelectionBenchmarkConfig(data_path=args.data_path)), indent=2))
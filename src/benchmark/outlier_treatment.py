@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from src.utils.artifact_io import read_frame
+from src.utils.quantile_sketch import KLLSketch
+from src.components.outlier_treatment import OutlierTreatment, _sketch
+
+
+@dataclass
+class OutlierBenchmarkConfig:
+    data_path: str = os.path.join("artifacts", "post_feature_selection.csv")
+    n_rows: int = 10_000_000
+    chunk_size: int = 100_000
+    sketch_sizes: list = field(default_factory=lambda: [100, 200, 500, 1000, 2000, 5000])
+    parallel_parts: int = 8
+    seed: int = 42
+
+
+def synthetic_prices(data_path, n_rows, seed=42) -> np.ndarray:
+    """
+    n_rows integer prices resampled from the real ones with +-10% noise, so the
+    column has many distinct values like a long listing history would.
+    """
+    real = OutlierTreatment.prepare(read_frame(data_path))["price"].to_numpy()
+    rng = np.random.default_rng(seed)
+    return (real[rng.integers(len(real), size=n_rows)] * rng.uniform(0.9, 1.1, size=n_rows)).astype(int)
+
+
+def _accuracy(estimate, sorted_prices, exact_bounds) -> dict:
+    # rank error of each quartile, and rows the approximate bounds keep / drop differently
+    q1, q3 = estimate
+    n = len(sorted_prices)
+    lower, upper = OutlierTreatment.iqr_bounds(q1, q3)
+    misclassified = sum(
+        abs(int(np.searchsorted(sorted_prices, exact, side="left")) - int(np.searchsorted(sorted_prices, approx, side="left")))
+        for exact, approx in zip(exact_bounds, (lower, upper))
+    )
+    return {
+        "q1": round(q1, 2),
+        "q3": round(q3, 2),
+        "q1_rank_error": round(abs(np.searchsorted(sorted_prices, q1) / n - 0.25), 6),
+        "q3_rank_error": round(abs(np.searchsorted(sorted_prices, q3) / n - 0.75), 6),
+        "rows_misclassified": misclassified
+    }
+
+
+def run_benchmark(config: OutlierBenchmarkConfig = None) -> dict:
+    config = config or OutlierBenchmarkConfig()
+    prices = synthetic_prices(config.data_path, config.n_rows, config.seed)
+
+    # exact method: the full column materialized and sorted
+    start = time.perf_counter()
+    sorted_prices = np.sort(prices)
+    exact = np.quantile(sorted_prices, [0.25, 0.75])
+    exact_seconds = time.perf_counter() - start
+    exact_bounds = OutlierTreatment.iqr_bounds(*exact)
+
+    report = {
+        "n_rows": config.n_rows,
+        "exact": {"q1": float(exact[0]), "q3": float(exact[1]), "seconds": round(exact_seconds, 2),
+                  "memory_kb": round(prices.astype(np.float64).nbytes / 1024)},
+        "sketches": []
+    }
+
+    chunks = [prices[i:i + config.chunk_size] for i in range(0, len(prices), config.chunk_size)]
+    for k in config.sketch_sizes:
+        start = time.perf_counter()
+        sketch = KLLSketch(k)
+        for chunk in chunks:
+            sketch.update(chunk)
+        seconds = time.perf_counter() - start
+        report["sketches"].append({
+            "k": k, "retained": sketch.retained, "memory_kb": round(sketch.nbytes / 1024, 1),
+            "seconds": round(seconds, 2), **_accuracy(sketch.quantile([0.25, 0.75]), sorted_prices, exact_bounds)
+        })
+
+    # the default sketch size, built per part in worker processes and merged
+    k = OutlierTreatment().outlier_treatment_config.sketch_k
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(config.parallel_parts, os.cpu_count() or 1)) as pool:
+        parts = list(pool.map(_sketch, np.array_split(prices, config.parallel_parts), [k] * config.parallel_parts,
+                              range(config.parallel_parts)))
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    report["merged"] = {
+        "k": k, "parts": config.parallel_parts, "retained": merged.retained, "seconds": round(time.perf_counter() - start, 2),
+        **_accuracy(merged.quantile([0.25, 0.75]), sorted_prices, exact_bounds)
+    }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantile sketch vs exact IQR bounds: accuracy against memory.")
+    parser.add_argument("--data-path", default=OutlierBenchmarkConfig.data_path)
+    parser.add_argument("--rows", type=int, default=OutlierBenchmarkConfig.n_rows)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(OutlierBenchmarkConfig(data_path=args.data_path, n_rows=args.rows)), indent=2))
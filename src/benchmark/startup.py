@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+from dataclasses import dataclass, field
+
+
+# modules that only the training pipeline needs; none of them may be imported by a serving worker
+def _default_forbidden():
+    return [
+        "shap", "matplotlib", "seaborn",
+        "src.components",
+        "src.utils.feature_selection_utils",
+        "src.utils.model_selection_utils",
+        "src.utils.hyper_para_tuning_utils",
+    ]
+
+
+@dataclass
+class StartupBenchmarkConfig:
+    entry_module: str = "wsgi"
+    forbidden_modules: list = field(default_factory=_default_forbidden)
+    # wall-clock budget for import + model load + warm-up, in seconds
+    max_ready_seconds: float = 5.0
+    top_n: int = 15
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parses `python -X importtime` output into [(module, self_us, cumulative_us)].
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure_startup(config: StartupBenchmarkConfig = None) -> dict:
+    """
+    Imports the serving entry point in a fresh interpreter with -X importtime and
+    reports time-to-ready, the heaviest imports and any training-only module that leaked in.
+    """
+    config = config or StartupBenchmarkConfig()
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {config.entry_module}; "
+        "print(time.perf_counter() - start)"
+    )
+    env = {**os.environ, "DEFER_BACKGROUND_THREADS": "1", "PYTHONPATH": os.getcwd()}
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, env=env, check=True)
+
+    modules = parse_importtime(result.stderr)
+    ready_seconds = float(result.stdout.strip().splitlines()[-1])
+    leaked = sorted({
+        name for name, _, _ in modules
+        if any(name == f or name.startswith(f + ".") for f in config.forbidden_modules)
+    })
+
+    return {
+        "entry_module": config.entry_module,
+        "ready_seconds": round(ready_seconds, 4),
+        "max_ready_seconds": config.max_ready_seconds,
+        "modules_imported": len(modules),
+        "top_self_us": [
+            {"module": name, "self_us": self_us, "cumulative_us": cumulative_us}
+            for name, self_us, cumulative_us in sorted(modules, key=lambda m: m[1], reverse=True)[:config.top_n]
+        ],
+        "forbidden_imported": leaked,
+        "ok": not leaked and ready_seconds <= config.max_ready_seconds
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure serving worker startup (import + model warm-up).")
+    parser.add_argument("--entry-module", default=StartupBenchmarkConfig.entry_module)
+    parser.add_argument("--max-ready-seconds", type=float, default=StartupBenchmarkConfig.max_ready_seconds)
+    args = parser.parse_args()
+
+    report = measure_startup(StartupBenchmarkConfig(entry_module=args.entry_module, max_ready_seconds=args.max_ready_seconds))
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
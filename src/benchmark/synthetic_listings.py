@@ -0,0 +1,93 @@
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+
+@dataclass
+class SyntheticListingsConfig:
+    source_data_path: str = os.path.join("notebook", "data", "laptop_data.csv")
+    output_path: str = os.path.join("artifacts", "benchmarks", "synthetic_listings.csv")
+    n_rows: int = 1_000_000
+    # rows generated and appended at a time, bounds memory for 10M+ rows
+    chunk_size: int = 1_000_000
+    # probability that a column is swapped for the value of another listing of the same type
+    mix: float = 0.25
+    seed: int = 42
+
+
+# columns swapped between listings of the same TypeName; Company and TypeName stay with the template
+MIXED_COLUMNS = ["Inches", "ScreenResolution", "Cpu", "Ram", "Memory", "Gpu", "OpSys"]
+
+
+class ListingGenerator:
+    """
+    Raw listings in the exact formats of laptop_data.csv ("8GB", "1.37kg",
+    "128GB SSD +  1TB HDD", "IPS Panel Retina Display 2560x1600", ...).
+
+    Every synthetic listing starts from a real one (so brand / type / spec combinations
+    follow the real joint distribution), then each spec column is swapped with
+    probability `mix` for the value of a random real listing of the same TypeName.
+    The price follows: each swapped value moves the log price by half the difference of
+    the mean log prices of the two values, plus ~8% lognormal noise; weight gets +-5%.
+    """
+
+    def __init__(self, source_data_path=SyntheticListingsConfig.source_data_path, mix=SyntheticListingsConfig.mix):
+        real = pd.read_csv(source_data_path).drop(columns=["Unnamed: 0"])
+        # rows grouped by TypeName, so a same-type donor is an offset into its group
+        self.real = real.sort_values("TypeName", kind="stable").reset_index(drop=True)
+        self.mix = mix
+        types = self.real["TypeName"].to_numpy()
+        _, self.group_start, self.group_size = np.unique(types, return_index=True, return_counts=True)
+        self.group_of_row = np.searchsorted(self.group_start, np.arange(len(self.real)), side="right") - 1
+
+        self.log_price = np.log(self.real["Price"].to_numpy())
+        self.weight = self.real["Weight"].str.replace("kg", "").astype(float).to_numpy()
+        self.columns = {column: self.real[column].to_numpy() for column in MIXED_COLUMNS + ["Company", "TypeName"]}
+        # mean log price of every value, per mixed column, aligned with the real rows
+        self.value_log_price = {
+            column: self.real.groupby(column)["Price"].transform(lambda prices: np.log(prices).mean()).to_numpy()
+            for column in MIXED_COLUMNS
+        }
+
+    def generate(self, n_rows, seed=42, start_index=0) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        template = rng.integers(len(self.real), size=n_rows)
+        group = self.group_of_row[template]
+        log_price = self.log_price[template].copy()
+
+        data = {"Company": self.columns["Company"][template], "TypeName": self.columns["TypeName"][template]}
+        for column in MIXED_COLUMNS:
+            donor = self.group_start[group] + (rng.random(n_rows) * self.group_size[group]).astype(np.int64)
+            source = np.where(rng.random(n_rows) < self.mix, donor, template)
+            data[column] = self.columns[column][source]
+            log_price += 0.5 * (self.value_log_price[column][source] - self.value_log_price[column][template])
+
+        weight = np.round(self.weight[template] * rng.uniform(0.95, 1.05, size=n_rows), 2)
+        data["Weight"] = pd.Series(weight).astype(str).to_numpy(dtype=object) + "kg"
+        data["Price"] = np.exp(log_price + rng.normal(0, 0.08, size=n_rows))
+
+        columns = ["Company", "TypeName", "Inches", "ScreenResolution", "Cpu", "Ram", "Memory", "Gpu", "OpSys", "Weight", "Price"]
+        return pd.DataFrame(data, columns=columns, index=pd.RangeIndex(start_index, start_index + n_rows))
+
+    def write(self, path, n_rows, chunk_size=SyntheticListingsConfig.chunk_size, seed=42) -> str:
+        """
+        Writes n_rows listings to a csv laid out like laptop_data.csv (unnamed index column
+        first), chunk by chunk.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        for i, start in enumerate(range(0, n_rows, chunk_size)):
+            chunk = self.generate(min(chunk_size, n_rows - start), seed=seed + i, start_index=start)
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0)
+        return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic raw laptop listings in the laptop_data.csv format.")
+    parser.add_argument("--rows", type=int, default=SyntheticListingsConfig.n_rows)
+    parser.add_argument("--output", default=SyntheticListingsConfig.output_path)
+    parser.add_argument("--seed", type=int, default=SyntheticListingsConfig.seed)
+    args = parser.parse_args()
+
+    print(ListingGenerator().write(args.output, args.rows, seed=args.seed))
@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import subprocess
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+
+from src.benchmark.synthetic_listings import ListingGenerator
+from src.components.data_ingestion import DataIngestion
+from src.components.data_cleaning import DataCleaning
+from src.components.feature_engg import FeatureEngineering
+from src.components.feature_selection import FeatureSelection
+from src.components.outlier_treatment import OutlierTreatment
+from src.components.model_selection import ModelSelection
+from src.components.hyper_parameter_tuning import HyperParaTuning
+from src.utils import artifact_io
+from src.utils.fit_cache import fit_cache
+from src.utils.utils import peak_rss_mb, reset_peak_rss
+
+
+@dataclass
+class TrainingBenchmarkConfig:
+    sizes: list = field(default_factory=lambda: [10_000, 1_000_000, 10_000_000])
+    # scratch space per size: generated listings and the stages' artifacts/ (removed afterwards)
+    workdir: str = os.path.join("artifacts", "benchmarks", "training")
+    # one JSON line per run, for tracking the numbers over time
+    history_path: str = os.path.join("artifacts", "benchmarks", "training_history.jsonl")
+    # rows kept for the model-fitting stages (feature selection onwards, ~300s at 3k rows
+    # on one core, mostly feature selection), 0 keeps all
+    fit_rows: int = 2_000
+    seed: int = 42
+    # reuse fold fits from the on-disk fit cache (off: every run fits everything)
+    fit_cache: bool = False
+    keep_workdir: bool = False
+
+
+# knobs that change what the stages do, recorded with every run
+ENV_KNOBS = [
+    "ARTIFACT_FORMAT", "PREP_CHUNK_SIZE", "FEATURE_SELECTION_JOBS", "ADAPTIVE_PERMUTATION", "SCHEDULE_CANDIDATES",
+    "TRAIN_CORES", "TUNING_STRATEGY", "TUNING_MAX_FITS", "TUNING_MAX_SECONDS", "TUNING_PATIENCE", "OUTLIER_SKETCH_K",
+    "OUTLIER_SKETCH_JOBS"
+]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _cpu_seconds():
+    # this process and its finished worker processes (selector / scheduler pools)
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name, fn):
+        """
+        Runs fn() and records its wall time, CPU time and peak RSS under `name`.
+        """
+        reset_peak_rss()
+        wall_start, cpu_start = time.perf_counter(), _cpu_seconds()
+        result = fn()
+        self.stages[name] = {
+            "seconds": round(time.perf_counter() - wall_start, 3),
+            "cpu_seconds": round(_cpu_seconds() - cpu_start, 3),
+            "peak_rss_mb": round(peak_rss_mb(), 1)
+        }
+        print(f"  {name:<24}{self.stages[name]['seconds']:>10.2f}s{self.stages[name]['peak_rss_mb']:>10.0f} MB")
+        return result
+
+
+def _run_stages(listings_path, timer: StageTimer, config: TrainingBenchmarkConfig):
+    ingestion = DataIngestion()
+    ingestion.ingestion_cofig.source_data_path = listings_path
+    raw_path = timer.run("data_ingestion", ingestion.initiate_data_ingestion)
+    cleaned_path = timer.run("data_cleaning", lambda: DataCleaning().initiate_data_cleaning(raw_path))
+    post_fe_path = timer.run("feature_engineering", lambda: FeatureEngineering().initiate_feature_engineering(cleaned_path))
+
+    if config.fit_rows:
+        # the fitting stages run on a fixed-size sample (not timed)
+        df = artifact_io.read_frame(post_fe_path)
+        if len(df) > config.fit_rows:
+            df = df.sample(n=config.fit_rows, random_state=config.seed)
+        post_fe_path = artifact_io.write_frame(df, os.path.join("artifacts", "post_feature_engg_sample.csv"))
+        del df
+
+    post_fs_path = timer.run("feature_selection", lambda: FeatureSelection().initiate_feature_selection(post_fe_path))
+    post_ot_path = timer.run("outlier_treatment", lambda: OutlierTreatment().initiate_outlier_treatment(post_fs_path))
+    top_3_models, ordinal_path, target_path = timer.run(
+        "model_selection", lambda: ModelSelection().initiate_model_selection(post_ot_path))
+    timer.run("hyper_parameter_tuning",
+              lambda: HyperParaTuning().tune_and_select_best(top_3_models, [ordinal_path, target_path], post_ot_path))
+
+
+def benchmark_size(n_rows, config: TrainingBenchmarkConfig) -> dict:
+    """
+    Generates n_rows listings and runs every training stage on them inside a scratch
+    directory, so the repository's own artifacts/ are left alone.
+    """
+    workdir = os.path.abspath(os.path.join(config.workdir, str(n_rows)))
+    os.makedirs(workdir, exist_ok=True)
+    listings_path = os.path.join(workdir, "listings.csv")
+    print(f"{n_rows} rows:")
+
+    start = time.perf_counter()
+    ListingGenerator().write(listings_path, n_rows, seed=config.seed)
+    result = {"n_rows": n_rows, "generate_seconds": round(time.perf_counter() - start, 2)}
+
+    timer = StageTimer()
+    artifact_io.reset_io_stats()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        _run_stages(listings_path, timer, config)
+    except Exception as e:
+        # e.g. out of memory at 10M rows: keep what was measured and say where it stopped
+        result["error"] = f"{type(e).__name__}: {e}".splitlines()[0]
+    finally:
+        os.chdir(cwd)
+        if not config.keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    io = artifact_io.io_stats()
+    for name, stage in timer.stages.items():
+        if name in io:
+            stage["rows_read"] = io[name]["rows_read"]
+            stage["io_seconds"] = round(io[name]["read_seconds"] + io[name]["write_seconds"], 3)
+    result["stages"] = timer.stages
+    result["total_seconds"] = round(sum(stage["seconds"] for stage in timer.stages.values()), 2)
+    return result
+
+
+def run_benchmark(config: TrainingBenchmarkConfig = None) -> dict:
+    config = config or TrainingBenchmarkConfig()
+    fit_cache.enabled = config.fit_cache
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": asdict(config),
+        "env": {knob: os.environ[knob] for knob in ENV_KNOBS if knob in os.environ},
+        "results": [benchmark_size(n_rows, config) for n_rows in config.sizes]
+    }
+
+    os.makedirs(os.path.dirname(config.history_path) or ".", exist_ok=True)
+    with open(config.history_path, "a") as file:
+        file.write(json.dumps(report) + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every training stage on synthetic listings of growing size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=TrainingBenchmarkConfig().sizes)
+    parser.add_argument("--fit-rows", type=int, default=TrainingBenchmarkConfig.fit_rows,
+                        help="rows kept for feature selection onwards (0 keeps all)")
+    parser.add_argument("--fit-cache", action="store_true", help="reuse fold fits from the on-disk fit cache")
+    parser.add_argument("--keep-workdir", action="store_true")
+    parser.add_argument("--history-path", default=TrainingBenchmarkConfig.history_path)
+    args = parser.parse_args()
+
+    config = TrainingBenchmarkConfig(sizes=args.sizes, fit_rows=args.fit_rows, fit_cache=args.fit_cache,
+                                     keep_workdir=args.keep_workdir, history_path=args.history_path)
+    report = run_benchmark(config)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if any("error" in result for result in report["results"]) else 0)
@@ -0,0 +1,76 @@
+import os
+import json
+import time
+import argparse
+from dataclasses import dataclass
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+
+from src.utils.artifact_io import read_frame
+from src.utils.fit_cache import fit_cache
+from src.utils.hyper_para_tuning_utils import hyperparameter_tuning
+from src.benchmark.model_selection import preprocessors
+
+
+@dataclass
+class TuningBenchmarkConfig:
+    data_path: str = os.path.join("artifacts", "post_outlier_treatment.csv")
+    encoding: str = "target"
+
+
+def ensemble_candidates() -> dict:
+    # the ensembles and grids tuned by HyperParaTuning.tune_and_select_best
+    from xgboost import XGBRegressor
+
+    return {
+        "random_forest": (RandomForestRegressor(random_state=42),
+                          {"model__n_estimators": [100, 200], "model__max_depth": [None, 10, 20]}),
+        "gradient_boosting": (GradientBoostingRegressor(random_state=42),
+                              {"model__n_estimators": [100, 200], "model__learning_rate": [0.05, 0.1]}),
+        "xgboost": (XGBRegressor(random_state=42),
+                    {"model__n_estimators": [100, 200], "model__learning_rate": [0.05, 0.1]}),
+    }
+
+
+def run_benchmark(config: TuningBenchmarkConfig = None) -> dict:
+    """
+    Grid search vs incremental (warm start) search per ensemble: both must pick the same
+    parameters with the same mean CV R2.
+    """
+    config = config or TuningBenchmarkConfig()
+    df = read_frame(config.data_path)
+    X = df.drop(columns=['price', "weight"])
+    y = df['price']
+    preprocessor = preprocessors(X)[config.encoding]
+    # grid runs GridSearchCV and nothing comes from earlier fits
+    fit_cache.enabled = False
+
+    report = {}
+    for name, (model, param_grid) in ensemble_candidates().items():
+        timings = {}
+        for strategy in ("grid", "incremental"):
+            start = time.perf_counter()
+            best_params, _, best_score = hyperparameter_tuning(preprocessor, model, param_grid, X, y, strategy=strategy)
+            timings[strategy] = (time.perf_counter() - start, best_params, best_score)
+
+        (grid_seconds, grid_params, grid_score), (incremental_seconds, incremental_params, incremental_score) = \
+            timings["grid"], timings["incremental"]
+        assert grid_params == incremental_params, f"{name}: {grid_params} != {incremental_params}"
+        assert abs(grid_score - incremental_score) < 1e-9, f"{name}: R2 {grid_score} != {incremental_score}"
+
+        report[name] = {
+            "best_params": incremental_params,
+            "best_r2": round(incremental_score, 6),
+            "grid_seconds": round(grid_seconds, 2),
+            "incremental_seconds": round(incremental_seconds, 2),
+            "speedup": round(grid_seconds / incremental_seconds, 2)
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grid vs incremental n_estimators tuning: same winner, less fitting.")
+    parser.add_argument("--data-path", default=TuningBenchmarkConfig.data_path)
+    parser.add_argument("--encoding", default=TuningBenchmarkConfig.encoding, choices=["ordinal", "target"])
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(TuningBenchmarkConfig(data_path=args.data_path, encoding=args.encoding)), indent=2))
@@ -4,11 +4,16 @@ import pandas as pd
 from dataclasses import dataclass
 from src.utils.exception import CustomException
 from src.utils.logger import logging
+from src.utils.profiling import profiled
+from src.utils.artifact_io import read_frame, write_frame, iter_frame_chunks, FrameWriter
+from src.utils.utils import peak_rss_mb, reset_peak_rss
 
 
 @dataclass
 class DataCleaningConfig:
     cleaned_data_path:str = os.path.join('artifacts', 'cleaned.csv')
+    # rows per chunk in streaming mode, 0 loads the whole file at once
+    chunk_size: int = int(os.environ.get("PREP_CHUNK_SIZE", "0"))
 
 class DataCleaning:
     def __init__(self):
@@ -40,22 +45,33 @@ class DataCleaning:
             raise CustomException(e, sys)
         
     
+    @profiled("data_cleaning")
     def initiate_data_cleaning(self, data_path):
         try:
-            # read the data from the data_path
-            df = pd.read_csv(data_path)
-            logging.info(f"Read the data from the {data_path}")
-            
-            # pass to data_cleaning function
-            cleaned_df = self.data_cleaning(df)
-            logging.info(f"Data cleaning completed. Cleaned data saved at {self.cleaning_config.cleaned_data_path}")
-            
-            # saving cleaned df
-            os.makedirs(os.path.dirname(self.cleaning_config.cleaned_data_path), exist_ok=True)
-            cleaned_df.to_csv(self.cleaning_config.cleaned_data_path, index=False)
-            
+            reset_peak_rss()
+
+            if self.cleaning_config.chunk_size:
+                # streaming mode: every cleaning step is row-local, so chunks are cleaned
+                # independently and appended, with memory bounded by the chunk size
+                with FrameWriter(self.cleaning_config.cleaned_data_path, stage="data_cleaning") as writer:
+                    for chunk in iter_frame_chunks(data_path, self.cleaning_config.chunk_size, stage="data_cleaning"):
+                        writer.write(self.data_cleaning(chunk))
+                cleaned_data_path = writer.path
+            else:
+                # read the data from the data_path
+                df = read_frame(data_path, stage="data_cleaning")
+                logging.info(f"Read the data from the {data_path}")
+
+                # pass to data_cleaning function
+                cleaned_df = self.data_cleaning(df)
+
+                # saving cleaned df
+                cleaned_data_path = write_frame(cleaned_df, self.cleaning_config.cleaned_data_path, stage="data_cleaning")
+
+            logging.info(f"Data cleaning completed. Cleaned data saved at {cleaned_data_path}, peak RSS {peak_rss_mb():.1f} MB")
+
             return (
-                self.cleaning_config.cleaned_data_path
+                cleaned_data_path
             )
         
         except Exception as e:
@@ -5,10 +5,15 @@ import numpy as np
 from dataclasses import dataclass
 from src.utils.exception import CustomException
 from src.utils.logger import logging
+from src.utils.profiling import profiled
+from src.utils.artifact_io import read_frame, write_frame, iter_frame_chunks, FrameWriter
+from src.utils.utils import peak_rss_mb, reset_peak_rss
 
 @dataclass
 class FeatureEngineeringConfig:
     post_feature_engg_data_path: str = os.path.join('artifacts', 'post_feature_engg_data.csv')
+    # rows per chunk in streaming mode, 0 loads the whole file at once
+    chunk_size: int = int(os.environ.get("PREP_CHUNK_SIZE", "0"))
 
 class FeatureEngineering:
     def __init__(self):
@@ -19,62 +24,36 @@ class FeatureEngineering:
     
         """
         This  function will perform feature engineering on the given dataframe.
+
+        The text columns have few distinct values (tens to low hundreds, even over millions
+        of listings), so every string feature is computed once per distinct value and
+        broadcast back through the factorized codes. The output is identical to the
+        former row-wise implementation (kept in src/benchmark/feature_engineering.py).
         """
         try:
-            # Extracting Touch Screen feature
-            df["ips"] = df["ScreenResolution"].apply(lambda x: 1 if "IPS" in x else 0)
-            
-            # Extracting IPS feature
-            df["touch_screen"] = df["ScreenResolution"].apply(lambda x: 1 if "Touchscreen" in x else 0)
+            # IPS / Touch Screen / resolution, one table over the distinct ScreenResolution values
+            screen = _map_distinct(df["ScreenResolution"], _screen_table)
+            df["ips"] = screen["ips"]
+            df["touch_screen"] = screen["touch_screen"]
             
             # Extacting PPI feature
-            df[["x_res", "y_res"]] = df["ScreenResolution"].str.split("x", n=1, expand =True)
-            df['x_res'] = df['x_res'].str.replace(',','').str.findall(r'(\d+\.?\d+)').apply(lambda x:x[0])
-            df['x_res'] = df['x_res'].astype('int')
-            df['y_res'] = df['y_res'].astype('int')
-            df['ppi'] = (((df['x_res']**2) + (df['y_res']**2))**0.5/df['Inches']).astype('float')
-            
-
+            df['ppi'] = (((screen['x_res']**2) + (screen['y_res']**2))**0.5/df['Inches']).astype('float')
             
-            # cleaning CPU feature
-            df['Cpu Name'] = df['Cpu'].apply(lambda x:" ".join(x.split()[0:3]))
+            # CPU brand straight from the Cpu string (via the first three words)
+            df['Cpu brand'] = _map_distinct(df['Cpu'], lambda cpus: cpus.map(_fetch_processor))
             
-            # function to fetch processor type
-            def fetch_processor(text):
-                if text == 'Intel Core i7' or text == 'Intel Core i5' or text == 'Intel Core i3':
-                    return text
-                else:
-                    if text.split()[0] == 'Intel':
-                        return 'Other Intel Processor'
-                    else:
-                        return 'AMD Processor'
-
-            df['Cpu brand'] = df['Cpu Name'].apply(fetch_processor)
+            ## working with Memory Feature: SSD, HDD (incl. Hybrid) and Flash in one regex pass
+            memory = _map_distinct(df["Memory"], _memory_table)
+            df["ssd"] = memory["ssd"]
+            df["hdd"] = memory["hdd"]
+            df["flash"] = memory["flash"]
             
-            ## working with Memory Feature
+            # working with GPU and OS features (a missing Gpu / OpSys maps the same as a 0-filled one)
+            gpu_name = _map_distinct(df["Gpu"], lambda gpus: gpus.str.split(" ", n=1).str[0])
+            os_name = _map_distinct(df['OpSys'], lambda systems: systems.map(_cat_os))
             
-            # 1. SSD
-            ssd_match = df["Memory"].str.extract(r'(\d+)(GB|TB)\sSSD')
-            df["ssd"] = np.where(
-                ssd_match[1] == "TB",
-                ssd_match[0].astype(float) * 1024,  # TB → GB
-                ssd_match[0].astype(float))          # GB stays as number
-
-            # 2. HDD
-            hdd_match = df["Memory"].str.extract(r'(\d+(?:\.\d+)?)(GB|TB)\s(?:HDD|Hybrid)')
-            df["hdd"] = np.where(
-                hdd_match[1] == "TB",
-                hdd_match[0].astype(float) * 1024,
-                hdd_match[0].astype(float)
-            )
-            
-            # 3. Flash 
-            flash_match = df["Memory"].str.extract(r'(\d+(?:\.\d+)?)(GB|TB)\sFlash')
-            df["flash"] = np.where(
-                flash_match[1] == "TB",
-                flash_match[0].astype(float) * 1024,  # TB → GB
-                flash_match[0].astype(float)
-            )
+            # dropping unnecessary cols first, so the NaN fill and the ARM filter only touch what is kept
+            df = df.drop(columns= ["Gpu", "OpSys" ,"Inches", "ScreenResolution", 'Cpu', "Memory"])
             
             # filling NaN values with 0
             df.fillna(0, inplace=True)
@@ -82,24 +61,9 @@ class FeatureEngineering:
             # converting to int
             df[['ssd', 'hdd', 'flash']]=df[['ssd', 'hdd', 'flash']].astype('int')
             
-            # working with GPU feature
-            df["gpu_name"] = df["Gpu"].str.split(" ", n=1, expand =True)[0]
-            df = df[df['gpu_name'] != 'ARM'] # ARM have only one value
-            
-            ## working with OS feature
-            def cat_os(inp):
-                if inp == 'Windows 10' or inp == 'Windows 7' or inp == 'Windows 10 S':
-                    return 'Windows'
-                elif inp == 'macOS' or inp == 'Mac OS X':
-                    return 'Mac'
-                else:
-                    return 'Others/No OS/Linux'
-                
-            df['os'] = df['OpSys'].apply(cat_os)
-            
-            
-            # dropping unnecessary cols
-            df = df.drop(columns= ["Gpu", "x_res", "y_res","OpSys" ,"Inches", "ScreenResolution", 'Cpu','Cpu Name', "Memory"])
+            df["gpu_name"] = gpu_name
+            df['os'] = os_name
+            df = df[gpu_name != 'ARM'] # ARM have only one value
             
             return(
                 df
@@ -108,23 +72,111 @@ class FeatureEngineering:
         except Exception as e:
             raise CustomException(e, sys)
         
+    @profiled("feature_engineering")
     def initiate_feature_engineering(self, df_path):
         
         try:
-            # loading dataset
-            df = pd.read_csv(df_path)
-            logging.info(f"df Loaded from {df_path}")
-            
-            # passing df to feature_engineering function
-            post_feature_engineering_df = self.feature_engineering(df)
+            reset_peak_rss()
+            
+            if self.feature_engg_config.chunk_size:
+                # streaming mode: the NaN fill (a constant) and the ARM filter are row-local,
+                # so processing chunk by chunk gives exactly the whole-frame output
+                with FrameWriter(self.feature_engg_config.post_feature_engg_data_path, stage="feature_engineering") as writer:
+                    for chunk in iter_frame_chunks(df_path, self.feature_engg_config.chunk_size, stage="feature_engineering"):
+                        writer.write(self.feature_engineering(chunk))
+                post_feature_engg_data_path = writer.path
+            else:
+                # loading dataset
+                df = read_frame(df_path, stage="feature_engineering")
+                logging.info(f"df Loaded from {df_path}")
+                
+                # passing df to feature_engineering function
+                post_feature_engineering_df = self.feature_engineering(df)
+                
+                # creating dir and saving df
+                post_feature_engg_data_path = write_frame(post_feature_engineering_df, self.feature_engg_config.post_feature_engg_data_path, stage="feature_engineering")
             
-            # creating dir and saving df
-            os.makedirs(os.path.dirname(self.feature_engg_config.post_feature_engg_data_path), exist_ok=True)
-            post_feature_engineering_df.to_csv(self.feature_engg_config.post_feature_engg_data_path, index=False)
+            logging.info(f"Feature engineering completed. Saved at {post_feature_engg_data_path}, peak RSS {peak_rss_mb():.1f} MB")
             
             return (
-                self.feature_engg_config.post_feature_engg_data_path
+                post_feature_engg_data_path
             )   
                  
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
+
+
+def _map_distinct(series: pd.Series, fn):
+    """
+    Computes fn over the distinct values of `series` only (a mapping table) and
+    broadcasts the result back to every row. fn takes and returns a Series / DataFrame
+    aligned with the distinct values.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(codes) and codes.min() < 0:
+        # missing values get their own row in the table
+        uniques = np.append(np.asarray(uniques, dtype=object), np.nan)
+        codes = np.where(codes < 0, len(uniques) - 1, codes)
+    table = fn(pd.Series(uniques, dtype=series.dtype))
+    mapped = table.iloc[codes]
+    mapped.index = series.index
+    return mapped
+
+
+def _screen_table(resolutions: pd.Series) -> pd.DataFrame:
+    # "IPS Panel Full HD / Touchscreen 1920x1080": x_res is the first number
+    # (at least two digits, thousands separators removed) before the first "x"
+    x_part, y_part = resolutions.str.split("x", n=1).str[0], resolutions.str.split("x", n=1).str[1]
+    return pd.DataFrame({
+        "ips": resolutions.str.contains("IPS", regex=False).astype(int),
+        "touch_screen": resolutions.str.contains("Touchscreen", regex=False).astype(int),
+        "x_res": x_part.str.replace(",", "").str.extract(r'(\d+\.?\d+)', expand=False).astype('int'),
+        "y_res": y_part.astype('int')
+    })
+
+
+# one pass for all storage kinds: "<size>(GB|TB) <kind>", the first match of each kind wins
+MEMORY_PATTERN = r'(?P<int>\d+)(?:\.(?P<frac>\d+))?(?P<unit>GB|TB)\s(?P<kind>SSD|HDD|Hybrid|Flash)'
+MEMORY_KINDS = {"SSD": "ssd", "HDD": "hdd", "Hybrid": "hdd", "Flash": "flash"}
+
+
+def _memory_table(memory: pd.Series) -> pd.DataFrame:
+    table = pd.DataFrame(np.nan, index=memory.index, columns=["ssd", "hdd", "flash"])
+    parts = memory.str.extractall(MEMORY_PATTERN)
+    if parts.empty:
+        return table
+
+    # SSD sizes only ever matched whole digits right before the unit ("1.5TB SSD" -> 5TB),
+    # HDD / Hybrid / Flash sizes keep their decimals
+    is_ssd = parts["kind"] == "SSD"
+    size = np.where(
+        is_ssd,
+        parts["frac"].fillna(parts["int"]).astype(float),
+        (parts["int"] + "." + parts["frac"].fillna("0")).astype(float)
+    )
+    size = np.where(parts["unit"] == "TB", size * 1024, size)  # TB → GB
+
+    parts = parts.assign(size=size, kind=parts["kind"].map(MEMORY_KINDS)).reset_index(level=0)
+    first = parts.groupby(["level_0", "kind"], sort=False)["size"].first().unstack("kind")
+    table.loc[first.index, first.columns] = first
+    return table
+
+
+def _fetch_processor(cpu):
+    text = " ".join(cpu.split()[0:3])
+    if text == 'Intel Core i7' or text == 'Intel Core i5' or text == 'Intel Core i3':
+        return text
+    else:
+        if text.split()[0] == 'Intel':
+            return 'Other Intel Processor'
+        else:
+            return 'AMD Processor'
+
+
+def _cat_os(inp):
+    if inp == 'Windows 10' or inp == 'Windows 7' or inp == 'Windows 10 S':
+        return 'Windows'
+    elif inp == 'macOS' or inp == 'Mac OS X':
+        return 'Mac'
+    else:
+        return 'Others/No OS/Linux'
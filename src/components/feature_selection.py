@@ -4,7 +4,9 @@ import pandas as pd
 from dataclasses import dataclass
 from src.utils.exception import CustomException
 from src.utils.logger import logging
-from src.utils.feature_selection_utils import correlation_feature_selection, random_forest_feature_selection, gradient_boosting_feature_selection, permutation_feature_selection, rfe_feature_selection, linear_regression_weights_feature_selection, lasso_feature_selection, shap_feature_selection
+from src.utils.profiling import profiled
+from src.utils.artifact_io import read_frame, write_frame
+from src.utils.feature_selection_utils import run_selectors
 from sklearn.preprocessing import OrdinalEncoder
 
 
@@ -13,6 +15,10 @@ from sklearn.preprocessing import OrdinalEncoder
 @dataclass
 class FeatureSelectionConfig:
     post_feature_selection_path: str = os.path.join('artifacts', 'post_feature_selection.csv')
+    # selector processes, 1 runs them serially in-process
+    n_jobs: int = int(os.environ.get("FEATURE_SELECTION_JOBS", os.cpu_count() or 1))
+    # adaptive number of permutation repeats per feature instead of a fixed 30
+    adaptive_permutation: bool = os.environ.get("ADAPTIVE_PERMUTATION", "0") == "1"
 
 # working class for missing values imputation
 class FeatureSelection:
@@ -29,28 +35,14 @@ class FeatureSelection:
                 oe = OrdinalEncoder()
                 data_label_encoded[col] = oe.fit_transform(data_label_encoded[[col]])
 
-            # Splitting the dataset into training and testing sets
-            y_label = data_label_encoded['Price']
-            X_label = data_label_encoded.drop('Price', axis=1)
-
-
-            selectors = [
-                correlation_feature_selection,
-                random_forest_feature_selection,
-                gradient_boosting_feature_selection,
-                permutation_feature_selection,
-                lasso_feature_selection,
-                rfe_feature_selection,
-                linear_regression_weights_feature_selection,
-                shap_feature_selection,
-            ]
-            
-            merged = selectors[0](data_label_encoded)
-            for selector in selectors[1:]:
-                merged = merged.merge(selector(X=X_label, y=y_label), on='feature')
+            # all selectors, sharing their fitted base models, merged on 'feature'
+            merged = run_selectors(
+                data_label_encoded, target='Price', n_jobs=self.config.n_jobs,
+                selector_kwargs={"permutation_feature_selection": {"adaptive": self.config.adaptive_permutation}})
 
             merged.set_index('feature', inplace=True)
-            mean_scores = merged.mean(axis=1)
+            # permutation_n_repeats says how much each permutation score is worth, it isn't a score
+            mean_scores = merged.drop(columns=["permutation_n_repeats"]).mean(axis=1)
             
             columns_to_drop = ["touch_screen", "flash", "ips"]
 
@@ -61,19 +53,19 @@ class FeatureSelection:
         except Exception as e:
             raise CustomException(e, sys)
 
+    @profiled("feature_selection")
     def initiate_feature_selection(self, df_path):
         try:
-            df = pd.read_csv(df_path)
+            df = read_frame(df_path, stage="feature_selection")
             logging.info("dataset loaded for feature selection")
 
             filtered_df, low_features, merged_scores = self.feature_selection(df)
 
-            os.makedirs(os.path.dirname(self.config.post_feature_selection_path), exist_ok=True)
-            filtered_df.to_csv(self.config.post_feature_selection_path, index=False)
-            logging.info(f"post feature selection dataset saved in path {self.config.post_feature_selection_path}")
+            post_feature_selection_path = write_frame(filtered_df, self.config.post_feature_selection_path, stage="feature_selection")
+            logging.info(f"post feature selection dataset saved in path {post_feature_selection_path}")
 
             return (
-                self.config.post_feature_selection_path
+                post_feature_selection_path
             )
         except Exception as e:
             raise CustomException(e, sys)
\ No newline at end of file
@@ -3,31 +3,54 @@ import os, sys, pickle
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression
 from sklearn.svm import SVR
-from xgboost import XGBRegressor
-from src.utils.hyper_para_tuning_utils import hyperparameter_tuning
+from sklearn.model_selection import ParameterGrid
+from src.utils.hyper_para_tuning_utils import candidate_max_cores, hyperparameter_tuning, tune_candidate
+from src.utils.scheduler import CoreScheduler, Job
 from src.utils.exception import CustomException
 from src.utils.logger import logging
+from src.utils.profiling import profiled
+from src.utils.artifact_io import read_frame
 import pandas as pd
 
 from src.utils.utils import save_obj
+from src.pipeline.model_registry import publish_version
 
 @dataclass
 class HyperParatuningConfig:
     prediction_pipeline_path: str = os.path.join("artifacts", "pipelines", "prediction_pipeline.pkl")
     best_preprocessor_pipeline_path: str = os.path.join("artifacts", "pipelines", "best_preprocessor_pipeline.pkl")
+    # grid (exhaustive), halving (successive halving), bayes (model-based search) or
+    # incremental (exhaustive, n_estimators grown by warm start)
+    search_strategy: str = os.environ.get("TUNING_STRATEGY", "grid")
+    # per tuned model budget for halving / bayes / incremental: fold fits (never exceeded) and / or
+    # seconds (soft: a candidate projected to run past it isn't started, a slow one can still overrun);
+    # a search cut short keeps its best partial result (logged as a warning)
+    max_fits: int = int(os.environ["TUNING_MAX_FITS"]) if os.environ.get("TUNING_MAX_FITS") else None
+    max_seconds: float = float(os.environ["TUNING_MAX_SECONDS"]) if os.environ.get("TUNING_MAX_SECONDS") else None
+    # incremental: stop growing after this many n_estimators values without improvement
+    patience: int = int(os.environ["TUNING_PATIENCE"]) if os.environ.get("TUNING_PATIENCE") else None
+    # tune the top candidates concurrently on a shared core budget (0 uses every core)
+    schedule_candidates: bool = os.environ.get("SCHEDULE_CANDIDATES", "1") != "0"
+    total_cores: int = int(os.environ.get("TRAIN_CORES", "0"))
 
 class HyperParaTuning:
     def __init__(self):
         self.config = HyperParatuningConfig()
+        # registry version of the last published best pipeline
+        self.published_version = None
 
+    @profiled("hyper_parameter_tuning")
     def tune_and_select_best(self, top_3_models_df, preprocessors_paths, df_path: str):
         """
         Loops through top 3 models, loads dataset and preprocessors,
         performs hyperparameter tuning, and saves the best pipeline.
         """
         try:
+            # imported lazily, xgboost is only needed when tuning
+            from xgboost import XGBRegressor
+
             # 1. Load dataset
-            df = pd.read_csv(df_path)
+            df = read_frame(df_path, stage="hyper_parameter_tuning")
             X = df.drop(columns=['price', "weight"])
             y = df['price']
 
@@ -69,12 +92,36 @@ class HyperParaTuning:
                 "xgboost": XGBRegressor(random_state=42)
             }
 
+            search_kwargs = {
+                "strategy": self.config.search_strategy,
+                "max_fits": self.config.max_fits,
+                "max_seconds": self.config.max_seconds,
+                "patience": self.config.patience
+            }
+
+            tuned = {}
+            if self.config.schedule_candidates:
+                # all candidates tuned at once, a job's cost ~ its grid size
+                jobs = []
+                for i in range(len(top_3_models_df)):
+                    model_name = top_3_models_df.loc[i, "Model"]
+                    encoding = top_3_models_df.loc[i, "Encoding"]
+                    n_points = max(1, len(ParameterGrid(param_grids[model_name])))
+                    jobs.append(Job(
+                        name=f"{model_name}/{encoding}", fn=tune_candidate,
+                        args=(preprocessors[encoding], model_map[model_name], param_grids[model_name], X, y),
+                        kwargs=search_kwargs, cost=float(n_points),
+                        max_cores=candidate_max_cores(model_map[model_name], param_grids[model_name], self.config.search_strategy)
+                    ))
+                print(f"Hyperparameter tuning for {', '.join(job.name for job in jobs)}...")
+                scheduler = CoreScheduler(self.config.total_cores or None)
+                tuned = scheduler.run(jobs)
+                scheduler.print_report()
+
             best_score = -float("inf")
             best_pipeline = None
 
             for i in range(len(top_3_models_df)):
-                logging.info(f"Hyperparameter tuning for {top_3_models_df.loc[0, "Model"]}...")
-                print(f"Hyperparameter tuning for {top_3_models_df.loc[0, "Model"]}...")
                 model_name = top_3_models_df.loc[i, "Model"]
                 encoding = top_3_models_df.loc[i, "Encoding"]
                 preprocessor = preprocessors[encoding]
@@ -82,24 +129,34 @@ class HyperParaTuning:
                 model = model_map[model_name]
                 param_grid = param_grids[model_name]
 
-                best_params, best_estimator, score = hyperparameter_tuning(
-                    preprocessor, model, param_grid, X, y
-                )
+                if f"{model_name}/{encoding}" in tuned:
+                    best_params, best_estimator, score = tuned[f"{model_name}/{encoding}"]
+                else:
+                    logging.info(f"Hyperparameter tuning for {model_name}...")
+                    print(f"Hyperparameter tuning for {model_name}...")
+                    best_params, best_estimator, score = hyperparameter_tuning(
+                        preprocessor, model, param_grid, X, y, **search_kwargs
+                    )
                 
                 logging.info(f"{model_name} with {preprocessor} best params: {best_params}, R2: {score}")
 
-                if score > best_score:
+                # an unscored candidate (score -inf, budget too small) is only kept if nothing better came
+                if score > best_score or best_pipeline is None:
                     best_score = score
                     best_pipeline = best_estimator
                     
             os.makedirs(os.path.dirname(self.config.prediction_pipeline_path), exist_ok=True)
             save_obj(self.config.prediction_pipeline_path, best_pipeline)
             
-            best_preprocessor = best_estimator.named_steps["preprocessor"]
+            best_preprocessor = best_pipeline.named_steps["preprocessor"]
             save_obj(self.config.best_preprocessor_pipeline_path, best_preprocessor)
 
             logging.info(f"Prediction pipeline saved at {self.config.prediction_pipeline_path}")
 
+            # versioned copy picked up by running servers through the model registry
+            self.published_version = publish_version(best_pipeline, best_preprocessor)
+            logging.info(f"Prediction pipeline published as version {self.published_version}")
+
             return best_pipeline, best_score
 
         except Exception as e:
@@ -1,30 +1,39 @@
 import sys
 import os
 import pandas as pd
-from src.utils.model_selection_utils import evaluate_pipeline
+from src.utils.model_selection_utils import evaluate_pipeline, evaluate_candidates, FoldCache
 from src.utils.utils import save_obj
 from dataclasses import dataclass
 from src.utils.exception import CustomException
 from src.utils.logger import logging
+from src.utils.profiling import profiled
+from src.utils.artifact_io import read_frame
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OrdinalEncoder
-from category_encoders import TargetEncoder
 
 @dataclass
 class ModelSelectionConfig:
     ordinal_transformer_path: str = os.path.join('artifacts', 'ordinal_transformer.pkl')
     target_transformer_path: str = os.path.join('artifacts', 'target_transformer.pkl')
+    # run all (model, encoding) candidates concurrently on a shared core budget
+    schedule_candidates: bool = os.environ.get("SCHEDULE_CANDIDATES", "1") != "0"
+    # core budget for the scheduler, 0 uses every core
+    total_cores: int = int(os.environ.get("TRAIN_CORES", "0"))
 
 class ModelSelection:
     def __init__(self):
         self.config = ModelSelectionConfig()
 
+    @profiled("model_selection")
     def initiate_model_selection(self, df_path: str):
         try:
+            # imported lazily, category_encoders is only needed when training
+            from category_encoders import TargetEncoder
+
             logging.info("Starting model selection process.")
             logging.info(f"Reading dataset from: {df_path}")
 
-            df = pd.read_csv(df_path)
+            df = read_frame(df_path, stage="model_selection")
             logging.info(f"Dataset loaded successfully with shape: {df.shape}")
 
             X = df.drop(columns=['price', "weight"])
@@ -54,16 +63,29 @@ class ModelSelection:
             )
             logging.info("Target preprocessor created.")
 
-            logging.info("Evaluating pipelines with ordinal preprocessor.")
-            ordinal_results = evaluate_pipeline(ordinal_preprocessor, X, y)
-            ordinal_results['Encoding'] = 'ordinal'
+            # same KFold splits for both encodings, each preprocessor fitted once per fold
+            fold_cache = FoldCache(X, y)
+
+            if self.config.schedule_candidates:
+                logging.info("Evaluating all (model, encoding) candidates on the core scheduler.")
+                all_results, scheduler = evaluate_candidates(
+                    {"ordinal": ordinal_preprocessor, "target": target_preprocessor}, X, y, fold_cache,
+                    total_cores=self.config.total_cores or None
+                )
+                print("Model selection candidates:")
+                scheduler.print_report()
+            else:
+                logging.info("Evaluating pipelines with ordinal preprocessor.")
+                ordinal_results = evaluate_pipeline(ordinal_preprocessor, X, y, fold_cache)
+                ordinal_results['Encoding'] = 'ordinal'
 
-            logging.info("Evaluating pipelines with target preprocessor.")
-            target_results = evaluate_pipeline(target_preprocessor, X, y)
-            target_results['Encoding'] = 'target'
+                logging.info("Evaluating pipelines with target preprocessor.")
+                target_results = evaluate_pipeline(target_preprocessor, X, y, fold_cache)
+                target_results['Encoding'] = 'target'
 
-            # Combine both results
-            all_results = pd.concat([ordinal_results, target_results], ignore_index=True)
+                # Combine both results
+                all_results = pd.concat([ordinal_results, target_results], ignore_index=True)
+            logging.info(f"Fold cache after both encodings: {fold_cache.stats()}")
 
             # Sort by R2 and pick top 4
             top_3_models = all_results.sort_values(by="R2", ascending=False).head(3)[["Model","Encoding"]]
@@ -3,7 +3,12 @@ import os
 import pandas as pd
 import numpy as np
 from src.utils.logger import logging
+from src.utils.profiling import profiled
 from src.utils.exception import CustomException
+from src.utils.artifact_io import read_frame, write_frame, iter_frame_chunks, FrameWriter
+from src.utils.quantile_sketch import KLLSketch
+from src.utils.utils import peak_rss_mb, reset_peak_rss
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 
 
@@ -11,6 +16,12 @@ from dataclasses import dataclass
 @dataclass
 class OutlierTreatmentConfig:
     outlier_treatment_path : str = os.path.join('artifacts', 'post_outlier_treatment.csv')
+    # rows per chunk in streaming mode, 0 loads the whole file at once
+    chunk_size: int = int(os.environ.get("PREP_CHUNK_SIZE", "0"))
+    # streaming mode: quantile sketch size (exact up to about this many rows) and the
+    # processes sketching chunks in parallel
+    sketch_k: int = int(os.environ.get("OUTLIER_SKETCH_K", 2000))
+    sketch_jobs: int = int(os.environ.get("OUTLIER_SKETCH_JOBS", 1))
 
 # working class
 
@@ -18,28 +29,36 @@ class OutlierTreatment:
     def __init__(self):
         self.outlier_treatment_config = OutlierTreatmentConfig()
         
-    def treat_outliers(self, df):
+    @staticmethod
+    def prepare(df):
+        # column names to lower case
+        df.columns = df.columns.str.lower()
+
+        ## price type conversion
+        df["price"] = df["price"].astype(int)
+        return df
+
+    @staticmethod
+    def iqr_bounds(Q1, Q3):
+        IQR = Q3 - Q1
+        return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+
+    def treat_outliers(self, df, bounds=None):
         
         """
         Here no outliers were found in the numerical features except price feature. So, we will treat the outliers in price feature using IQR method.
+        bounds: (lower, upper) price bounds computed elsewhere (streaming mode), exact
+        quantiles of df otherwise.
         """
         
         try:
-            # column names to lower case
-            df.columns = df.columns.str.lower()
-            
             # Handling price feature
-            
-            ## price type conversion
-            df["price"] = df["price"].astype(int)
+            df = self.prepare(df)
             
             ## IQR method
-            Q1 = df["price"].quantile(0.25)
-            Q3 = df["price"].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+            if bounds is None:
+                bounds = self.iqr_bounds(df["price"].quantile(0.25), df["price"].quantile(0.75))
+            lower_bound, upper_bound = bounds
             
             # Remove outliers from price column
             df = df[~((df["price"] < lower_bound) | (df["price"] > upper_bound))]
@@ -54,25 +73,69 @@ class OutlierTreatment:
         except Exception as e:
             raise CustomException(e, sys)
         
+    def sketch_prices(self, df_path) -> KLLSketch:
+        """
+        One chunked pass over df_path building a quantile sketch of price; with
+        sketch_jobs > 1 chunks are sketched in worker processes and merged.
+        """
+        config = self.outlier_treatment_config
+        prices = (self.prepare(chunk)["price"].to_numpy() for chunk in iter_frame_chunks(df_path, config.chunk_size, stage="outlier_treatment"))
+        sketch = KLLSketch(config.sketch_k)
+
+        if config.sketch_jobs <= 1:
+            for values in prices:
+                sketch.update(values)
+            return sketch
+
+        with ProcessPoolExecutor(max_workers=config.sketch_jobs) as pool:
+            # a few chunks in flight per worker, so memory stays bounded by the chunk size
+            in_flight = []
+            for i, values in enumerate(prices):
+                in_flight.append(pool.submit(_sketch, values, config.sketch_k, i))
+                if len(in_flight) >= 2 * config.sketch_jobs:
+                    sketch.merge(in_flight.pop(0).result())
+            for future in in_flight:
+                sketch.merge(future.result())
+        return sketch
+
+    @profiled("outlier_treatment")
     def initiate_outlier_treatment(self, df_path):
         try:
-            # load dataset
-            df = pd.read_csv(df_path)
-            logging.info("Dataset loaded successfully for outlier treatment")
-            
-            # pass to treat_outliers function
-            outlier_treated_df = self.treat_outliers(df)
-            logging.info("Outlier treatment completed successfully")
-            
-            # save the treated dataset to artifacts folder
-            os.makedirs(os.path.dirname(self.outlier_treatment_config.outlier_treatment_path), exist_ok=True)
-            outlier_treated_df.to_csv(self.outlier_treatment_config.outlier_treatment_path, index=False)
-            logging.info("Outlier treated dataset saved successfully")
+            reset_peak_rss()
+            config = self.outlier_treatment_config
+
+            if config.chunk_size:
+                # streaming mode: pass 1 sketches the price quantiles, pass 2 filters and
+                # log-transforms chunk by chunk with the resulting IQR bounds
+                sketch = self.sketch_prices(df_path)
+                bounds = self.iqr_bounds(*sketch.quantile([0.25, 0.75]))
+                logging.info(f"Price sketch over {sketch.n} rows ({sketch.retained} values kept), IQR bounds {bounds}")
+
+                with FrameWriter(config.outlier_treatment_path, stage="outlier_treatment") as writer:
+                    for chunk in iter_frame_chunks(df_path, config.chunk_size, stage="outlier_treatment"):
+                        writer.write(self.treat_outliers(chunk, bounds))
+                outlier_treatment_path = writer.path
+            else:
+                # load dataset
+                df = read_frame(df_path, stage="outlier_treatment")
+                logging.info("Dataset loaded successfully for outlier treatment")
+
+                # pass to treat_outliers function
+                outlier_treated_df = self.treat_outliers(df)
+
+                # save the treated dataset to artifacts folder
+                outlier_treatment_path = write_frame(outlier_treated_df, config.outlier_treatment_path, stage="outlier_treatment")
+            logging.info(f"Outlier treated dataset saved successfully, peak RSS {peak_rss_mb():.1f} MB")
             
             # return the outlier_treated_dataset of the treated dataset
             return (
-                self.outlier_treatment_config.outlier_treatment_path
+                outlier_treatment_path
                     )
         
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
+
+
+def _sketch(values, k, seed):
+    # worker side of OutlierTreatment.sketch_prices
+    return KLLSketch(k, seed=seed).update(values)
@@ -0,0 +1,196 @@
+import os
+import sys
+import json
+import bisect
+import time
+import pickle
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+
+from src.pipeline.compile_pipeline import FEATURE_COLUMNS, compile_pipeline
+from src.pipeline.model_registry import ModelRegistry
+from src.pipeline.price_table import PriceTable, PriceTableConfig
+from src.utils.exception import CustomException
+from src.utils.artifact_io import read_frame
+from src.utils.logger import logging
+from src.utils.profiling import profiled
+
+
+@dataclass
+class PriceTableBuilderConfig:
+    training_data_path: str = os.path.join("artifacts", "post_outlier_treatment.csv")
+    # table rows: every combination of these seen in training (ppi is the column axis)
+    features: list = field(default_factory=lambda: [col for col in FEATURE_COLUMNS if col != "ppi"])
+    n_error_samples: int = 5000
+
+
+def split_thresholds(model, feature) -> tuple:
+    """
+    Sorted distinct thresholds the tree ensemble splits model input column `feature` on,
+    and the side ("left": x <= threshold goes left, sklearn; "right": x < threshold, xgboost).
+    Raises TypeError for models that aren't tree ensembles.
+    """
+    if hasattr(model, "get_booster"):
+        booster = model.get_booster()
+        name = booster.feature_names[feature] if booster.feature_names else f"f{feature}"
+        trees = booster.trees_to_dataframe()
+        splits = trees.loc[trees["Feature"] == name, "Split"].to_numpy()
+        return sorted(set(splits.astype(np.float32).astype(np.float64).tolist())), "right"
+
+    trees = [model] if hasattr(model, "tree_") else list(np.ravel(getattr(model, "estimators_", [])))
+    if not trees or not all(hasattr(tree, "tree_") for tree in trees):
+        raise TypeError(f"{type(model).__name__} is not a tree ensemble, its prediction isn't piecewise constant in ppi")
+    thresholds = set()
+    for tree in trees:
+        thresholds.update(tree.tree_.threshold[tree.tree_.feature == feature].tolist())
+    return sorted(thresholds), "left"
+
+
+def _ppi_encoding(compiled) -> tuple:
+    # (model input column, scale, offset) of ppi after the preprocessor's StandardScaler
+    in_pos = compiled.feature_columns.index("ppi")
+    for out_positions, positions, inv_scale, offset in compiled.num_slots:
+        for j, pos in enumerate(positions):
+            if pos == in_pos:
+                return out_positions[j], float(inv_scale[j]), float(offset[j])
+    raise ValueError("ppi is not a numeric input of the compiled pipeline")
+
+
+class PriceTableBuilder:
+    def __init__(self):
+        self.config = PriceTableBuilderConfig()
+        self.table_config = PriceTableConfig()
+        self.registry = ModelRegistry()
+
+    def combos(self, train: pd.DataFrame) -> list:
+        # object dtype, so ints come out as Python ints (JSON metadata, dict lookups)
+        return train[self.config.features].drop_duplicates().astype(object).values.tolist()
+
+    def build_table(self, compiled, combos) -> tuple:
+        """
+        Scores every (combination, ppi interval) cell with one representative ppi per
+        interval. Returns the float32 table and the metadata describing its axes.
+        """
+        ppi_column, scale, offset = _ppi_encoding(compiled)
+        thresholds, side = split_thresholds(compiled.model, ppi_column)
+        interval = bisect.bisect_left if side == "left" else bisect.bisect_right
+
+        # a float32 value strictly inside each interval (the trees compare in float32)
+        reps = []
+        for i in range(len(thresholds) + 1):
+            lo = thresholds[i - 1] if i > 0 else None
+            hi = thresholds[i] if i < len(thresholds) else None
+            if lo is None and hi is None:
+                rep = 0.0
+            elif lo is None:
+                rep = hi - 1.0
+            elif hi is None:
+                rep = lo + 1.0
+            else:
+                rep = (lo + hi) / 2
+            reps.append(float(np.float32(rep)))
+        reachable = np.array([interval(thresholds, rep) == i for i, rep in enumerate(reps)])
+
+        n_combos, n_intervals = len(combos), len(reps)
+        logging.info(f"Scoring price table with shape {(n_combos, n_intervals)} ({n_combos * n_intervals} cells)")
+        X = np.empty((n_combos * n_intervals, compiled.n_outputs), dtype=np.float64)
+        for j, feature in enumerate(self.config.features):
+            for out_pos, values in compiled.encode_feature(feature, [combo[j] for combo in combos]).items():
+                X[:, out_pos] = np.repeat(values, n_intervals)
+        X[:, ppi_column] = np.tile(reps, n_combos)
+
+        table = compiled.model.predict(X).astype(np.float32).reshape(n_combos, n_intervals)
+        table[:, ~reachable] = np.nan
+
+        metadata = {
+            "features": self.config.features,
+            "combos": combos,
+            "ppi": {"scale": scale, "offset": offset, "thresholds": thresholds, "side": side}
+        }
+        return table, metadata
+
+    def error_bound(self, price_table: PriceTable, pipeline, combos, ppi_range) -> dict:
+        """
+        Compares table lookups against the live model on random stored combinations,
+        with ppi drawn uniformly from ppi_range.
+        """
+        rng = np.random.default_rng(42)
+        rows = []
+        for _ in range(self.config.n_error_samples):
+            row = dict(zip(self.config.features, combos[rng.integers(len(combos))]))
+            row["ppi"] = float(rng.uniform(*ppi_range))
+            rows.append(row)
+
+        looked_up = np.array([price_table.lookup(row) for row in rows], dtype=np.float64)
+        live = pipeline.predict(pd.DataFrame(rows)[FEATURE_COLUMNS])
+        covered = ~np.isnan(looked_up)
+
+        abs_err = np.abs(live[covered] - looked_up[covered])
+        # predictions are log(price), so exp(err) - 1 is the relative price error
+        rel_err = np.expm1(abs_err)
+        return {
+            "n_samples": len(rows),
+            "covered": int(covered.sum()),
+            "max_abs_log_error": round(float(abs_err.max()), 8),
+            "max_relative_price_error": round(float(rel_err.max()), 8)
+        }
+
+    @profiled("price_table")
+    def initiate_price_table(self, version=None, training_data_path=None):
+        """
+        Builds the table for a published model version (latest if None) and stores it in
+        that version's directory, where the registry loads it together with the model.
+        Returns the table path, or None when the model isn't a tree ensemble (no table).
+        """
+        try:
+            version = version or self.registry.latest_version()
+            if version is None:
+                raise FileNotFoundError(f"No prediction pipeline found under {self.registry.config.pipelines_dir}")
+            version_dir = self.registry.version_dir(version)
+            prediction_pipeline_path = os.path.join(version_dir, self.registry.config.prediction_pipeline_file)
+            pipeline = pickle.load(open(prediction_pipeline_path, 'rb'))
+            logging.info(f"Building price table for model version {version} from {prediction_pipeline_path}")
+
+            compiled = compile_pipeline(pipeline)
+            try:
+                split_thresholds(compiled.model, _ppi_encoding(compiled)[0])
+            except TypeError as e:
+                logging.warning(f"No price table for model version {version}: {e}; SERVING_MODE=table serves it from the model")
+                return None
+
+            train = read_frame(training_data_path or self.config.training_data_path, stage="price_table")
+            combos = self.combos(train)
+
+            start = time.perf_counter()
+            table, metadata = self.build_table(compiled, combos)
+            build_seconds = time.perf_counter() - start
+
+            # ppi well beyond the training range too: the end intervals are unbounded
+            ppi_range = (train["ppi"].min() - 50, train["ppi"].max() + 50)
+            error = self.error_bound(PriceTable(table, metadata), pipeline, combos, ppi_range)
+            metadata["version"] = version
+            metadata["build_seconds"] = round(build_seconds, 2)
+            metadata["error_bound"] = error
+            logging.info(f"Price table built in {build_seconds:.2f}s, error vs live model: {error}")
+
+            # metadata first, the table last via rename: a registry that sees the table
+            # file always finds a complete pair
+            table_path, metadata_path = self.table_config.paths(version_dir)
+            with open(metadata_path, 'w') as file:
+                json.dump(metadata, file, indent=2)
+            with open(f"{table_path}.tmp", 'wb') as file:
+                np.save(file, table)
+            os.replace(f"{table_path}.tmp", table_path)
+            logging.info(f"Price table saved at {table_path} ({table.nbytes / 1e3:.1f} kB)")
+
+            return (
+                table_path
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    PriceTableBuilder().initiate_price_table()
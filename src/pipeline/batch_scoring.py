@@ -0,0 +1,157 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from src.components.data_cleaning import DataCleaning
+from src.components.feature_engg import FeatureEngineering
+from src.pipeline.model_registry import ModelRegistry
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS
+from src.utils.exception import CustomException
+from src.utils.logger import logging
+
+
+@dataclass
+class BatchScoringConfig:
+    chunk_size: int = 50_000
+    n_workers: int = os.cpu_count() or 1
+    # chunks submitted ahead of the writer, bounds memory to roughly this many chunks
+    max_in_flight: int = 2 * (os.cpu_count() or 1)
+
+
+# per-process model, loaded once by the pool initializer
+_pipeline = None
+
+
+def _init_worker():
+    global _pipeline
+    _pipeline = ModelRegistry().active.pipeline
+
+
+def _prepare(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Raw listings -> model features, using the same cleaning and feature engineering as training.
+    """
+    if "Unnamed: 0" not in chunk.columns:
+        chunk = chunk.assign(**{"Unnamed: 0": chunk.index})
+
+    df = DataCleaning().data_cleaning(chunk)
+    df = FeatureEngineering().feature_engineering(df)
+    df.columns = df.columns.str.lower()
+    return df[FEATURE_COLUMNS]
+
+
+def _score(features: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "row_id": features.index,
+        "predicted_price": np.exp(_pipeline.predict(features)).round(2) if len(features) else []
+    })
+
+
+def _score_or_split(chunk: pd.DataFrame, scored: list, errors: list):
+    """
+    Scores the chunk in one go; if that fails, bisects it so the good rows are still
+    scored in bulk and only the bad rows end up in `errors`.
+    """
+    try:
+        scored.append(_score(_prepare(chunk)))
+    except Exception as e:
+        if len(chunk) == 1:
+            errors.append((chunk.index[0], str(e).splitlines()[-1]))
+            return
+        mid = len(chunk) // 2
+        _score_or_split(chunk.iloc[:mid], scored, errors)
+        _score_or_split(chunk.iloc[mid:], scored, errors)
+
+
+def score_chunk(chunk: pd.DataFrame):
+    """
+    Scores one chunk of raw listings, reporting bad rows instead of failing the chunk.
+    Returns (predictions frame, errors frame), both keyed on the input row_id.
+    """
+    scored, errors = [], []
+    _score_or_split(chunk, scored, errors)
+    # every row of the chunk may have failed, that is reported like any other bad row
+    predictions = pd.concat(scored, ignore_index=True) if scored else pd.DataFrame(columns=["row_id", "predicted_price"])
+
+    # rows removed by feature engineering (e.g. ARM GPUs) are reported, not silently lost
+    scored_ids = set(predictions["row_id"])
+    failed_ids = {row_id for row_id, _ in errors}
+    for row_id in chunk.index:
+        if row_id not in scored_ids and row_id not in failed_ids:
+            errors.append((row_id, "filtered out during feature engineering"))
+
+    errors = pd.DataFrame(errors, columns=["row_id", "error"]).sort_values("row_id")
+    return predictions, errors
+
+
+class BatchScoring:
+    def __init__(self, config: BatchScoringConfig = None):
+        self.config = config or BatchScoringConfig()
+
+    def _write(self, frame, path, header):
+        frame.to_csv(path, mode='w' if header else 'a', header=header, index=False)
+
+    def initiate_batch_scoring(self, input_path, output_path, errors_path=None):
+        """
+        Streams input_path in chunks through cleaning -> feature engineering -> prediction
+        on a process pool and appends results to output_path in input order.
+        """
+        try:
+            errors_path = errors_path or os.path.splitext(output_path)[0] + "_errors.csv"
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+            start = time.perf_counter()
+            n_scored, n_errors, n_chunks = 0, 0, 0
+            pending = deque()
+            n_written = 0
+
+            def _drain_one():
+                nonlocal n_scored, n_errors, n_written
+                predictions, errors = pending.popleft().result()
+                self._write(predictions, output_path, header=(n_written == 0))
+                self._write(errors, errors_path, header=(n_written == 0))
+                n_scored += len(predictions)
+                n_errors += len(errors)
+                n_written += 1
+
+            with ProcessPoolExecutor(max_workers=self.config.n_workers, initializer=_init_worker) as pool:
+                for chunk in pd.read_csv(input_path, chunksize=self.config.chunk_size):
+                    pending.append(pool.submit(score_chunk, chunk))
+                    n_chunks += 1
+
+                    # results are written strictly in submission order, so output order is deterministic
+                    while len(pending) >= self.config.max_in_flight:
+                        _drain_one()
+
+                while pending:
+                    _drain_one()
+
+            elapsed = time.perf_counter() - start
+            logging.info(f"Batch scoring of {input_path}: {n_scored} rows scored, {n_errors} rows reported in {errors_path}, {n_chunks} chunks in {elapsed:.2f}s")
+            print(f"Scored {n_scored} rows ({n_errors} errors) in {elapsed:.2f}s -> {output_path}")
+
+            return (
+                output_path, errors_path
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a raw listings CSV (laptop_data.csv schema) in bulk.")
+    parser.add_argument("input_path")
+    parser.add_argument("output_path")
+    parser.add_argument("--errors-path", default=None)
+    parser.add_argument("--chunk-size", type=int, default=BatchScoringConfig.chunk_size)
+    parser.add_argument("--workers", type=int, default=BatchScoringConfig.n_workers)
+    args = parser.parse_args()
+
+    config = BatchScoringConfig(chunk_size=args.chunk_size, n_workers=args.workers, max_in_flight=2 * args.workers)
+    BatchScoring(config).initiate_batch_scoring(args.input_path, args.output_path, args.errors_path)
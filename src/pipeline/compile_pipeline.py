@@ -0,0 +1,259 @@
+import os
+import sys
+import time
+import pickle
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+
+from src.utils.exception import CustomException
+from src.utils.artifact_io import read_frame
+from src.utils.logger import logging
+from src.utils.predict_utils import calculate_ppi
+from src.utils.utils import save_obj
+
+FEATURE_COLUMNS = ["company", "typename", "ram", "ppi", "cpu brand", "ssd", "hdd", "gpu_name", "os"]
+
+# sentinel used to probe how an encoder treats unseen categories
+_UNKNOWN_PROBE = "__unknown_category__"
+
+
+@dataclass
+class CompilePipelineConfig:
+    prediction_pipeline_path: str = os.path.join("artifacts", "pipelines", "prediction_pipeline.pkl")
+    compiled_predictor_path: str = os.path.join("artifacts", "pipelines", "compiled_predictor.pkl")
+    parity_data_path: str = os.path.join("artifacts", "post_outlier_treatment.csv")
+
+
+class CompiledPredictor:
+    """
+    Flat, pandas-free version of the fitted prediction pipeline.
+
+    Categorical encoders are replaced by dict lookup tables and StandardScaler
+    by a fused multiply/add (x * inv_scale + offset), so a request goes from raw
+    feature values straight to a float64 row that is fed to the fitted model.
+    """
+
+    def __init__(self, feature_columns, cat_slots, num_slots, n_outputs, model):
+        self.feature_columns = list(feature_columns)
+        # (output position, input position, lookup table, unknown value or None)
+        self.cat_slots = cat_slots
+        # (output positions, input positions, inv_scale vector, offset vector)
+        self.num_slots = num_slots
+        self.n_outputs = n_outputs
+        self.model = model
+
+    def transform_rows(self, rows) -> np.ndarray:
+        """
+        rows: sequence of feature rows, each ordered like feature_columns.
+        Returns the preprocessed float64 matrix.
+        """
+        out = np.empty((len(rows), self.n_outputs), dtype=np.float64)
+
+        for out_pos, in_pos, table, unknown in self.cat_slots:
+            for r, row in enumerate(rows):
+                value = table.get(row[in_pos], unknown)
+                if value is None:
+                    raise ValueError(f"Unknown category {row[in_pos]!r} for feature {self.feature_columns[in_pos]!r}")
+                out[r, out_pos] = value
+
+        for out_pos, in_pos, inv_scale, offset in self.num_slots:
+            values = np.array([[row[i] for i in in_pos] for row in rows], dtype=np.float64)
+            out[:, out_pos] = values * inv_scale + offset
+
+        return out
+
+    def encode_feature(self, feature, values) -> dict:
+        """
+        Encodes a vector of values of one input feature.
+        Returns {output position: encoded float64 array}; every output depends on a single input.
+        """
+        in_pos = self.feature_columns.index(feature)
+        encoded = {}
+
+        for out_pos, pos, table, unknown in self.cat_slots:
+            if pos == in_pos:
+                encoded[out_pos] = np.array([table.get(v, unknown) for v in values], dtype=np.float64)
+
+        for out_positions, positions, inv_scale, offset in self.num_slots:
+            for j, pos in enumerate(positions):
+                if pos == in_pos:
+                    encoded[out_positions[j]] = np.asarray(values, dtype=np.float64) * inv_scale[j] + offset[j]
+
+        return encoded
+
+    def predict_rows(self, rows) -> np.ndarray:
+        return self.model.predict(self.transform_rows(rows))
+
+    def predict_form(self, form) -> float:
+        """
+        Predict (log) price for a single raw form, same fields as CustomData.
+        """
+        features = {
+            "company": form.get('company'),
+            "typename": form.get('typename'),
+            "ram": int(form.get('ram')),
+            "ppi": float(calculate_ppi(form.get('resolution'), float(form.get('screen_size')))),
+            "cpu brand": form.get('cpu_brand'),
+            "ssd": int(form.get('ssd')),
+            "hdd": int(form.get('hdd')),
+            "gpu_name": form.get('gpu_name'),
+            "os": form.get('os')
+        }
+        row = [features[col] for col in self.feature_columns]
+        return self.predict_rows([row])[0]
+
+
+def _encoder_categories(encoder, columns):
+    """
+    Returns {column: list of fitted categories} for sklearn or category_encoders encoders.
+    """
+    if hasattr(encoder, "categories_"):
+        return {col: list(cats) for col, cats in zip(columns, encoder.categories_)}
+
+    if hasattr(encoder, "ordinal_encoder"):
+        return {
+            item["col"]: [cat for cat in item["mapping"].index if not pd.isna(cat)]
+            for item in encoder.ordinal_encoder.category_mapping
+        }
+
+    raise TypeError(f"Unsupported categorical encoder: {type(encoder).__name__}")
+
+
+def _compile_categorical(encoder, columns):
+    """
+    Builds one lookup table per column by running the fitted encoder over its own categories.
+    """
+    categories = _encoder_categories(encoder, columns)
+    n_rows = max(len(cats) for cats in categories.values())
+
+    # pad every column to the same length by repeating its first category
+    probe = pd.DataFrame({
+        col: categories[col] + [categories[col][0]] * (n_rows - len(categories[col]))
+        for col in columns
+    })
+    encoded = np.asarray(encoder.transform(probe), dtype=np.float64)
+
+    try:
+        unknown_row = np.asarray(encoder.transform(pd.DataFrame({col: [_UNKNOWN_PROBE] for col in columns})), dtype=np.float64)[0]
+    except Exception:
+        unknown_row = [None] * len(columns)
+
+    tables = []
+    for j, col in enumerate(columns):
+        table = {cat: float(encoded[i, j]) for i, cat in enumerate(categories[col])}
+        unknown = unknown_row[j]
+        tables.append((col, table, None if unknown is None else float(unknown)))
+    return tables
+
+
+def compile_pipeline(pipeline, feature_columns=FEATURE_COLUMNS) -> CompiledPredictor:
+    """
+    Turns a fitted Pipeline(preprocessor=ColumnTransformer, model=...) into a CompiledPredictor.
+    """
+    try:
+        preprocessor = pipeline.named_steps["preprocessor"]
+        model = pipeline.named_steps["model"]
+        index = {col: i for i, col in enumerate(feature_columns)}
+
+        cat_slots, num_slots = [], []
+        out_pos = 0
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            columns = [feature_columns[c] if isinstance(c, (int, np.integer)) else c for c in columns]
+            positions = list(range(out_pos, out_pos + len(columns)))
+            in_pos = [index[col] for col in columns]
+
+            if transformer == "passthrough":
+                num_slots.append((positions, in_pos, np.ones(len(columns)), np.zeros(len(columns))))
+            elif hasattr(transformer, "mean_") or hasattr(transformer, "scale_"):
+                mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+                inv_scale = 1.0 / scale
+                num_slots.append((positions, in_pos, inv_scale, -mean * inv_scale))
+            else:
+                for pos, (col, table, unknown) in zip(positions, _compile_categorical(transformer, columns)):
+                    cat_slots.append((pos, index[col], table, unknown))
+
+            out_pos += len(columns)
+
+        logging.info(f"Compiled pipeline into {out_pos} output features ({len(cat_slots)} lookup tables)")
+        return CompiledPredictor(feature_columns, cat_slots, num_slots, out_pos, model)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def check_parity(compiled: CompiledPredictor, pipeline, X: pd.DataFrame, atol=1e-9) -> float:
+    """
+    Scores X with both the sklearn pipeline and the compiled predictor.
+    Returns the max absolute difference; raises if it exceeds atol.
+    """
+    expected = pipeline.predict(X[compiled.feature_columns])
+    actual = compiled.predict_rows(X[compiled.feature_columns].values.tolist())
+    max_diff = float(np.max(np.abs(expected - actual)))
+
+    if max_diff > atol:
+        raise AssertionError(f"Compiled predictor differs from sklearn pipeline by {max_diff}")
+    return max_diff
+
+
+def compare_latency(compiled: CompiledPredictor, pipeline, X: pd.DataFrame, n_iter=200) -> dict:
+    """
+    Mean single-row latency (microseconds) of the sklearn pipeline vs the compiled predictor.
+    """
+    rows = X[compiled.feature_columns].values.tolist()
+    frames = [X.iloc[[i % len(X)]][compiled.feature_columns] for i in range(n_iter)]
+
+    start = time.perf_counter()
+    for frame in frames:
+        pipeline.predict(frame)
+    sklearn_us = (time.perf_counter() - start) / n_iter * 1e6
+
+    start = time.perf_counter()
+    for i in range(n_iter):
+        compiled.predict_rows([rows[i % len(rows)]])
+    compiled_us = (time.perf_counter() - start) / n_iter * 1e6
+
+    return {
+        "sklearn_us": round(sklearn_us, 2),
+        "compiled_us": round(compiled_us, 2),
+        "speedup": round(sklearn_us / compiled_us, 2)
+    }
+
+
+class CompilePipeline:
+    def __init__(self):
+        self.config = CompilePipelineConfig()
+
+    def initiate_compile(self):
+        try:
+            pipeline = pickle.load(open(self.config.prediction_pipeline_path, 'rb'))
+            logging.info(f"Loaded prediction pipeline from {self.config.prediction_pipeline_path}")
+
+            compiled = compile_pipeline(pipeline)
+
+            df = read_frame(self.config.parity_data_path)
+            X = df.drop(columns=['price', "weight"])
+
+            max_diff = check_parity(compiled, pipeline, X)
+            latency = compare_latency(compiled, pipeline, X)
+            logging.info(f"Compiled predictor parity max abs diff: {max_diff}, latency: {latency}")
+            print(f"Parity max abs diff: {max_diff}")
+            print(f"Single-row latency: {latency}")
+
+            os.makedirs(os.path.dirname(self.config.compiled_predictor_path), exist_ok=True)
+            save_obj(self.config.compiled_predictor_path, compiled)
+
+            return (
+                self.config.compiled_predictor_path
+            )
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    CompilePipeline().initiate_compile()
@@ -0,0 +1,212 @@
+import os
+import sys
+import time
+import json
+import queue
+import threading
+import contextlib
+import numpy as np
+import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from src.utils.exception import CustomException
+from src.utils.artifact_io import read_frame
+from src.utils.logger import logging
+
+
+@dataclass
+class MicroBatcherConfig:
+    max_batch_size: int = int(os.environ.get("MICRO_BATCH_SIZE", 32))
+    max_wait_us: int = int(os.environ.get("MICRO_BATCH_WAIT_US", 2000))
+    benchmark_data_path: str = os.path.join("artifacts", "post_outlier_treatment.csv")
+
+
+class MicroBatcher:
+    """
+    Queues single-row prediction requests from concurrent callers and runs them
+    through one predict_fn call per batch on a worker thread.
+
+    A batch is flushed when it reaches max_batch_size rows or when max_wait_us has
+    passed since its first request arrived, whichever comes first. It is flushed at
+    once when no other caller is on its way (see expect), so a lone request, e.g.
+    on a sync gunicorn worker, never waits for a batch that can't fill.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_us=2000):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_us / 1e6
+        self._queue = queue.Queue()
+        # callers inside expect() that haven't got their result yet
+        self._expected = 0
+        self._expected_lock = threading.Lock()
+        self._local = threading.local()
+        self.batches = 0
+        self.rows = 0
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, df: pd.DataFrame) -> Future:
+        future = Future()
+        self._queue.put((df, future))
+        return future
+
+    @contextlib.contextmanager
+    def expect(self):
+        """
+        Announces a caller that is about to predict (counted once per thread, however
+        deeply nested). Entering it at the start of a request, before parsing, lets the
+        worker wait for that request instead of flushing without it.
+        """
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            with self._expected_lock:
+                self._expected += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._expected_lock:
+                    self._expected -= 1
+
+    def predict(self, df: pd.DataFrame):
+        with self.expect():
+            return self.submit(df).result()
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join()
+
+    def _collect(self, first):
+        batch = [first]
+        n_rows = len(first[0])
+        deadline = time.perf_counter() + self.max_wait
+        stop = False
+
+        while n_rows < self.max_batch_size:
+            # nothing queued and nobody else on the way: waiting can't grow the batch
+            if self._queue.empty() and self._expected <= len(batch):
+                break
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+            n_rows += len(item[0])
+
+        return batch, stop
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch, stop = self._collect(first)
+            frames = [df for df, _ in batch]
+
+            try:
+                preds = np.asarray(self.predict_fn(pd.concat(frames, ignore_index=True)))
+            except Exception:
+                # one bad request (e.g. an unknown category) must not fail the others
+                # merged with it: retry each request alone, errors go to their own caller
+                logging.warning(f"Batch of {len(batch)} requests failed, predicting them one by one.")
+                for df, future in batch:
+                    try:
+                        future.set_result(np.asarray(self.predict_fn(df)))
+                    except Exception as e:
+                        future.set_exception(e)
+            else:
+                # fan the results back out to each caller in submission order
+                offset = 0
+                for df, future in batch:
+                    future.set_result(preds[offset:offset + len(df)])
+                    offset += len(df)
+
+            self.batches += 1
+            self.rows += sum(len(df) for df in frames)
+
+            if stop:
+                return
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_us": int(self.max_wait * 1e6),
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else None
+        }
+
+
+def _run_load(predict_fn, frames, concurrency) -> dict:
+    """
+    Fires every one-row frame at predict_fn from `concurrency` threads and
+    returns p50/p99 latency (ms) and throughput (requests/sec).
+    """
+    latencies = []
+
+    def _call(df):
+        start = time.perf_counter()
+        predict_fn(df)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_call, frames))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "throughput_rps": round(len(frames) / elapsed, 2)
+    }
+
+
+def benchmark(pipeline, X: pd.DataFrame, n_requests=500, concurrency_levels=(1, 8, 32), config: MicroBatcherConfig = None) -> list:
+    """
+    Compares the per-request path against the micro-batched path on the raw pipeline
+    (no prediction cache, so every request really hits the model).
+    """
+    try:
+        config = config or MicroBatcherConfig()
+        frames = [X.iloc[[i % len(X)]] for i in range(n_requests)]
+        results = []
+
+        for concurrency in concurrency_levels:
+            direct = _run_load(pipeline.predict, frames, concurrency)
+
+            batcher = MicroBatcher(pipeline.predict, config.max_batch_size, config.max_wait_us)
+            batched = _run_load(batcher.predict, frames, concurrency)
+            batch_stats = batcher.stats()
+            batcher.close()
+
+            results.append({
+                "concurrency": concurrency,
+                "direct": direct,
+                "micro_batched": {**batched, "mean_batch_size": batch_stats["mean_batch_size"]}
+            })
+            logging.info(f"micro-batch benchmark at concurrency {concurrency}: direct={direct}, batched={batched}")
+
+        return results
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    from src.pipeline.predict_pipeline import FEATURE_COLUMNS, registry
+
+    config = MicroBatcherConfig()
+    X = read_frame(config.benchmark_data_path)[FEATURE_COLUMNS]
+    print(json.dumps(benchmark(registry.active.pipeline, X, config=config), indent=2))
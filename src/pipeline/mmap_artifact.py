@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator
+from sklearn.pipeline import Pipeline
+
+from src.pipeline.compile_pipeline import FEATURE_COLUMNS, compile_pipeline
+from src.utils.exception import CustomException
+from src.utils.logger import logging
+
+# directory name of the mmap artifact inside a registry version directory
+MMAP_DIR_NAME = "mmap"
+
+TREE_ARRAYS = ["feature", "threshold", "left", "right", "value"]
+
+
+def _sklearn_trees(estimators, scale):
+    """
+    Yields (feature, threshold, left, right, value) per fitted sklearn tree, values multiplied by scale.
+    """
+    for estimator in estimators:
+        tree = estimator.tree_
+        yield (tree.feature, tree.threshold, tree.children_left, tree.children_right,
+               tree.value.reshape(-1) * scale)
+
+
+def _xgboost_trees(booster):
+    """
+    Yields the same per-tree arrays from an XGBoost booster's JSON dump.
+    """
+    for dump in booster.get_dump(dump_format="json"):
+        nodes = {}
+        stack = [json.loads(dump)]
+        while stack:
+            node = stack.pop()
+            nodes[node["nodeid"]] = node
+            stack.extend(node.get("children", []))
+
+        n = max(nodes) + 1
+        feature = np.zeros(n, dtype=np.int64)
+        threshold = np.zeros(n, dtype=np.float64)
+        left = np.full(n, -1, dtype=np.int64)
+        right = np.full(n, -1, dtype=np.int64)
+        value = np.zeros(n, dtype=np.float64)
+
+        for nodeid, node in nodes.items():
+            if "leaf" in node:
+                value[nodeid] = node["leaf"]
+            else:
+                feature[nodeid] = int(node["split"].lstrip("f"))
+                threshold[nodeid] = np.float32(node["split_condition"])
+                left[nodeid], right[nodeid] = node["yes"], node["no"]
+
+        yield feature, threshold, left, right, value
+
+
+def _flatten_model(model):
+    """
+    Flattens a fitted regressor into {array name: ndarray} plus metadata.
+    Every tree's node indices are shifted to global positions and leaves point to
+    themselves, so evaluation is a fixed number of vectorized steps with no leaf checks.
+    """
+    name = type(model).__name__
+
+    if hasattr(model, "coef_") and hasattr(model, "intercept_") and not hasattr(model, "support_"):
+        return {"coef": np.asarray(model.coef_, dtype=np.float64).reshape(-1)}, \
+            {"kind": "linear", "base": float(np.ravel(model.intercept_)[0])}
+
+    if name == "RandomForestRegressor" or name == "ExtraTreesRegressor":
+        trees, base, rule = _sklearn_trees(model.estimators_, 1.0 / len(model.estimators_)), 0.0, "le"
+    elif name == "GradientBoostingRegressor":
+        if not hasattr(model.init_, "constant_"):
+            raise ValueError("Only GradientBoostingRegressor with the default (mean) init is supported")
+        trees = _sklearn_trees(model.estimators_[:, 0], model.learning_rate)
+        base, rule = float(np.ravel(model.init_.constant_)[0]), "le"
+    elif name == "DecisionTreeRegressor":
+        trees, base, rule = _sklearn_trees([model], 1.0), 0.0, "le"
+    elif name == "XGBRegressor":
+        booster = model.get_booster()
+        config = json.loads(booster.save_config())
+        base = float(config["learner"]["learner_model_param"]["base_score"].strip("[]"))
+        trees, rule = _xgboost_trees(booster), "lt"
+    else:
+        raise ValueError(f"{name} has no mmap artifact format, keep serving it from the pickle")
+
+    parts = {key: [] for key in TREE_ARRAYS}
+    roots, offset, max_depth = [], 0, 0
+    for feature, threshold, left, right, value in trees:
+        n = len(feature)
+        is_leaf = left < 0
+        nodes = np.arange(n)
+        parts["feature"].append(np.where(is_leaf, 0, feature).astype(np.int32))
+        parts["threshold"].append(np.asarray(threshold, dtype=np.float64))
+        parts["left"].append((np.where(is_leaf, nodes, left) + offset).astype(np.int32))
+        parts["right"].append((np.where(is_leaf, nodes, right) + offset).astype(np.int32))
+        parts["value"].append(np.asarray(value, dtype=np.float64))
+        roots.append(offset)
+        max_depth = max(max_depth, _depth(left, right))
+        offset += n
+
+    arrays = {key: np.concatenate(values) for key, values in parts.items()}
+    arrays["roots"] = np.array(roots, dtype=np.int32)
+    return arrays, {"kind": "trees", "base": base, "split_rule": rule, "max_depth": max_depth, "n_trees": len(roots)}
+
+
+def _depth(left, right):
+    depth, frontier = 0, [0]
+    while True:
+        children = [c for node in frontier for c in (left[node], right[node]) if c >= 0]
+        if not children:
+            return depth
+        depth += 1
+        frontier = children
+
+
+def _predict_only_error(estimator):
+    return TypeError(f"{type(estimator).__name__} is a predict-only mmap artifact, refit the sklearn pipeline and re-export")
+
+
+class TreeEnsemble(BaseEstimator):
+    """
+    Predictor over flat (possibly memory-mapped) model arrays.
+    All trees are walked together: node ids of shape (rows, trees) advance one level per step.
+
+    An sklearn estimator only so it can sit in a Pipeline: __init__ just stores its
+    params (get_params / clone work), and fit raises, there is nothing to fit.
+    """
+
+    def __init__(self, arrays=None, meta=None):
+        self.arrays = arrays
+        self.meta = meta
+
+    @property
+    def n_trees_(self):
+        return self.meta.get("n_trees", 0) if self.meta else 0
+
+    def fit(self, X, y=None):
+        raise _predict_only_error(self)
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.meta["kind"] == "linear":
+            return X @ self.arrays["coef"] + self.meta["base"]
+
+        a = self.arrays
+        # both sklearn and xgboost compare features in float32
+        X = X.astype(np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(a["roots"], (len(X), len(a["roots"])))
+
+        for _ in range(self.meta["max_depth"]):
+            x = X[rows, a["feature"][node]]
+            go_left = x < a["threshold"][node] if self.meta["split_rule"] == "lt" else x <= a["threshold"][node]
+            node = np.where(go_left, a["left"][node], a["right"][node])
+
+        return a["value"][node].sum(axis=1) + self.meta["base"]
+
+
+class FrameEncoder(BaseEstimator):
+    """
+    Vectorized DataFrame -> float64 matrix transform over the exported encoder tables.
+    Transform-only, like TreeEnsemble.
+    """
+
+    def __init__(self, encoder=None):
+        self.encoder = encoder
+
+    @property
+    def n_outputs_(self):
+        return self.encoder["n_outputs"] if self.encoder else 0
+
+    def fit(self, X, y=None):
+        raise _predict_only_error(self)
+
+    def __sklearn_is_fitted__(self):
+        return True
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        out = np.empty((len(df), self.encoder["n_outputs"]), dtype=np.float64)
+
+        for slot in self.encoder["cat_slots"]:
+            codes = df[slot["feature"]].map(slot["index"])
+            if codes.isna().any() and slot["unknown"] is None:
+                raise ValueError(f"Unknown category for feature {slot['feature']!r}")
+            values = np.append(slot["values"], slot["unknown"] if slot["unknown"] is not None else np.nan)
+            out[:, slot["out_pos"]] = values[codes.fillna(len(slot["values"])).to_numpy(dtype=np.int64)]
+
+        for slot in self.encoder["num_slots"]:
+            out[:, slot["out_pos"]] = df[slot["features"]].to_numpy(dtype=np.float64) * slot["inv_scale"] + slot["offset"]
+
+        return out
+
+
+def export_mmap_artifact(pipeline, out_dir, feature_columns=FEATURE_COLUMNS):
+    """
+    Writes the fitted pipeline as flat .npy buffers (tree arrays, encoder values, scaler vectors)
+    plus a small meta.json. Raises ValueError for models without a flat format (e.g. SVR).
+    """
+    try:
+        compiled = compile_pipeline(pipeline, feature_columns)
+        arrays, model_meta = _flatten_model(compiled.model)
+
+        cat_slots = []
+        for i, (out_pos, in_pos, table, unknown) in enumerate(compiled.cat_slots):
+            arrays[f"cat_{i}_values"] = np.array(list(table.values()), dtype=np.float64)
+            cat_slots.append({"out_pos": out_pos, "feature": feature_columns[in_pos],
+                              "categories": list(table.keys()), "unknown": unknown})
+
+        num_slots = []
+        for i, (out_pos, in_pos, inv_scale, offset) in enumerate(compiled.num_slots):
+            arrays[f"num_{i}_inv_scale"] = np.asarray(inv_scale, dtype=np.float64)
+            arrays[f"num_{i}_offset"] = np.asarray(offset, dtype=np.float64)
+            num_slots.append({"out_pos": list(out_pos), "features": [feature_columns[p] for p in in_pos]})
+
+        os.makedirs(out_dir, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(out_dir, f"{name}.npy"), np.ascontiguousarray(array))
+
+        meta = {
+            "feature_columns": list(feature_columns),
+            "n_outputs": compiled.n_outputs,
+            "model": model_meta,
+            "cat_slots": cat_slots,
+            "num_slots": num_slots
+        }
+        with open(os.path.join(out_dir, "meta.json"), "w") as file:
+            json.dump(meta, file, indent=2, default=lambda v: v.item() if hasattr(v, "item") else str(v))
+
+        logging.info(f"mmap artifact written to {out_dir} ({sum(a.nbytes for a in arrays.values()) / 1e6:.2f} MB)")
+        return out_dir
+
+    except ValueError:
+        raise
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def load_mmap_pipeline(artifact_dir) -> Pipeline:
+    """
+    Rebuilds a predict-only Pipeline(preprocessor, model) on top of read-only memory-mapped
+    buffers. Every worker mapping the same files shares the same physical pages.
+    """
+    with open(os.path.join(artifact_dir, "meta.json")) as file:
+        meta = json.load(file)
+
+    def _map(name):
+        return np.load(os.path.join(artifact_dir, f"{name}.npy"), mmap_mode="r")
+
+    model_meta = meta["model"]
+    if model_meta["kind"] == "linear":
+        arrays = {"coef": _map("coef")}
+    else:
+        arrays = {name: _map(name) for name in TREE_ARRAYS + ["roots"]}
+
+    encoder = {
+        "n_outputs": meta["n_outputs"],
+        "cat_slots": [
+            {**slot, "index": {cat: i for i, cat in enumerate(slot["categories"])}, "values": _map(f"cat_{i}_values")}
+            for i, slot in enumerate(meta["cat_slots"])
+        ],
+        "num_slots": [
+            {**slot, "inv_scale": _map(f"num_{i}_inv_scale"), "offset": _map(f"num_{i}_offset")}
+            for i, slot in enumerate(meta["num_slots"])
+        ]
+    }
+
+    return Pipeline(steps=[("preprocessor", FrameEncoder(encoder)), ("model", TreeEnsemble(arrays, model_meta))])
+
+
+if __name__ == "__main__":
+    # export an existing registry version (or the flat legacy files): python -m src.pipeline.mmap_artifact [version_dir]
+    import pickle
+
+    version_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join("artifacts", "pipelines")
+    pipeline = pickle.load(open(os.path.join(version_dir, "prediction_pipeline.pkl"), 'rb'))
+    print(export_mmap_artifact(pipeline, os.path.join(version_dir, MMAP_DIR_NAME)))
@@ -0,0 +1,306 @@
+import os
+import sys
+import time
+import pickle
+import shutil
+import threading
+import dataclasses
+import pandas as pd
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.pipeline.mmap_artifact import MMAP_DIR_NAME, export_mmap_artifact, load_mmap_pipeline
+from src.pipeline.price_table import PriceTable, PriceTableConfig
+from src.utils.exception import CustomException
+from src.utils.logger import logging
+from src.utils.utils import save_obj
+
+
+@dataclass
+class ModelRegistryConfig:
+    pipelines_dir: str = os.path.join("artifacts", "pipelines")
+    prediction_pipeline_file: str = "prediction_pipeline.pkl"
+    preprocessor_file: str = "best_preprocessor_pipeline.pkl"
+    # version name used for the flat (unversioned) files directly under pipelines_dir
+    legacy_version: str = "legacy"
+    # "mmap" serves from the memory-mapped artifact in <version>/mmap/ when one was exported,
+    # so every worker shares one copy of the tree arrays instead of unpickling its own
+    model_format: str = os.environ.get("MODEL_FORMAT", "pickle")
+    # load <version>/price_table.npy alongside the model (SERVING_MODE=table)
+    load_price_table: bool = os.environ.get("SERVING_MODE") == "table"
+
+
+# a few representative rows used to warm a freshly loaded model before it takes traffic
+WARMUP_ROWS = pd.DataFrame([
+    {"company": "Dell", "typename": "Notebook", "ram": 8, "ppi": 141.21, "cpu brand": "Intel Core i5",
+     "ssd": 256, "hdd": 0, "gpu_name": "Intel", "os": "Windows"},
+    {"company": "Apple", "typename": "Ultrabook", "ram": 16, "ppi": 226.98, "cpu brand": "Intel Core i7",
+     "ssd": 512, "hdd": 0, "gpu_name": "AMD", "os": "Mac"},
+    {"company": "Lenovo", "typename": "Gaming", "ram": 16, "ppi": 141.21, "cpu brand": "Intel Core i7",
+     "ssd": 256, "hdd": 1024, "gpu_name": "Nvidia", "os": "Windows"},
+])
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    version: str
+    pipeline: object
+    preprocessor: object
+    loaded_at: datetime
+    load_seconds: float
+    # built from this very model, None if not loaded or not built (yet)
+    price_table: object = None
+
+
+class ModelRegistry:
+    """
+    Holds versioned prediction pipelines under artifacts/pipelines/<version>/.
+
+    The active model is an immutable LoadedModel swapped by a single reference
+    assignment, so requests that already grabbed the old one finish on it while
+    new requests see the new version.
+    """
+
+    def __init__(self, config: ModelRegistryConfig = None):
+        self.config = config or ModelRegistryConfig()
+        self._active = None
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        # every load_version call gets a sequence number, only the newest request may swap
+        self._load_seq = 0
+        # version explicitly asked for (e.g. a rollback), the watcher leaves it in place
+        self._pinned = None
+        # newest published version the watcher (or a latest load) has already acted on
+        self._seen_latest = None
+
+    def list_versions(self):
+        versions = []
+        if os.path.isdir(self.config.pipelines_dir):
+            for name in sorted(os.listdir(self.config.pipelines_dir)):
+                if name.startswith("."):
+                    continue
+                if os.path.isfile(os.path.join(self.config.pipelines_dir, name, self.config.prediction_pipeline_file)):
+                    versions.append(name)
+        return versions
+
+    def latest_version(self):
+        versions = self.list_versions()
+        if versions:
+            return versions[-1]
+        if os.path.isfile(os.path.join(self.config.pipelines_dir, self.config.prediction_pipeline_file)):
+            return self.config.legacy_version
+        return None
+
+    def has_version(self, version) -> bool:
+        if version == self.config.legacy_version:
+            return os.path.isfile(os.path.join(self.config.pipelines_dir, self.config.prediction_pipeline_file))
+        return version in self.list_versions()
+
+    def _is_newer(self, version, than):
+        # version names are timestamps, the flat legacy files predate all of them
+        if than is None:
+            return True
+        if version == self.config.legacy_version:
+            return False
+        return than == self.config.legacy_version or version > than
+
+    def version_dir(self, version):
+        if version == self.config.legacy_version:
+            return self.config.pipelines_dir
+        return os.path.join(self.config.pipelines_dir, version)
+
+    def _load(self, version) -> LoadedModel:
+        start = time.perf_counter()
+        version_dir = self.version_dir(version)
+
+        mmap_dir = os.path.join(version_dir, MMAP_DIR_NAME)
+        if self.config.model_format == "mmap" and os.path.isfile(os.path.join(mmap_dir, "meta.json")):
+            pipeline = load_mmap_pipeline(mmap_dir)
+        else:
+            pipeline = pickle.load(open(os.path.join(version_dir, self.config.prediction_pipeline_file), 'rb'))
+        preprocessor_path = os.path.join(version_dir, self.config.preprocessor_file)
+        preprocessor = pipeline.named_steps["preprocessor"]
+        if self.config.model_format != "mmap" and os.path.isfile(preprocessor_path):
+            preprocessor = pickle.load(open(preprocessor_path, 'rb'))
+
+        # warm the model so the first real request doesn't pay for lazy initialisation
+        pipeline.predict(WARMUP_ROWS)
+
+        return LoadedModel(
+            version=version,
+            pipeline=pipeline,
+            preprocessor=preprocessor,
+            loaded_at=datetime.now(),
+            load_seconds=round(time.perf_counter() - start, 4),
+            price_table=self._load_price_table(version)
+        )
+
+    def _load_price_table(self, version):
+        if not self.config.load_price_table:
+            return None
+        version_dir = self.version_dir(version)
+        if not os.path.isfile(PriceTableConfig().paths(version_dir)[0]):
+            logging.info(f"No price table for model version {version}, serving it from the model")
+            return None
+        return PriceTable.load(version_dir)
+
+    def attach_price_table(self):
+        """
+        The table is built after a version is published: attach it to the active model
+        once it shows up in that version's directory.
+        """
+        active = self._active
+        if active is None or active.price_table is not None:
+            return None
+        price_table = self._load_price_table(active.version)
+        if price_table is None:
+            return None
+        with self._lock:
+            if self._active is not active:
+                return None
+            self._active = dataclasses.replace(active, price_table=price_table)
+        logging.info(f"Attached price table to model version {active.version}")
+        return self._active
+
+    def load_version(self, version=None, background=False):
+        """
+        Loads and warms `version` (latest if None) and makes it the active model.
+        An explicitly requested version is pinned: the watcher won't swap it out when it
+        sees a newer one, until load_version is called again without a version.
+        With background=True the load runs in a thread and the current model keeps serving;
+        when several loads overlap, only the most recently requested one is activated.
+        """
+        pin = version is not None
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f"No prediction pipeline found under {self.config.pipelines_dir}")
+        if not self.has_version(version):
+            raise FileNotFoundError(f"Unknown model version {version!r}, available: {self.list_versions()}")
+
+        with self._lock:
+            self._load_seq += 1
+            seq = self._load_seq
+            if not pin and self._is_newer(version, self._seen_latest):
+                self._seen_latest = version
+
+        def _load_and_swap():
+            try:
+                loaded = self._load(version)
+                with self._lock:
+                    if seq != self._load_seq:
+                        logging.info(f"Discarding model version {version}: a newer load was requested while it loaded")
+                        return
+                    previous = self._active
+                    self._active = loaded
+                    self._pinned = version if pin else None
+                logging.info(f"Activated model version {version}{' (pinned)' if pin else ''} (loaded in {loaded.load_seconds}s, previous: {previous.version if previous else None})")
+            except Exception as e:
+                logging.error(f"Failed to load model version {version}, keeping the active model.", exc_info=True)
+                if not background:
+                    raise CustomException(e, sys)
+
+        if background:
+            thread = threading.Thread(target=_load_and_swap, name=f"model-load-{version}", daemon=True)
+            thread.start()
+            return thread
+
+        _load_and_swap()
+        return self._active
+
+    def reload_if_changed(self, background=True):
+        """
+        Loads the latest version when one newer than the last seen has been published,
+        unless a version was pinned explicitly. Otherwise attaches the active version's
+        price table if it was built since the version was loaded.
+        """
+        latest = self.latest_version()
+        if latest is None or not self._is_newer(latest, self._seen_latest):
+            return self.attach_price_table() if self.config.load_price_table else None
+        self._seen_latest = latest
+
+        if self._pinned is not None:
+            logging.info(f"Model version {latest} published, staying on pinned version {self._pinned}")
+            return None
+        active = self._active
+        if active is not None and active.version == latest:
+            return None
+        return self.load_version(background=background)
+
+    def start_watching(self, interval_seconds=30):
+        """
+        Polls pipelines_dir and hot-swaps in new versions as they are published.
+        """
+        # a watcher inherited through fork is a dead thread object, start a new one
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+
+        def _watch():
+            while not self._stop_watching.wait(interval_seconds):
+                seen_latest = self._seen_latest
+                try:
+                    self.reload_if_changed(background=False)
+                except Exception:
+                    # a corrupt or half-copied version must not end hot reload for the
+                    # process: keep serving the active model and retry on the next poll
+                    self._seen_latest = seen_latest
+                    logging.error("Model registry watcher could not load the latest version, retrying on the next poll")
+
+        self._watcher = threading.Thread(target=_watch, name="model-registry-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stop_watching(self):
+        self._stop_watching.set()
+
+    @property
+    def active(self) -> LoadedModel:
+        active = self._active
+        if active is None:
+            with self._lock:
+                if self._active is None:
+                    self._active = self._load(self.latest_version() or self.config.legacy_version)
+                active = self._active
+        return active
+
+    def status(self) -> dict:
+        active = self._active
+        return {
+            "active_version": active.version if active else None,
+            "pinned_version": self._pinned,
+            "price_table": active.price_table is not None if active else None,
+            "loaded_at": active.loaded_at.isoformat() if active else None,
+            "load_seconds": active.load_seconds if active else None,
+            "available_versions": self.list_versions()
+        }
+
+
+def publish_version(pipeline, preprocessor, config: ModelRegistryConfig = None, version=None) -> str:
+    """
+    Saves a trained pipeline as a new version directory that running registries can pick up.
+    Files are written to a temporary directory first and renamed, so a watcher never sees half a version.
+    """
+    try:
+        config = config or ModelRegistryConfig()
+        version = version or datetime.now().strftime('%Y%m%d_%H%M%S')
+        version_dir = os.path.join(config.pipelines_dir, version)
+        tmp_dir = os.path.join(config.pipelines_dir, f".{version}.tmp")
+
+        os.makedirs(tmp_dir, exist_ok=True)
+        save_obj(os.path.join(tmp_dir, config.prediction_pipeline_file), pipeline)
+        save_obj(os.path.join(tmp_dir, config.preprocessor_file), preprocessor)
+
+        try:
+            export_mmap_artifact(pipeline, os.path.join(tmp_dir, MMAP_DIR_NAME))
+        except ValueError as e:
+            logging.info(f"No mmap artifact for version {version}: {e}")
+
+        if os.path.isdir(version_dir):
+            shutil.rmtree(version_dir)
+        os.rename(tmp_dir, version_dir)
+
+        logging.info(f"Published model version {version} at {version_dir}")
+        return version
+
+    except Exception as e:
+        raise CustomException(e, sys)
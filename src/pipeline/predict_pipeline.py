@@ -1,25 +1,72 @@
 import os
+import time
+import numpy as np
 import pandas as pd
-import pickle
 
-from src.utils.predict_utils import calculate_ppi
+from src.pipeline.model_registry import ModelRegistry
+from src.pipeline.prediction_cache import PredictionCache, row_key
+from src.utils.metrics import metrics
+from src.utils.predict_utils import calculate_ppi, calculate_ppi_vectorized
 
-PREPROCESSOR_PATH = os.path.join("artifacts", "pipelines", "best_preprocessor_pipeline.pkl")
-PREDICT_PATH  = os.path.join("artifacts", "pipelines", "prediction_pipeline.pkl")
+# versioned pipelines under artifacts/pipelines/, loaded on first use or via registry.load_version()
+registry = ModelRegistry()
 
-print (f"Loading preprocessor from: {PREPROCESSOR_PATH}")
-print (f"Loading prediction model from: {PREDICT_PATH}")
-preprocessor = pickle.load(open(PREPROCESSOR_PATH, 'rb'))
-predict_pipeline = pickle.load(open(PREDICT_PATH, 'rb'))
+# LRU cache of single-row predictions, cleared whenever the active model version changes
+prediction_cache = PredictionCache(max_size=int(os.environ.get("PREDICTION_CACHE_SIZE", 4096)))
+
+# raw input fields (as posted by the form) and the model feature columns
+FORM_FIELDS = ["company", "typename", "ram", "screen_size", "resolution", "cpu_brand", "ssd", "hdd", "gpu_name", "os"]
+FEATURE_COLUMNS = ["company", "typename", "ram", "ppi", "cpu brand", "ssd", "hdd", "gpu_name", "os"]
 
 
 def predict(input_data):
-    print(preprocessor.get_feature_names_out())
-    # processed_data = preprocessor.transform(input_data)
-    print(predict_pipeline)
-    preds = predict_pipeline.predict(input_data)
+    model = registry.active
+    start = time.perf_counter()
+
+    keys = [row_key(row) for row in input_data[FEATURE_COLUMNS].itertuples(index=False, name=None)]
+    preds = np.empty(len(keys), dtype=np.float64)
+
+    # only rows not already cached for this model version go to the model
+    missing = []
+    for i, key in enumerate(keys):
+        cached = prediction_cache.get(key, model.version)
+        if cached is None:
+            missing.append(i)
+        else:
+            preds[i] = cached
+    start = metrics.since("cache_lookup", start)
+
+    if missing:
+        # preprocessor and model timed separately; equivalent to model.pipeline.predict
+        processed_data = model.pipeline[:-1].transform(input_data.iloc[missing])
+        start = metrics.since("preprocessor", start)
+        fresh = model.pipeline[-1].predict(processed_data)
+        metrics.since("model", start)
+        for i, value in zip(missing, fresh):
+            preds[i] = value
+            prediction_cache.put(keys[i], float(value), model.version)
+
     return preds
 
+def predict_batch(records):
+    """
+    Score N raw records (list of dicts or a DataFrame with the form fields)
+    with a single model call.
+    Returns (log-price predictions, batch stats dict with rows, seconds and rows_per_sec).
+    """
+    start = time.perf_counter()
+
+    df = get_batch_as_dataframe(records)
+    preds = registry.active.pipeline.predict(df)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": len(df),
+        "seconds": round(elapsed, 6),
+        "rows_per_sec": round(len(df) / elapsed, 2) if elapsed > 0 else None
+    }
+    return preds, stats
+
 class CustomData:
     def __init__(self, form):
         # Collect inputs
@@ -34,20 +81,55 @@ class CustomData:
         self.gpu_name = form.get('gpu_name')
         self.os_type = form.get('os')
         
-def get_data_as_dataframe(data:CustomData):
+def get_data_as_dict(data:CustomData):
     
-    data = {
+    start = time.perf_counter()
+    ppi = float(calculate_ppi(data.resolution,float(data.screen_size)))
+    metrics.since("calculate_ppi", start)
+
+    return {
         "company": data.company,
         "typename": data.typename,
         "ram": int(data.ram),
-        "ppi": float(calculate_ppi(data.resolution,float(data.screen_size))),
+        "ppi": ppi,
         "cpu brand": data.cpu_brand,
         "ssd": int(data.ssd),
         "hdd": int(data.hdd),
         "gpu_name": data.gpu_name,
         "os": data.os_type
     }
+
+def get_data_as_dataframe(data:CustomData):
     
+    data = get_data_as_dict(data)
+
+    start = time.perf_counter()
     df = pd.DataFrame([data])
+    metrics.since("dataframe", start)
     
-    return df
\ No newline at end of file
+    return df
+
+def get_batch_as_dataframe(records):
+    """
+    Batch counterpart of get_data_as_dataframe: builds the feature frame
+    column-wise in one pass instead of one CustomData per record.
+    """
+    raw = records if isinstance(records, pd.DataFrame) else pd.DataFrame.from_records(records)
+
+    missing = [field for field in FORM_FIELDS if field not in raw.columns]
+    if missing:
+        raise ValueError(f"Missing fields in batch records: {missing}")
+
+    df = pd.DataFrame({
+        "company": raw["company"].astype(str),
+        "typename": raw["typename"].astype(str),
+        "ram": pd.to_numeric(raw["ram"]).astype(int),
+        "ppi": calculate_ppi_vectorized(raw["resolution"], pd.to_numeric(raw["screen_size"]).astype(float)),
+        "cpu brand": raw["cpu_brand"].astype(str),
+        "ssd": pd.to_numeric(raw["ssd"]).astype(int),
+        "hdd": pd.to_numeric(raw["hdd"]).astype(int),
+        "gpu_name": raw["gpu_name"].astype(str),
+        "os": raw["os"].astype(str)
+    }, columns=FEATURE_COLUMNS)
+
+    return df.reset_index(drop=True)
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+
+
+def row_key(row) -> tuple:
+    """
+    Hashable key for one feature row (as built by get_data_as_dataframe), made of the
+    exact values the model gets: 'Dell ' and 'Dell' are different entries, since the
+    encoders treat them as different categories.
+    """
+    # numpy scalars become the equal Python value, which hashes the same way
+    return tuple(value.item() if hasattr(value, "item") else value for value in row)
+
+
+class PredictionCache:
+    """
+    Size-bounded LRU cache of predictions keyed on the exact feature tuple.
+    Entries belong to one model version; a lookup with a different version clears the cache.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_version": self._version,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
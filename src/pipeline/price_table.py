@@ -0,0 +1,63 @@
+import os
+import json
+import bisect
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass
+class PriceTableConfig:
+    # stored inside the model version directory the table was built from,
+    # so it is swapped / rolled back together with that model
+    table_file: str = "price_table.npy"
+    metadata_file: str = "price_table.json"
+
+    def paths(self, version_dir) -> tuple:
+        return os.path.join(version_dir, self.table_file), os.path.join(version_dir, self.metadata_file)
+
+
+class PriceTable:
+    """
+    Array-backed table of (log) price predictions of a tree ensemble.
+
+    One row per combination of the categorical inputs (`features`, in order) seen in
+    training, one column per interval between the ensemble's split thresholds on ppi.
+    Every ppi inside an interval takes the same path through every tree, so a lookup
+    is exactly the model's prediction (stored as float32), whatever the ppi. Inputs
+    outside the stored combinations are left to the model.
+    """
+
+    def __init__(self, table: np.ndarray, metadata: dict):
+        self.table = table
+        self.metadata = metadata
+        self.features = metadata["features"]
+        self.index = {tuple(combo): i for i, combo in enumerate(metadata["combos"])}
+        ppi = metadata["ppi"]
+        # ppi is scaled like the preprocessor does, then compared in float32 like the trees
+        self.ppi_scale = ppi["scale"]
+        self.ppi_offset = ppi["offset"]
+        self.thresholds = ppi["thresholds"]
+        # sklearn trees go left on x <= threshold, xgboost on x < threshold
+        self._interval = bisect.bisect_left if ppi["side"] == "left" else bisect.bisect_right
+
+    @classmethod
+    def load(cls, version_dir, config: PriceTableConfig = None, mmap_mode="r"):
+        table_path, metadata_path = (config or PriceTableConfig()).paths(version_dir)
+        with open(metadata_path) as file:
+            metadata = json.load(file)
+        return cls(np.load(table_path, mmap_mode=mmap_mode), metadata)
+
+    def lookup(self, features: dict):
+        """
+        features: {feature: value} with the same keys/values as get_data_as_dataframe.
+        Returns the model's prediction, or None if the categorical inputs are not a stored
+        combination (the caller falls back to the model).
+        """
+        row = self.index.get(tuple(features[feature] for feature in self.features))
+        if row is None:
+            return None
+
+        x = float(np.float32(features["ppi"] * self.ppi_scale + self.ppi_offset))
+        value = float(self.table[row, self._interval(self.thresholds, x)])
+        # an interval too narrow to hold any float32 value has no stored prediction
+        return None if np.isnan(value) else value
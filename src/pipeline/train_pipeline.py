@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import time
+import pickle
+import ast
+import hashlib
+import argparse
+import importlib.util
+import pandas as pd
+from dataclasses import dataclass, asdict, is_dataclass
+
+from src.components.data_ingestion import DataIngestion
+from src.components.data_cleaning import DataCleaning
+from src.components.feature_engg import FeatureEngineering
+from src.components.feature_selection import FeatureSelection
+from src.components.outlier_treatment import OutlierTreatment
+from src.components.model_selection import ModelSelection
+from src.components.hyper_parameter_tuning import HyperParaTuning
+from src.components.price_table_builder import PriceTableBuilder
+from src.utils import artifact_io
+from src.utils.exception import CustomException
+from src.utils.logger import logging
+from src.utils.profiling import profiler
+from src.utils.utils import peak_rss_mb, reset_peak_rss
+
+
+STAGES = [
+    "data_ingestion", "data_cleaning", "feature_engineering", "feature_selection",
+    "outlier_treatment", "model_selection", "hyper_parameter_tuning", "price_table"
+]
+
+
+@dataclass
+class TrainPipelineConfig:
+    manifest_path: str = os.path.join('artifacts', 'stage_cache.json')
+
+
+# config fields that only decide how many cores a stage uses, not what it computes;
+# left out of the stage key so e.g. TRAIN_CORES=4 reuses a TRAIN_CORES=8 run
+EXECUTION_ONLY_FIELDS = {"n_jobs", "total_cores"}
+
+
+def _module_file(name):
+    # None for names that aren't modules ("from src.utils.logger import logging")
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:
+        return None
+    return spec.origin if spec is not None and spec.origin and spec.origin.endswith(".py") else None
+
+
+def _src_imports(path):
+    """
+    Names of the src.* modules imported anywhere in the file (lazy imports inside
+    functions included).
+    """
+    with open(path, 'rb') as file:
+        tree = ast.parse(file.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module)
+            # "from src.utils import artifact_io" imports a module, not a name
+            names.update(f"{node.module}.{alias.name}" for alias in node.names)
+    return {name for name in names if name == "src" or name.startswith("src.")}
+
+
+def stage_modules(entry_modules) -> list:
+    """
+    The stage's entry modules plus every src.* module they import, transitively.
+    """
+    seen, pending = set(), list(entry_modules)
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        path = _module_file(name)
+        if path is None:
+            continue
+        seen.add(name)
+        pending.extend(_src_imports(path) - seen)
+    return sorted(seen)
+
+
+def hash_modules(module_names) -> str:
+    """
+    Hash of the source of the modules implementing a stage and of every src.* module
+    they import, i.e. its code version.
+    """
+    digest = hashlib.sha256()
+    for name in stage_modules(module_names):
+        digest.update(name.encode())
+        with open(_module_file(name), 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def _jsonable(obj):
+    if is_dataclass(obj):
+        return {key: value for key, value in asdict(obj).items() if key not in EXECUTION_ONLY_FIELDS}
+    return obj
+
+
+class TrainPipeline:
+    """
+    Runs the training stages in order and skips every stage whose inputs, code and
+    config hash to the same key as its last successful run (and whose outputs are
+    still on disk, unmodified). A change anywhere only reruns the affected stage and,
+    if its outputs change, the stages downstream of it.
+    """
+
+    def __init__(self, force=None):
+        self.config = TrainPipelineConfig()
+        self.force = set(force or [])
+        self.manifest = {}
+        if os.path.isfile(self.config.manifest_path):
+            with open(self.config.manifest_path) as file:
+                self.manifest = json.load(file)
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.config.manifest_path), exist_ok=True)
+        with open(self.config.manifest_path, 'w') as file:
+            json.dump(self.manifest, file, indent=2)
+
+    def _stage_key(self, inputs, modules, config, params) -> str:
+        payload = {
+            "inputs": {path: artifact_io.artifact_digest(path) for path in inputs},
+            "code": hash_modules(modules),
+            "artifact_format": artifact_io.config.format,
+            "config": json.loads(json.dumps(_jsonable(config), default=str)),
+            "params": params
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _is_cached(self, name, key) -> bool:
+        entry = self.manifest.get(name)
+        if name in self.force or entry is None or entry["key"] != key:
+            return False
+        # in-memory outputs of a previous process are gone, so those stages always rerun
+        return all(artifact_io.locate(path) == path and artifact_io.artifact_digest(path) == digest
+                   for path, digest in entry["outputs"].items())
+
+    def run_stage(self, name, fn, inputs, modules, config, outputs, params=None):
+        """
+        fn() must write `outputs` and return a JSON-serialisable result,
+        which is replayed from the manifest when the stage is skipped.
+        `outputs` is a list of paths, or a callable mapping the result to them for
+        frames whose stored path depends on ARTIFACT_FORMAT.
+        `modules` are the stage's entry modules; the src.* modules they import are
+        hashed with them.
+        """
+        try:
+            key = self._stage_key(inputs, modules, config, params)
+            if self._is_cached(name, key):
+                logging.info(f"Stage {name}: unchanged, reusing cached artifacts")
+                print(f"[skip] {name}")
+                return self.manifest[name]["result"]
+
+            reset_peak_rss()
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+            peak_rss = peak_rss_mb()
+            if callable(outputs):
+                outputs = outputs(result)
+
+            self.manifest[name] = {
+                "key": key,
+                "outputs": {path: artifact_io.artifact_digest(path) for path in outputs},
+                "result": result,
+                "seconds": round(elapsed, 2),
+                "peak_rss_mb": round(peak_rss, 1)
+            }
+            self._save_manifest()
+            logging.info(f"Stage {name}: ran in {elapsed:.2f}s, peak RSS {peak_rss:.1f} MB")
+            print(f"[run]  {name} ({elapsed:.2f}s, peak RSS {peak_rss:.0f} MB)")
+            return result
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def run(self):
+        DI_obj = DataIngestion()
+        raw_path = self.run_stage(
+            "data_ingestion", DI_obj.initiate_data_ingestion,
+            inputs=[DI_obj.ingestion_cofig.source_data_path],
+            modules=["src.components.data_ingestion"],
+            config=DI_obj.ingestion_cofig,
+            outputs=lambda path: [path])
+
+        DC_obj = DataCleaning()
+        cleaned_path = self.run_stage(
+            "data_cleaning", lambda: DC_obj.initiate_data_cleaning(raw_path),
+            inputs=[raw_path],
+            modules=["src.components.data_cleaning"],
+            config=DC_obj.cleaning_config,
+            outputs=lambda path: [path])
+
+        FE_obj = FeatureEngineering()
+        post_fe_path = self.run_stage(
+            "feature_engineering", lambda: FE_obj.initiate_feature_engineering(cleaned_path),
+            inputs=[cleaned_path],
+            modules=["src.components.feature_engg"],
+            config=FE_obj.feature_engg_config,
+            outputs=lambda path: [path])
+
+        FS_obj = FeatureSelection()
+        post_fs_path = self.run_stage(
+            "feature_selection", lambda: FS_obj.initiate_feature_selection(post_fe_path),
+            inputs=[post_fe_path],
+            modules=["src.components.feature_selection"],
+            config=FS_obj.config,
+            outputs=lambda path: [path])
+
+        OT_obj = OutlierTreatment()
+        post_ot_path = self.run_stage(
+            "outlier_treatment", lambda: OT_obj.initiate_outlier_treatment(post_fs_path),
+            inputs=[post_fs_path],
+            modules=["src.components.outlier_treatment"],
+            config=OT_obj.outlier_treatment_config,
+            outputs=lambda path: [path])
+
+        MS_obj = ModelSelection()
+
+        def _model_selection():
+            top_3_models_df, ordinal_path, target_path = MS_obj.initiate_model_selection(post_ot_path)
+            return {"top_3_models": top_3_models_df.to_dict(orient="records"), "preprocessors_paths": [ordinal_path, target_path]}
+
+        model_selection = self.run_stage(
+            "model_selection", _model_selection,
+            inputs=[post_ot_path],
+            modules=["src.components.model_selection"],
+            config=MS_obj.config,
+            outputs=[MS_obj.config.ordinal_transformer_path, MS_obj.config.target_transformer_path])
+        top_3_models_df = pd.DataFrame(model_selection["top_3_models"])
+        preprocessors_paths = model_selection["preprocessors_paths"]
+
+        HPT_obj = HyperParaTuning()
+
+        def _tuning():
+            _, best_score = HPT_obj.tune_and_select_best(top_3_models_df, preprocessors_paths, post_ot_path)
+            return {"best_score": float(best_score), "version": HPT_obj.published_version}
+
+        tuning = self.run_stage(
+            "hyper_parameter_tuning", _tuning,
+            inputs=[post_ot_path] + preprocessors_paths,
+            modules=["src.components.hyper_parameter_tuning"],
+            config=HPT_obj.config,
+            outputs=[HPT_obj.config.prediction_pipeline_path, HPT_obj.config.best_preprocessor_pipeline_path],
+            params={"top_3_models": model_selection["top_3_models"]})
+
+        # the table is stored in (and served with) the registry version it was built from
+        PTB_obj = PriceTableBuilder()
+        version_dir = PTB_obj.registry.version_dir(tuning["version"])
+        self.run_stage(
+            "price_table", lambda: PTB_obj.initiate_price_table(tuning["version"], post_ot_path),
+            inputs=[os.path.join(version_dir, PTB_obj.registry.config.prediction_pipeline_file), post_ot_path],
+            modules=["src.components.price_table_builder"],
+            config=PTB_obj.config,
+            # no table for models that aren't tree ensembles
+            outputs=lambda table_path: list(PTB_obj.table_config.paths(version_dir)) if table_path else [])
+
+        self.report_io()
+        profiler.print_summary()
+
+        best_model = pickle.load(open(HPT_obj.config.prediction_pipeline_path, 'rb'))
+        return best_model, tuning["best_score"]
+
+    def report_io(self):
+        """
+        Per-stage read/write time of the intermediate frames for this run.
+        """
+        stats = artifact_io.io_stats()
+        logging.info(f"Artifact I/O ({artifact_io.config.format}): {stats}")
+        print(f"Artifact I/O, format={artifact_io.config.format}")
+        print(f"{'stage':<24}{'read s':>10}{'write s':>10}{'rows read':>12}{'rows written':>14}")
+        for stage, entry in stats.items():
+            print(f"{stage:<24}{entry['read_seconds']:>10.4f}{entry['write_seconds']:>10.4f}{entry['rows_read']:>12}{entry['rows_written']:>14}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping unchanged stages.")
+    parser.add_argument("--force", nargs="*", default=[], choices=STAGES, help="stages to rerun regardless of the cache")
+    parser.add_argument("--artifact-format", default=artifact_io.config.format, choices=list(artifact_io.FORMATS) + ["memory"],
+                        help="storage of the intermediate frames between stages (default: ARTIFACT_FORMAT or csv)")
+    parser.add_argument("--profile", action="store_true", default=profiler.config.enabled,
+                        help="time / memory-profile every stage and feature selector (default: PROFILE=1)")
+    parser.add_argument("--cprofile", action="store_true", default=profiler.config.cprofile,
+                        help="with --profile, also dump cProfile stats per stage into the run's log directory")
+    args = parser.parse_args()
+    artifact_io.config.format = args.artifact_format
+    profiler.config.enabled = args.profile
+    profiler.config.cprofile = args.cprofile
+
+    best_model, best_score = TrainPipeline(force=args.force).run()
+    print(best_model)
+    print(best_score)
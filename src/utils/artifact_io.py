@@ -0,0 +1,294 @@
+import os
+import json
+import hashlib
+import threading
+import pandas as pd
+from time import perf_counter
+from dataclasses import dataclass
+
+from src.utils.logger import logging
+
+# file extension per on-disk format; "memory" keeps frames in this process only
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+MEMORY_PREFIX = "memory://"
+
+
+@dataclass
+class ArtifactIOConfig:
+    # csv (default, human-readable), parquet / feather (need pyarrow) or memory
+    format: str = os.environ.get("ARTIFACT_FORMAT", "csv")
+
+
+config = ArtifactIOConfig()
+
+_memory_store = {}
+# {stage: {"read_seconds", "write_seconds", "reads", "writes", "rows_read", "rows_written"}}
+_io_stats = {}
+_lock = threading.Lock()
+
+
+def _check_format(fmt):
+    if fmt != "memory" and fmt not in FORMATS:
+        raise ValueError(f"Unknown ARTIFACT_FORMAT {fmt!r}, expected one of {sorted(FORMATS) + ['memory']}")
+    if fmt in ("parquet", "feather"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError(f"ARTIFACT_FORMAT={fmt} needs pyarrow, install it or use csv / memory") from None
+
+
+def _record(stage, op, seconds, rows):
+    with _lock:
+        entry = _io_stats.setdefault(stage or "other", {
+            "read_seconds": 0.0, "write_seconds": 0.0, "reads": 0, "writes": 0, "rows_read": 0, "rows_written": 0
+        })
+        entry[f"{op}_seconds"] += seconds
+        entry[f"{op}s"] += 1
+        entry[f"rows_{'read' if op == 'read' else 'written'}"] += rows
+
+
+def _schema_path(path):
+    return path + ".schema.json"
+
+
+def resolve_path(path, fmt=None) -> str:
+    """
+    Where a frame configured at `path` (e.g. artifacts/cleaned.csv) is stored in `fmt`.
+    """
+    fmt = fmt or config.format
+    stem = os.path.splitext(path)[0]
+    if fmt == "memory":
+        return MEMORY_PREFIX + stem
+    return stem + FORMATS[fmt]
+
+
+def locate(path):
+    """
+    Returns the stored artifact for `path`, trying the other formats of the same stem,
+    so readers holding a configured .csv path also find a .parquet / in-memory artifact.
+    Returns None when nothing is stored.
+    """
+    if path.startswith(MEMORY_PREFIX):
+        return path if path in _memory_store else None
+    if os.path.splitext(path)[1] not in FORMATS.values():
+        return path if os.path.isfile(path) else None
+    # the configured format wins over stale files of another format from earlier runs
+    candidates = [resolve_path(path), path] + [resolve_path(path, fmt) for fmt in list(FORMATS) + ["memory"]]
+    for candidate in candidates:
+        if candidate in _memory_store or os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def write_frame(df: pd.DataFrame, path, stage=None) -> str:
+    """
+    Writes an intermediate frame in the configured format and returns the path it was
+    written to, which is what the next stage should read. Column dtypes survive the round
+    trip in every format; for csv they are kept in a `<file>.schema.json` sidecar.
+    """
+    _check_format(config.format)
+    out_path = resolve_path(path)
+    start = perf_counter()
+
+    if config.format == "memory":
+        _memory_store[out_path] = df
+    else:
+        os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+        if config.format == "parquet":
+            df.to_parquet(out_path, index=False)
+        elif config.format == "feather":
+            df.reset_index(drop=True).to_feather(out_path)
+        else:
+            df.to_csv(out_path, index=False)
+            with open(_schema_path(out_path), "w") as file:
+                json.dump({col: str(dtype) for col, dtype in df.dtypes.items()}, file, indent=2)
+
+    elapsed = perf_counter() - start
+    _record(stage, "write", elapsed, len(df))
+    logging.info(f"Wrote {len(df)} rows to {out_path} in {elapsed:.3f}s")
+    return out_path
+
+
+def read_frame(path, stage=None) -> pd.DataFrame:
+    """
+    Reads a frame written by write_frame (any format, chosen by the stored artifact)
+    or a plain csv. In-memory frames are returned as a copy, stages mutate their input.
+    """
+    stored = locate(path)
+    if stored is None:
+        raise FileNotFoundError(f"No artifact stored for {path}")
+    start = perf_counter()
+
+    if stored.startswith(MEMORY_PREFIX):
+        df = _memory_store[stored].copy()
+    elif stored.endswith(FORMATS["parquet"]):
+        df = pd.read_parquet(stored)
+    elif stored.endswith(FORMATS["feather"]):
+        df = pd.read_feather(stored)
+    else:
+        dtypes = None
+        if os.path.isfile(_schema_path(stored)):
+            with open(_schema_path(stored)) as file:
+                dtypes = json.load(file)
+        df = pd.read_csv(stored, dtype=dtypes)
+
+    elapsed = perf_counter() - start
+    _record(stage, "read", elapsed, len(df))
+    logging.info(f"Read {len(df)} rows from {stored} in {elapsed:.3f}s")
+    return df
+
+
+def _feather_chunks(path, chunk_size):
+    # record batches (possibly compressed) are decoded one at a time and regrouped
+    import pyarrow as pa
+    # plain file reads, not a memory map: mapped pages would stay in RSS as the scan advances
+    reader = pa.ipc.open_file(pa.OSFile(path))
+    batches, rows = [], 0
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        batches.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(batches)
+            yield table.slice(0, chunk_size).to_pandas()
+            rest = table.slice(chunk_size)
+            batches, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(batches, schema=reader.schema).to_pandas()
+
+
+def iter_frame_chunks(path, chunk_size, stage=None):
+    """
+    Yields the frame stored for `path` in chunks of at most chunk_size rows, so a stage
+    can process an artifact larger than memory. Dtypes match read_frame (the csv schema
+    sidecar is applied to every chunk, so chunks never infer different types).
+    """
+    stored = locate(path)
+    if stored is None:
+        raise FileNotFoundError(f"No artifact stored for {path}")
+
+    if stored.startswith(MEMORY_PREFIX):
+        df = _memory_store[stored]
+        chunks = (df.iloc[i:i + chunk_size].copy() for i in range(0, len(df), chunk_size))
+    elif stored.endswith(FORMATS["parquet"]):
+        import pyarrow.parquet as pq
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(stored).iter_batches(batch_size=chunk_size))
+    elif stored.endswith(FORMATS["feather"]):
+        chunks = _feather_chunks(stored, chunk_size)
+    else:
+        dtypes = None
+        if os.path.isfile(_schema_path(stored)):
+            with open(_schema_path(stored)) as file:
+                dtypes = json.load(file)
+        chunks = pd.read_csv(stored, dtype=dtypes, chunksize=chunk_size)
+
+    while True:
+        start = perf_counter()
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        _record(stage, "read", perf_counter() - start, len(chunk))
+        yield chunk
+
+
+class FrameWriter:
+    """
+    Appends chunks to one artifact in the configured format; the counterpart of
+    iter_frame_chunks. Use as a context manager, `path` is the stored artifact.
+    """
+
+    def __init__(self, path, stage=None):
+        _check_format(config.format)
+        self.path = resolve_path(path)
+        self.stage = stage
+        self.rows = 0
+        self._chunks = []
+        self._writer = None
+        self._schema = None
+        self._empty = None
+        if config.format != "memory":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+    def write(self, df: pd.DataFrame):
+        # empty chunks (e.g. everything filtered out) carry no reliable dtypes
+        if len(df) == 0:
+            if self._empty is None:
+                self._empty = df
+            return
+        start = perf_counter()
+
+        if config.format == "memory":
+            self._chunks.append(df)
+        elif config.format == "csv":
+            df.to_csv(self.path, mode='w' if self.rows == 0 else 'a', header=(self.rows == 0), index=False)
+            if self.rows == 0:
+                with open(_schema_path(self.path), "w") as file:
+                    json.dump({col: str(dtype) for col, dtype in df.dtypes.items()}, file, indent=2)
+        else:
+            import pyarrow as pa
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if config.format == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.path, self._schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, self._schema)
+            self._writer.write_table(table.cast(self._schema))
+
+        self.rows += len(df)
+        _record(self.stage, "write", perf_counter() - start, len(df))
+
+    def close(self) -> str:
+        if self.rows == 0 and self._empty is not None and config.format != "memory":
+            # nothing but empty chunks: still leave a valid (header-only) artifact
+            write_frame(self._empty, self.path, self.stage)
+        elif self._writer is not None:
+            self._writer.close()
+        if config.format == "memory":
+            chunks = self._chunks or ([self._empty] if self._empty is not None else [])
+            _memory_store[self.path] = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            self._chunks = []
+        logging.info(f"Wrote {self.rows} rows to {self.path} in chunks")
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+
+def artifact_digest(path) -> str:
+    """
+    Content hash of a stored artifact; in-memory frames are hashed by value.
+    """
+    stored = locate(path)
+    if stored is None:
+        raise FileNotFoundError(f"No artifact stored for {path}")
+
+    digest = hashlib.sha256()
+    if stored.startswith(MEMORY_PREFIX):
+        df = _memory_store[stored]
+        digest.update(json.dumps({col: str(dtype) for col, dtype in df.dtypes.items()}).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    with open(stored, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def io_stats() -> dict:
+    with _lock:
+        return {stage: {key: round(value, 4) if isinstance(value, float) else value for key, value in entry.items()}
+                for stage, entry in _io_stats.items()}
+
+
+def reset_io_stats():
+    with _lock:
+        _io_stats.clear()
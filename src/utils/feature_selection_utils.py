@@ -4,6 +4,8 @@ import pandas as pd
 import numpy as np
 from src.utils.logger import logging
 from src.utils.exception import CustomException
+from src.utils.profiling import profiler
+from scipy import stats
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.inspection import permutation_importance
 from sklearn.linear_model import Lasso
@@ -11,7 +13,7 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.feature_selection import RFE
 from sklearn.linear_model import LinearRegression
-import shap
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 
@@ -28,11 +30,13 @@ def correlation_feature_selection(df:pd.DataFrame)->pd.DataFrame:
         raise CustomException(e, sys)
     
 # Technique 2 : Random Forest Regressor
-def random_forest_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame:
+def random_forest_feature_selection(X: pd.DataFrame, y: pd.Series, model=None)->pd.DataFrame:
     try:
         print("Calculating random forest feature selection")
-        rf = RandomForestRegressor()
-        rf.fit(X, y)
+        rf = model
+        if rf is None:
+            rf = RandomForestRegressor()
+            rf.fit(X, y)
         
         random_forest_feature_selection_df = pd.DataFrame({
             "feature": X.columns,
@@ -47,11 +51,13 @@ def random_forest_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame
         raise CustomException(e, sys)
     
 # Technique 3 - Gradient Boosting Feature importances
-def gradient_boosting_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame:
+def gradient_boosting_feature_selection(X: pd.DataFrame, y: pd.Series, model=None)->pd.DataFrame:
     try:
         print("Calculating gboosting feature selection")
-        gb = GradientBoostingRegressor()
-        gb.fit(X, y)
+        gb = model
+        if gb is None:
+            gb = GradientBoostingRegressor()
+            gb.fit(X, y)
 
         gradient_boosting_feature_selection_df = pd.DataFrame({
             "feature": X.columns,
@@ -68,22 +74,90 @@ def gradient_boosting_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataF
     
     
 # Technique 4 - Permutation Importance
-def permutation_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame:
+def permutation_split(X: pd.DataFrame, y: pd.Series):
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+
+def adaptive_permutation_importance(model, X: pd.DataFrame, y: pd.Series, threshold=0.005, ci_half_width=0.002,
+                                    min_repeats=5, batch_repeats=5, max_repeats=30, confidence=0.95, random_state=42)->pd.DataFrame:
+    """
+    Permutation importance (drop in R2) with a per-feature number of repeats. Each round
+    permutes a feature `batch_repeats` times at once (one stacked predict call) and a
+    feature stops as soon as the Student-t confidence interval of its mean importance
+    (k - 1 degrees of freedom, wide for the first few repeats) is narrower than
+    ci_half_width or lies entirely above / below the drop `threshold`.
+    Returns feature, importance_mean, importance_std (ddof=1, as in the interval) and
+    n_repeats per feature.
+    """
+    rng = np.random.default_rng(random_state)
+    X_values = np.asarray(X, dtype=np.float64)
+    y_values = np.asarray(y, dtype=np.float64)
+    n_rows = len(X_values)
+    total_ss = ((y_values - y_values.mean()) ** 2).sum()
+    # the model was fitted on a DataFrame, predict on frames with the same columns
+    baseline = 1 - ((y_values - model.predict(pd.DataFrame(X_values, columns=X.columns))) ** 2).sum() / total_ss
+
+    scores = [[] for _ in range(X_values.shape[1])]
+    active = list(range(X_values.shape[1]))
+    while active:
+        for j in list(active):
+            n_new = min(batch_repeats if scores[j] else max(min_repeats, batch_repeats), max_repeats - len(scores[j]))
+
+            # n_new independently permuted copies of X stacked, predicted in one call
+            stacked = np.tile(X_values, (n_new, 1))
+            permutations = rng.permuted(np.tile(np.arange(n_rows), (n_new, 1)), axis=1)
+            stacked[:, j] = X_values[permutations.reshape(-1), j]
+            predictions = model.predict(pd.DataFrame(stacked, columns=X.columns)).reshape(n_new, n_rows)
+            r2 = 1 - ((y_values - predictions) ** 2).sum(axis=1) / total_ss
+            scores[j].extend(baseline - r2)
+
+            k = len(scores[j])
+            mean, std = np.mean(scores[j]), np.std(scores[j], ddof=1)
+            half_width = stats.t.ppf((1 + confidence) / 2, k - 1) * std / np.sqrt(k)
+            if k >= max_repeats or half_width <= ci_half_width or abs(mean - threshold) > half_width:
+                active.remove(j)
+
+    return pd.DataFrame({
+        'feature': X.columns,
+        'importance_mean': [np.mean(s) for s in scores],
+        'importance_std': [np.std(s, ddof=1) for s in scores],
+        'n_repeats': [len(s) for s in scores]
+    })
+
+
+def permutation_feature_selection(X: pd.DataFrame, y: pd.Series, model=None, adaptive=False)->pd.DataFrame:
+    """
+    model: optional Random Forest already fitted on the permutation_split train rows.
+    adaptive: spend repeats per feature until its importance is settled (see
+    adaptive_permutation_importance) instead of a fixed 30 repeats for every feature.
+    The repeats each importance is based on are returned in permutation_n_repeats.
+    """
     try:
         print("Calculating permutation feature selection")
-        X_train_label, X_test_label, y_train_label, y_test_label = train_test_split(X, y, test_size=0.2, random_state=42)
+        X_train_label, X_test_label, y_train_label, y_test_label = permutation_split(X, y)
 
         # Train a Random Forest regressor on label encoded data
-        rf_label = RandomForestRegressor(n_estimators=100, random_state=42)
-        rf_label.fit(X_train_label, y_train_label)
+        rf_label = model
+        if rf_label is None:
+            rf_label = RandomForestRegressor(n_estimators=100, random_state=42)
+            rf_label.fit(X_train_label, y_train_label)
 
         # Calculate Permutation Importance
-        perm_importance = permutation_importance(rf_label, X_test_label, y_test_label, n_repeats=30, random_state=42)
+        if adaptive:
+            adaptive_df = adaptive_permutation_importance(rf_label, X_test_label, y_test_label, max_repeats=30)
+            logging.info(f"Adaptive permutation repeats per feature: {dict(zip(adaptive_df['feature'], adaptive_df['n_repeats']))}")
+            importances_mean = adaptive_df['importance_mean'].to_numpy()
+            n_repeats = adaptive_df['n_repeats'].to_numpy()
+        else:
+            perm_importance = permutation_importance(rf_label, X_test_label, y_test_label, n_repeats=30, random_state=42)
+            importances_mean = perm_importance.importances_mean
+            n_repeats = np.full(X.shape[1], 30)
 
         # Organize results into a DataFrame
         perm_importance_df = pd.DataFrame({
             'feature': X.columns,
-            'permutation_importance': perm_importance.importances_mean
+            'permutation_importance': importances_mean,
+            'permutation_n_repeats': n_repeats
         }).sort_values(by='permutation_importance', ascending=False)
     
         return (
@@ -116,17 +190,23 @@ def lasso_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame:
     
 
 # Technique 6 - RFE => Recursive Feature Elimination
-def rfe_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame:
+def rfe_feature_selection(X: pd.DataFrame, y: pd.Series, model=None)->pd.DataFrame:
     try: 
         print("Calculating rfe feature selection")
-        estimator = RandomForestRegressor()
+        if model is not None:
+            # keeping all X.shape[1] features, RFE eliminates nothing and its final
+            # estimator is just a Random Forest fitted on all of X: reuse the shared one
+            selected_features = X.columns
+            selected_coeffs = model.feature_importances_
+        else:
+            estimator = RandomForestRegressor()
 
-        selector = RFE(estimator, n_features_to_select=X.shape[1], step=1)
-        selector = selector.fit(X, y)
+            selector = RFE(estimator, n_features_to_select=X.shape[1], step=1)
+            selector = selector.fit(X, y)
 
-        selected_features = X.columns[selector.support_]
+            selected_features = X.columns[selector.support_]
 
-        selected_coeffs = selector.estimator_.feature_importances_
+            selected_coeffs = selector.estimator_.feature_importances_
 
 
 
@@ -166,11 +246,16 @@ def linear_regression_weights_feature_selection(X: pd.DataFrame, y: pd.Series)->
     
 
 # Technique 8 - SHAP
-def shap_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame:
+def shap_feature_selection(X: pd.DataFrame, y: pd.Series, model=None)->pd.DataFrame:
     try:
+        # imported here so that importing this module doesn't pull in shap
+        import shap
+
         print("Calculating shap feature selection")
-        rf = RandomForestRegressor(n_estimators = 100, random_state=42)
-        rf.fit(X, y)
+        rf = model
+        if rf is None:
+            rf = RandomForestRegressor(n_estimators = 100, random_state=42)
+            rf.fit(X, y)
 
         explainer = shap.TreeExplainer(rf)
         shap_values = explainer.shap_values(X)
@@ -186,4 +271,99 @@ def shap_feature_selection(X: pd.DataFrame, y: pd.Series)->pd.DataFrame:
         
     
     except Exception as e:
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
+
+
+## Selection engine: each base model is fitted once and shared by the selectors using it
+
+# base model name -> the rows it is fitted on ("full" X or the permutation_split train rows)
+BASE_MODELS = {
+    "rf_full": "full",
+    "rf_train": "train",
+    "gb_full": "full",
+}
+
+# (selector, base model it reuses); the merged score table keeps this column order
+SELECTOR_PLAN = [
+    (correlation_feature_selection, None),
+    (random_forest_feature_selection, "rf_full"),
+    (gradient_boosting_feature_selection, "gb_full"),
+    (permutation_feature_selection, "rf_train"),
+    (lasso_feature_selection, None),
+    (rfe_feature_selection, "rf_full"),
+    (linear_regression_weights_feature_selection, None),
+    (shap_feature_selection, "rf_full"),
+]
+
+
+def fit_base_model(name, X: pd.DataFrame, y: pd.Series):
+    # seeded, so the serial and the parallel run share bit-identical models
+    if name.startswith("rf"):
+        model = RandomForestRegressor(n_estimators=100, random_state=42)
+    else:
+        model = GradientBoostingRegressor(random_state=42)
+
+    if BASE_MODELS[name] == "train":
+        X, _, y, _ = permutation_split(X, y)
+    return name, model.fit(X, y)
+
+
+def run_selector(selector, data: pd.DataFrame, X: pd.DataFrame, y: pd.Series, model=None, **kwargs)->pd.DataFrame:
+    if selector is correlation_feature_selection:
+        return selector(data)
+    if model is not None:
+        kwargs["model"] = model
+    return selector(X=X, y=y, **kwargs)
+
+
+def run_selectors(data: pd.DataFrame, target="Price", n_jobs=None, selector_kwargs=None)->pd.DataFrame:
+    """
+    Runs every SELECTOR_PLAN selector on the label-encoded `data` and merges their
+    scores on 'feature'. Base models are fitted once; selectors without a base model
+    start right away, the others as soon as their model is ready. n_jobs=1 runs
+    everything in this process, otherwise on a process pool of n_jobs workers.
+    selector_kwargs: {selector function name: extra keyword arguments}.
+    """
+    try:
+        selector_kwargs = selector_kwargs or {}
+        y = data[target]
+        X = data.drop(target, axis=1)
+        n_jobs = n_jobs or os.cpu_count() or 1
+        results = {}
+
+        if n_jobs == 1:
+            models = dict(profiler.call(f"base_model:{name}", fit_base_model, name, X, y) for name in BASE_MODELS)
+            for i, (selector, base) in enumerate(SELECTOR_PLAN):
+                results[i] = profiler.call(f"selector:{selector.__name__}", run_selector, selector, data, X, y,
+                                           models.get(base), **selector_kwargs.get(selector.__name__, {}))
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                selector_futures = {
+                    profiler.submit(pool, f"selector:{selector.__name__}", run_selector, selector, data, X, y,
+                                    **selector_kwargs.get(selector.__name__, {})): i
+                    for i, (selector, base) in enumerate(SELECTOR_PLAN) if base is None
+                }
+                model_futures = [profiler.submit(pool, f"base_model:{name}", fit_base_model, name, X, y) for name in BASE_MODELS]
+
+                for future in as_completed(model_futures):
+                    name, model = profiler.collect(future.result())
+                    for i, (selector, base) in enumerate(SELECTOR_PLAN):
+                        if base == name:
+                            future = profiler.submit(pool, f"selector:{selector.__name__}", run_selector, selector, data, X, y,
+                                                     model, **selector_kwargs.get(selector.__name__, {}))
+                            selector_futures[future] = i
+
+                for future, i in selector_futures.items():
+                    results[i] = profiler.collect(future.result())
+
+        merged = results[0]
+        for i in range(1, len(SELECTOR_PLAN)):
+            merged = merged.merge(results[i], on='feature')
+        logging.info(f"Ran {len(SELECTOR_PLAN)} selectors on {len(BASE_MODELS)} shared base models with n_jobs={n_jobs}")
+
+        return (
+            merged
+        )
+
+    except Exception as e:
+        raise CustomException(e, sys)
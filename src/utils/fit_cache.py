@@ -0,0 +1,170 @@
+import os
+import threading
+import importlib.metadata
+import joblib
+from joblib import hash as joblib_hash
+from sklearn.base import BaseEstimator
+
+from src.utils.logger import logging
+
+
+def _spec_value(value):
+    # nested estimators are described by their flattened parameters, not their state
+    if isinstance(value, BaseEstimator):
+        return type(value).__name__
+    if isinstance(value, (list, tuple)):
+        return type(value)(_spec_value(item) for item in value)
+    return value
+
+
+def _library_versions() -> dict:
+    # a fit pickled under another version of these can unpickle fine yet behave differently
+    versions = {}
+    for package in ("scikit-learn", "xgboost", "category_encoders"):
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+LIBRARY_VERSIONS = _library_versions()
+
+
+def estimator_spec(estimator) -> str:
+    """
+    Hash of an unfitted estimator's type and parameters (deep). n_jobs is left out, it
+    only changes how a fit is parallelized, not its result.
+    """
+    params = {key: _spec_value(value) for key, value in estimator.get_params(deep=True).items()
+              if not key.endswith("n_jobs")}
+    return joblib_hash((type(estimator).__name__, params))
+
+
+class FitCache:
+    """
+    On-disk cache of fold-level fit results (validation predictions or scores, and
+    optionally the fitted estimator), one file per (training data, fold indices,
+    preprocessor, estimator params). Shared by every process on the machine through
+    the directory; the least recently used entries are evicted past max_mb.
+    """
+
+    def __init__(self, cache_dir=os.path.join("artifacts", "fit_cache"), max_mb=512, store_estimators=True, enabled=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.store_estimators = store_estimators
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._size = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def data_key(self, X, y) -> str:
+        # hashed on every call (~20 ms for the training frame): a digest memoized by
+        # object identity would go stale when X is modified in place
+        if not self.enabled:
+            return None
+        return joblib_hash((X, y))
+
+    def key(self, data_key, train_idx, val_idx, *estimators) -> str:
+        if not self.enabled:
+            return None
+        return joblib_hash((data_key, train_idx, val_idx, LIBRARY_VERSIONS,
+                            [estimator_spec(estimator) for estimator in estimators]))
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        The stored dict for key, or None (also when disabled).
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            value = joblib.load(path)
+            os.utime(path)
+        except FileNotFoundError:
+            # never stored, or evicted by another process meanwhile
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception as e:
+            # truncated / corrupted file, or a pickle that no longer loads: refit and overwrite
+            logging.warning(f"Fit cache entry {path} is unreadable ({type(e).__name__}: {e}), removing it")
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self.misses += 1
+                self._size = None
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key, value: dict):
+        if not self.enabled:
+            return
+        if not self.store_estimators:
+            value = {name: item for name, item in value.items() if name != "estimator"}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(value, temp_path)
+        written = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._size = (self._size if self._size is not None else self._disk_size()) + written
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        with os.scandir(self.cache_dir) as entries:
+            return [entry for entry in entries if entry.name.endswith(".pkl")]
+
+    def _disk_size(self):
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def _evict(self):
+        # other processes write here too, so the directory is the source of truth
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        self._size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._size -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions
+            }
+
+    def log_stats(self, context):
+        if self.enabled:
+            logging.info(f"Fit cache ({context}): {self.stats()}")
+
+
+fit_cache = FitCache(
+    cache_dir=os.environ.get("FIT_CACHE_DIR", os.path.join("artifacts", "fit_cache")),
+    max_mb=float(os.environ.get("FIT_CACHE_MAX_MB", 512)),
+    store_estimators=os.environ.get("FIT_CACHE_STORE_ESTIMATORS", "1") != "0",
+    # opt-in: with it on, the default grid strategy searches fold by fold instead of
+    # through GridSearchCV (same winner and score)
+    enabled=os.environ.get("FIT_CACHE", "0") == "1"
+)
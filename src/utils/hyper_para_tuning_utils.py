@@ -1,11 +1,17 @@
 from src.utils.exception import CustomException
 from src.utils.logger import logging
+from src.utils.model_selection_utils import FoldCache
+from src.utils.fit_cache import fit_cache
+import math
+import time
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import cross_val_predict, GridSearchCV, KFold
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import cross_val_predict, GridSearchCV, KFold, ParameterGrid
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor,GradientBoostingRegressor
 from sklearn.svm import SVR
-from xgboost import XGBRegressor
 from sklearn.metrics import r2_score,mean_absolute_error, make_scorer
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler, OrdinalEncoder
@@ -13,17 +19,356 @@ from sklearn.pipeline import Pipeline
 import sys
 import os
 
-def hyperparameter_tuning(preprocessor, model, param_grid, X, y):
-    
+
+class SearchBudget:
+    """
+    Fit-count and / or wall-clock limit for one search. A candidate is only started
+    when all its fold fits still fit in the budget. max_fits is a hard limit. max_seconds
+    is a soft one: the time a candidate will take is projected from the mean wall-clock
+    seconds per fit so far, so the first candidate, or one slower than that mean, can
+    still run past it.
+    """
+
+    def __init__(self, max_fits=None, max_seconds=None):
+        self.max_fits = max_fits
+        self.max_seconds = max_seconds
+        self.fits = 0
+        self.started = time.perf_counter()
+        # fits timed by record() and the wall-clock seconds they took
+        self.timed_fits = 0
+        self.fit_seconds = 0.0
+
+    def allows(self, n_fits) -> bool:
+        if self.max_fits is not None and self.fits + n_fits > self.max_fits:
+            return False
+        if self.max_seconds is not None:
+            projected = self.fit_seconds / self.timed_fits * n_fits if self.timed_fits else 0.0
+            if time.perf_counter() - self.started + projected > self.max_seconds:
+                return False
+        return True
+
+    def spend(self, n_fits):
+        self.fits += n_fits
+
+    def record(self, n_fits, seconds):
+        self.timed_fits += n_fits
+        self.fit_seconds += seconds
+
+    def stats(self) -> dict:
+        return {"fits": self.fits, "seconds": round(time.perf_counter() - self.started, 2)}
+
+
+def _fold_r2(pipeline, X, y, train_idx, val_idx):
+    fitted = clone(pipeline).fit(X.iloc[train_idx], y.iloc[train_idx])
+    return r2_score(y.iloc[val_idx], fitted.predict(X.iloc[val_idx])), fitted
+
+
+def _cv_score(pipeline, params, X, y, splits, budget, n_samples=None, n_jobs=-1):
+    """
+    Mean validation R2 over the folds (what GridSearchCV reports as best_score_), training
+    on the first n_samples rows of each shuffled training fold when given. Folds found
+    in the on-disk fit_cache are not refitted and don't count against the budget.
+    Returns None when the budget can't afford the candidate.
+    """
+    candidate = clone(pipeline).set_params(**params)
+    splits = [(train_idx[:n_samples] if n_samples else train_idx, val_idx) for train_idx, val_idx in splits]
+    data_key = fit_cache.data_key(X, y)
+    keys = [fit_cache.key(data_key, train_idx, val_idx, candidate) for train_idx, val_idx in splits]
+    entries = [fit_cache.get(key) for key in keys]
+    missing = [i for i, entry in enumerate(entries) if entry is None]
+
+    if not budget.allows(len(missing)):
+        return None
+    budget.spend(len(missing))
+    start = time.perf_counter()
+    fitted = Parallel(n_jobs=n_jobs)(delayed(_fold_r2)(candidate, X, y, *splits[i]) for i in missing)
+    budget.record(len(missing), time.perf_counter() - start)
+    for i, (score, estimator) in zip(missing, fitted):
+        entries[i] = {"score": score, "estimator": estimator}
+        fit_cache.put(keys[i], entries[i])
+
+    return float(np.mean([entry["score"] for entry in entries]))
+
+
+def _shuffled_splits(X, y, cv, random_state=42):
+    # training indices in random order, so "first n rows" is a random subsample of the fold
+    rng = np.random.default_rng(random_state)
+    return [(rng.permutation(train_idx), val_idx) for train_idx, val_idx in cv.split(X, y)]
+
+
+def _unscored(params):
+    # the budget can't afford a single candidate: no partial result to return, the first
+    # candidate is used unscored (-inf, so any scored model is preferred over it)
+    logging.warning(f"Search budget too small to score a single candidate, returning {params} unscored")
+    return params, -float("inf")
+
+
+def successive_halving_search(pipeline, param_grid, X, y, cv, budget, factor=3, n_jobs=-1):
+    """
+    Successive halving: every candidate is scored on a small resource, the best
+    1/factor advance to factor times more. The resource is model__n_estimators when the
+    grid tunes it (up to its largest value), the training rows per fold otherwise.
+    Returns (best_params, best_score), the score on the full resource when the budget
+    still affords that; otherwise the winner's last (reduced-resource) score, with a warning.
+    """
+    splits = _shuffled_splits(X, y, cv)
+    grid = dict(param_grid)
+    if "model__n_estimators" in grid:
+        resource, max_resource, min_resource = "model__n_estimators", max(grid.pop("model__n_estimators")), 10
+    else:
+        resource, max_resource, min_resource = "n_samples", min(len(train_idx) for train_idx, _ in splits), 50
+
+    candidates = list(ParameterGrid(grid))
+    n_rungs = max(0, math.ceil(math.log(len(candidates), factor))) if len(candidates) > 1 else 0
+    survivors = candidates
+    best_params, best_score, scored_amount = None, None, None
+
+    for rung in range(n_rungs + 1):
+        amount = max(min_resource, int(max_resource / factor ** (n_rungs - rung)))
+        amount = min(amount, max_resource)
+        rung_scores = []
+        for params in survivors:
+            if resource == "n_samples":
+                score = _cv_score(pipeline, params, X, y, splits, budget, n_samples=amount if amount < max_resource else None, n_jobs=n_jobs)
+            else:
+                score = _cv_score(pipeline, {**params, resource: amount}, X, y, splits, budget, n_jobs=n_jobs)
+            if score is None:
+                break
+            rung_scores.append((score, params))
+
+        if not rung_scores:
+            break
+        rung_scores.sort(key=lambda item: item[0], reverse=True)
+        logging.info(f"Successive halving rung {rung}: {resource}={amount}, {len(rung_scores)} candidates, best R2 {rung_scores[0][0]:.4f}")
+        best_score, best_params = rung_scores[0]
+        scored_amount = amount
+        if len(rung_scores) < len(survivors) or len(rung_scores) == 1:
+            break
+        survivors = [params for _, params in rung_scores[:max(1, math.ceil(len(rung_scores) / factor))]]
+
+    if best_params is None:
+        best_params = {**candidates[0], resource: max_resource} if resource == "model__n_estimators" else candidates[0]
+        return _unscored(best_params)
+    if resource == "model__n_estimators":
+        best_params = {**best_params, resource: max_resource}
+    if scored_amount != max_resource:
+        # a full-resource score is comparable with the other tuned models, if the budget allows
+        full_score = _cv_score(pipeline, best_params, X, y, splits, budget, n_jobs=n_jobs)
+        if full_score is None:
+            logging.warning(f"Search budget exhausted before the full-resource score of {best_params}, "
+                            f"returning its R2 on {resource}={scored_amount}: {best_score:.4f}")
+        else:
+            best_score = full_score
+
+    return best_params, best_score
+
+
+def _encode_candidates(candidates, param_grid) -> np.ndarray:
+    """
+    Candidates as rows of a [0, 1]-scaled matrix for the surrogate: numeric parameters
+    as values (log scale when they span a decade or more), others one-hot.
+    """
+    columns = []
+    for key, values in param_grid.items():
+        values = list(values)
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+        if numeric:
+            column = np.array([params[key] for params in candidates], dtype=np.float64)
+            if min(values) > 0 and max(values) / min(values) >= 10:
+                column = np.log10(column)
+            span = column.max() - column.min()
+            columns.append(((column - column.min()) / span if span else column * 0)[:, None])
+        else:
+            columns.append(np.array([[params[key] == v for v in values] for params in candidates], dtype=np.float64))
+    return np.hstack(columns) if columns else np.zeros((len(candidates), 1))
+
+
+def bayesian_search(pipeline, param_grid, X, y, cv, budget, n_initial=5, random_state=42, n_jobs=-1):
+    """
+    Sequential model-based optimisation over the grid points: after n_initial random
+    candidates, a Gaussian process fitted on the scores so far picks the untried candidate
+    with the highest expected improvement, until the budget or the grid runs out.
+    """
+    from scipy.stats import norm
+    from sklearn.gaussian_process import GaussianProcessRegressor
+    from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+
+    splits = list(cv.split(X, y))
+    candidates = list(ParameterGrid(param_grid))
+    encoded = _encode_candidates(candidates, param_grid)
+    rng = np.random.default_rng(random_state)
+    tried, scores = [], []
+
+    while len(tried) < len(candidates):
+        untried = [i for i in range(len(candidates)) if i not in tried]
+        if len(tried) < n_initial:
+            pick = int(rng.choice(untried))
+        else:
+            gp = GaussianProcessRegressor(kernel=Matern(nu=2.5) + WhiteKernel(), normalize_y=True, random_state=random_state)
+            gp.fit(encoded[tried], scores)
+            mean, std = gp.predict(encoded[untried], return_std=True)
+            std = np.maximum(std, 1e-9)
+            z = (mean - max(scores)) / std
+            expected_improvement = (mean - max(scores)) * norm.cdf(z) + std * norm.pdf(z)
+            pick = untried[int(np.argmax(expected_improvement))]
+
+        score = _cv_score(pipeline, candidates[pick], X, y, splits, budget, n_jobs=n_jobs)
+        if score is None:
+            break
+        tried.append(pick)
+        scores.append(score)
+
+    if not tried:
+        return _unscored(candidates[0])
+
+    best = int(np.argmax(scores))
+    logging.info(f"Bayesian search tried {len(tried)}/{len(candidates)} candidates, best R2 {scores[best]:.4f}")
+    return candidates[tried[best]], scores[best]
+
+
+def _can_grow(model) -> bool:
+    # sklearn ensembles grow with warm_start, xgboost boosters continue from their booster
+    return "warm_start" in model.get_params() or hasattr(model, "get_booster")
+
+
+def _grow_and_score(model, n_estimators, X_train, y_train, X_val, y_val):
+    """
+    Grows a fold's model to n_estimators trees / rounds (fitting it first when new) and
+    scores it on the validation fold. Returns (grown model, R2); the model is the same
+    as one fitted from scratch with n_estimators.
+    """
+    if hasattr(model, "get_booster"):
+        fitted_rounds = model.get_booster().num_boosted_rounds() if hasattr(model, "_Booster") else 0
+        if fitted_rounds:
+            model = clone(model).set_params(n_estimators=n_estimators - fitted_rounds).fit(
+                X_train, y_train, xgb_model=model.get_booster()
+            )
+        else:
+            model = model.set_params(n_estimators=n_estimators).fit(X_train, y_train)
+    else:
+        model = model.set_params(n_estimators=n_estimators).fit(X_train, y_train)
+    return model, r2_score(y_val, model.predict(X_val))
+
+
+def exhaustive_search(pipeline, param_grid, X, y, cv, budget, n_jobs=-1):
+    """
+    Every grid point in ParameterGrid order, scored fold by fold: the same winner and
+    score as GridSearchCV (first best on ties), but fold fits can come from the fit cache.
+    """
+    splits = list(cv.split(X, y))
+    best_params, best_score = None, -float("inf")
+    for params in ParameterGrid(param_grid):
+        score = _cv_score(pipeline, params, X, y, splits, budget, n_jobs=n_jobs)
+        if score is None:
+            break
+        if score > best_score:
+            best_params, best_score = params, score
+
+    if best_params is None:
+        return _unscored(list(ParameterGrid(param_grid))[0])
+    return best_params, best_score
+
+
+def incremental_search(pipeline, param_grid, X, y, cv, budget, n_jobs=-1, patience=None):
+    """
+    Exhaustive search where model__n_estimators is grown instead of refitted: for every
+    other grid point, each fold's model is grown through the n_estimators values in
+    increasing order (warm start / booster continuation) and scored on its validation
+    fold at every size, so the whole axis costs about one fit per fold. The preprocessor
+    is fitted once per fold. With patience, growing stops once the mean validation R2
+    hasn't improved for that many sizes. Grown models are not fit-cached.
+    Grids without n_estimators, models that can't grow and preprocessor parameters are
+    searched point by point (exhaustive_search).
+    """
+    grid = dict(param_grid)
+    model = pipeline.named_steps["model"]
+    if "model__n_estimators" not in grid or not _can_grow(model) or any(not key.startswith("model__") for key in grid):
+        return exhaustive_search(pipeline, param_grid, X, y, cv, budget, n_jobs)
+
+    sizes = sorted(grid.pop("model__n_estimators"))
+    best_params, best_score = None, -float("inf")
+    folds = FoldCache(X, y, cv).folds(pipeline.named_steps["preprocessor"])
+    warm = {"warm_start": True} if "warm_start" in model.get_params() else {}
+
+    for params in ParameterGrid(grid):
+        model_params = {key[len("model__"):]: value for key, value in params.items()}
+        fold_models = [clone(model).set_params(**model_params, **warm) for _ in folds]
+        candidate_best, stale = -float("inf"), 0
+
+        for n_estimators in sizes:
+            if not budget.allows(len(folds)):
+                break
+            budget.spend(len(folds))
+            start = time.perf_counter()
+            # threads, so the growing models stay in this process between sizes
+            grown = Parallel(n_jobs=n_jobs, prefer="threads")(
+                delayed(_grow_and_score)(fold_model, n_estimators, X_train, y_train, X_val, y.iloc[val_idx])
+                for fold_model, (X_train, y_train, X_val, val_idx) in zip(fold_models, folds)
+            )
+            budget.record(len(folds), time.perf_counter() - start)
+            fold_models = [fold_model for fold_model, _ in grown]
+            score = float(np.mean([fold_score for _, fold_score in grown]))
+            logging.info(f"Incremental search {params} n_estimators={n_estimators}: R2 {score:.4f}")
+
+            if score > best_score:
+                best_params, best_score = {**params, "model__n_estimators": n_estimators}, score
+            if score > candidate_best:
+                candidate_best, stale = score, 0
+            else:
+                stale += 1
+                if patience and stale >= patience:
+                    logging.info(f"Incremental search {params}: stopped growing at n_estimators={n_estimators}")
+                    break
+
+    if best_params is None:
+        return _unscored({**list(ParameterGrid(grid))[0], "model__n_estimators": sizes[0]})
+
+    return best_params, best_score
+
+
+SEARCH_STRATEGIES = {
+    "halving": successive_halving_search,
+    "bayes": bayesian_search,
+    "incremental": incremental_search,
+}
+
+
+def hyperparameter_tuning(preprocessor, model, param_grid, X, y, strategy="grid", max_fits=None, max_seconds=None, n_jobs=-1,
+                          patience=None):
+    """
+    Run hyperparameter tuning for a single model + preprocessor.
+    Returns (best_params, best_estimator, best_score).
+
+    strategy: "grid" (exhaustive GridSearchCV), "halving" (successive halving over
+    n_estimators / training rows), "bayes" (Gaussian-process guided search) or
+    "incremental" (exhaustive, growing n_estimators by warm start; patience stops
+    growing once the validation R2 stalls).
+    max_fits / max_seconds bound the cross-validation fold fits of the halving, bayes and
+    incremental searches. max_fits is never exceeded. max_seconds is a soft limit (see
+    SearchBudget) and can be overrun by about one candidate. A search cut short returns its best
+    partial result with a warning (a reduced-resource score for halving, an unscored
+    first candidate with score -inf if nothing could be scored). The final refit of the
+    winner on all rows is not counted. The grid search always runs every point, through
+    GridSearchCV unless the fit cache is on.
+    n_jobs: parallel fold fits (all cores by default).
+    """
     try:
-        """
-        Run hyperparameter tuning for a single model + preprocessor.
-        Returns (best_params, best_estimator, best_score).
-        """
         pipeline = Pipeline(steps=[("preprocessor", preprocessor),
                                 ("model", model)])
         cv = KFold(n_splits=5, random_state=42, shuffle=True)
 
+        if strategy != "grid" or fit_cache.enabled:
+            # with the fit cache on, the grid is searched fold by fold (exhaustive_search)
+            # so unchanged fold fits are reused
+            search = SEARCH_STRATEGIES.get(strategy, exhaustive_search)
+            budget = SearchBudget(max_fits, max_seconds) if strategy != "grid" else SearchBudget()
+            options = {"patience": patience} if strategy == "incremental" else {}
+            best_params, best_score = search(pipeline, param_grid, X, y, cv, budget, n_jobs=n_jobs, **options)
+            best_estimator = clone(pipeline).set_params(**best_params).fit(X, y)
+            logging.info(f"{strategy} search used {budget.stats()}")
+            fit_cache.log_stats(f"tuning {type(model).__name__}")
+            return best_params, best_estimator, best_score
+
         scoring = {
             'r2': 'r2',
             'mae': make_scorer(mean_absolute_error, greater_is_better=False)
@@ -35,12 +380,57 @@ def hyperparameter_tuning(preprocessor, model, param_grid, X, y):
             cv=cv,
             scoring=scoring,
             refit='r2',
-            n_jobs=-1
+            n_jobs=n_jobs
         )
 
         grid.fit(X, y)
 
         return grid.best_params_, grid.best_estimator_, grid.best_score_
-    
+
     except Exception as e:
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
+
+
+def _uses_threads(model) -> bool:
+    return "n_jobs" in model.get_params() and not isinstance(model, LinearRegression)
+
+
+def fold_parallelism(param_grid, strategy="grid", n_folds=5) -> int:
+    """
+    Fold fits a search runs side by side: every grid point x fold at once through
+    GridSearchCV, one candidate's folds at a time for the other searches.
+    """
+    if strategy == "grid" and not fit_cache.enabled:
+        return n_folds * max(1, len(ParameterGrid(param_grid)))
+    return n_folds
+
+
+def candidate_max_cores(model, param_grid, strategy="grid") -> int:
+    """
+    Cores a tune_candidate job can keep busy (its CoreScheduler max_cores): the parallel
+    fold fits, plus estimator threads for models with n_jobs.
+    """
+    if _uses_threads(model):
+        return 5 * max(1, len(ParameterGrid(param_grid)))
+    return fold_parallelism(param_grid, strategy)
+
+
+def tune_candidate(preprocessor, model, param_grid, X, y, strategy="grid", max_fits=None, max_seconds=None, patience=None,
+                   n_cores=None):
+    """
+    hyperparameter_tuning on at most n_cores, as a CoreScheduler job: parallel fold fits
+    first, spare cores as estimator threads for models with n_jobs.
+    """
+    from src.utils.scheduler import split_cores
+
+    threaded = _uses_threads(model)
+    fold_jobs, threads = split_cores(n_cores or os.cpu_count() or 1, fold_parallelism(param_grid, strategy), threaded)
+    if not threaded:
+        return hyperparameter_tuning(preprocessor, model, param_grid, X, y, strategy, max_fits, max_seconds, fold_jobs, patience)
+
+    best_params, best_estimator, best_score = hyperparameter_tuning(
+        preprocessor, clone(model).set_params(n_jobs=threads), param_grid, X, y, strategy, max_fits, max_seconds, fold_jobs, patience
+    )
+    # the saved pipeline keeps the model's own n_jobs, the allocation only applies while tuning
+    best_estimator.set_params(model__n_jobs=model.get_params()["n_jobs"])
+    return best_params, best_estimator, best_score
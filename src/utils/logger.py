@@ -4,11 +4,21 @@ import os
 
 LOG_FILE = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
 logs_path = os.path.join(os.getcwd(), 'logs', LOG_FILE)
-os.makedirs(logs_path, exist_ok=True)
 LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
 
+
+class LazyDirFileHandler(logging.FileHandler):
+    """
+    FileHandler that creates the log directory on the first record instead of at import,
+    so importing src (e.g. in a serving worker) doesn't touch the filesystem.
+    """
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 logging.basicConfig(
-    filename=LOG_FILE_PATH, 
+    handlers=[LazyDirFileHandler(LOG_FILE_PATH, delay=True)],
     format='[%(asctime)s] %(lineno)d %(levelname)s - %(message)s',
     level=logging.INFO
 )
@@ -0,0 +1,197 @@
+import os
+import glob
+import json
+import bisect
+import threading
+from time import perf_counter
+
+# latency buckets (seconds) shared by every stage histogram: 10us .. 5s
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        # one slot per bucket plus +Inf; cumulative counts are only built on export
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """
+    In-process latency histograms per serving stage plus plain counters,
+    exported in Prometheus text format.
+
+    Each worker process records its own. With several gunicorn workers, set
+    PROMETHEUS_MULTIPROC_DIR: every worker then writes a snapshot of its numbers to
+    that directory (every METRICS_FLUSH_SECONDS and at scrape time) and /metrics
+    sums the snapshots of all workers, whichever worker answers the scrape. Without
+    it, each scrape only sees the worker that served it, so run one worker per
+    scrape target.
+
+    observe() is a bisect over ~20 floats and three increments under a lock,
+    about a microsecond; with METRICS_ENABLED=0 it returns immediately.
+    """
+
+    def __init__(self, enabled=True, multiproc_dir=None):
+        self.enabled = enabled
+        self.multiproc_dir = multiproc_dir
+        self._histograms = {}
+        self._counters = {}
+        # callables returning {counter name: value} read from other components (e.g. the prediction cache)
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def observe(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def since(self, stage, start):
+        """
+        Records perf_counter() - start for `stage` and returns the new perf_counter(),
+        so consecutive stages can be chained without extra clock reads.
+        """
+        now = perf_counter()
+        self.observe(stage, now - start)
+        return now
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """
+        This process's numbers as plain JSON-serialisable data.
+        """
+        with self._lock:
+            histograms = {stage: {"counts": list(h.counts), "sum": h.sum, "count": h.count} for stage, h in self._histograms.items()}
+            counters = [[name, [list(label) for label in labels], value] for (name, labels), value in self._counters.items()]
+        extra = {}
+        for collector in self._collectors:
+            extra.update(collector())
+        return {"histograms": histograms, "counters": counters, "extra": extra}
+
+    def flush(self):
+        """
+        Writes this process's snapshot to multiproc_dir (atomically, one file per pid).
+        """
+        if not self.multiproc_dir:
+            return
+        os.makedirs(self.multiproc_dir, exist_ok=True)
+        path = os.path.join(self.multiproc_dir, f"metrics_{os.getpid()}.json")
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(f"{path}.tmp", path)
+
+    def start_flushing(self, interval_seconds=1.0):
+        """
+        Flushes periodically from a daemon thread; called per worker after fork.
+        """
+        if not self.multiproc_dir or self._flusher_pid == os.getpid():
+            return
+        self._flusher_pid = os.getpid()
+        stop = threading.Event()
+
+        def _flush_loop():
+            while not stop.wait(interval_seconds):
+                self.flush()
+
+        threading.Thread(target=_flush_loop, name="metrics-flusher", daemon=True).start()
+
+    def clear_multiproc_dir(self):
+        """
+        Removes the snapshots of a previous server run; called once in the master before forking.
+        """
+        if self.multiproc_dir:
+            for path in glob.glob(os.path.join(self.multiproc_dir, "metrics_*.json")):
+                os.remove(path)
+
+    def collect(self) -> dict:
+        """
+        This process's snapshot, or the sum over every worker's snapshot in multiproc mode
+        (workers that exited keep their last counts, as counters should).
+        """
+        if not self.multiproc_dir:
+            return self.snapshot()
+
+        self.flush()
+        merged = {"histograms": {}, "counters": {}, "extra": {}}
+        for path in glob.glob(os.path.join(self.multiproc_dir, "metrics_*.json")):
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for stage, h in snapshot["histograms"].items():
+                total = merged["histograms"].setdefault(stage, {"counts": [0] * len(h["counts"]), "sum": 0.0, "count": 0})
+                total["counts"] = [a + b for a, b in zip(total["counts"], h["counts"])]
+                total["sum"] += h["sum"]
+                total["count"] += h["count"]
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(tuple(label) for label in labels))
+                merged["counters"][key] = merged["counters"].get(key, 0) + value
+            for name, value in snapshot["extra"].items():
+                merged["extra"][name] = merged["extra"].get(name, 0) + value
+        merged["counters"] = [[name, labels, value] for (name, labels), value in merged["counters"].items()]
+        return merged
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition of every histogram, counter and collector value.
+        """
+        lines = [
+            "# HELP predict_stage_latency_seconds Latency of each /predict serving stage.",
+            "# TYPE predict_stage_latency_seconds histogram"
+        ]
+        collected = self.collect()
+        counters = {(name, tuple(tuple(label) for label in labels)): value for name, labels, value in collected["counters"]}
+
+        for stage, h in sorted(collected["histograms"].items()):
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + (float("inf"),), h["counts"]):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'predict_stage_latency_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'predict_stage_latency_seconds_sum{{stage="{stage}"}} {h["sum"]}')
+            lines.append(f'predict_stage_latency_seconds_count{{stage="{stage}"}} {h["count"]}')
+
+        seen = set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            lines.append(f"{name}{{{label_str}}} {value}" if label_str else f"{name} {value}")
+
+        for name, value in sorted(collected["extra"].items()):
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(
+    enabled=os.environ.get("METRICS_ENABLED", "1") != "0",
+    multiproc_dir=os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+)
@@ -1,46 +1,216 @@
 from src.utils.exception import CustomException
-import pandas as pd
+from src.utils.logger import logging
+from src.utils.scheduler import CoreScheduler, Job, split_cores
+from src.utils.fit_cache import fit_cache
+import os
 import sys
-from sklearn.model_selection import cross_val_predict, KFold
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, hash as joblib_hash
+from sklearn.base import clone
+from sklearn.model_selection import KFold
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor,GradientBoostingRegressor
 from sklearn.svm import SVR
-from xgboost import XGBRegressor
 from sklearn.metrics import r2_score,mean_absolute_error
-from sklearn.pipeline import Pipeline
 
 
+def default_cv():
+    return KFold(n_splits=5, shuffle=True, random_state=42)
+
+
+def default_models():
+    # imported lazily, xgboost is only needed when models are actually evaluated
+    from xgboost import XGBRegressor
+
+    return {
+        "linear_regression" : LinearRegression(),
+        "random_forest" : RandomForestRegressor(),
+        "gradient_boosting" : GradientBoostingRegressor(),
+        "svr" : SVR(),
+        "xgboost" : XGBRegressor()
+        }
+
+
+# (relative cost, estimator uses threads via n_jobs) per candidate, for the core scheduler
+MODEL_PROFILES = {
+    "linear_regression": (0.05, False),
+    "random_forest": (3.0, True),
+    "gradient_boosting": (2.0, False),
+    "svr": (1.0, False),
+    "xgboost": (1.0, True),
+}
+
+
+class FoldCache:
+    """
+    Fits each (preprocessor, fold) pair once and keeps the transformed train / validation
+    matrices, so every candidate model is scored on them without refitting the
+    preprocessor. Preprocessors are keyed by their (unfitted) parameters.
+    """
+
+    def __init__(self, X, y, cv=None):
+        self.X = X
+        self.y = y
+        self.splits = list((cv or default_cv()).split(X, y))
+        self._folds = {}
+        self.fits = 0
+        self.hits = 0
+        self.preprocessing_seconds = 0.0
+
+    def folds(self, preprocessor) -> list:
+        """
+        [(X_train_transformed, y_train, X_val_transformed, val_idx)] per fold.
+        """
+        key = joblib_hash(preprocessor)
+        if key in self._folds:
+            self.hits += 1
+            return self._folds[key]
+
+        start = time.perf_counter()
+        folds = []
+        for train_idx, val_idx in self.splits:
+            # same calls as Pipeline.fit / predict inside cross_val_predict
+            fold_preprocessor = clone(preprocessor)
+            X_train = fold_preprocessor.fit_transform(self.X.iloc[train_idx], self.y.iloc[train_idx])
+            X_val = fold_preprocessor.transform(self.X.iloc[val_idx])
+            folds.append((X_train, self.y.iloc[train_idx], X_val, val_idx))
+            self.fits += 1
+
+        self.preprocessing_seconds += time.perf_counter() - start
+        self._folds[key] = folds
+        return folds
+
+    def stats(self) -> dict:
+        return {"preprocessor_fits": self.fits, "cache_hits": self.hits,
+                "preprocessing_seconds": round(self.preprocessing_seconds, 3)}
+
+    def fit_keys(self, preprocessor, model) -> list:
+        """
+        fit_cache key of (preprocessor, model) for every fold.
+        """
+        data_key = fit_cache.data_key(self.X, self.y)
+        return [fit_cache.key(data_key, train_idx, val_idx, preprocessor, model) for train_idx, val_idx in self.splits]
+
+
+def _fit_predict(model, X_train, y_train, X_val):
+    fitted = clone(model).fit(X_train, y_train)
+    return fitted.predict(X_val), fitted
+
+
+def fit_folds(model, folds, threaded=False, n_cores=None) -> list:
+    """
+    [(validation predictions, fitted model)] per cached fold, using at most n_cores:
+    folds side by side, spare cores as estimator threads when `threaded`.
+    """
+    fold_jobs, threads = split_cores(n_cores or os.cpu_count() or 1, len(folds), threaded)
+    if threaded:
+        model = clone(model).set_params(n_jobs=threads)
+
+    return Parallel(n_jobs=fold_jobs)(
+        delayed(_fit_predict)(model, X_train, y_train, X_val) for X_train, y_train, X_val, _ in folds
+    )
+
+
+def _cached_fits(fold_cache, preprocessor, model):
+    # (fit_cache keys, cached entry or None per fold, indices of the folds still to fit)
+    keys = fold_cache.fit_keys(preprocessor, model)
+    entries = [fit_cache.get(key) for key in keys]
+    return keys, entries, [i for i, entry in enumerate(entries) if entry is None]
+
+
+def _store_fits(keys, entries, missing, fitted):
+    for i, (predictions, estimator) in zip(missing, fitted):
+        entries[i] = {"predictions": predictions, "estimator": estimator}
+        fit_cache.put(keys[i], entries[i])
+
+
+def _oof_scores(entries, splits, y):
+    # (R2, MAE) of the out-of-fold predictions assembled from every fold's entry
+    y_pred = np.empty(len(y), dtype=np.float64)
+    for (_, val_idx), entry in zip(splits, entries):
+        y_pred[val_idx] = entry["predictions"]
 
-def evaluate_pipeline(preprocessor, X, y):
+    return r2_score(y, y_pred), mean_absolute_error(y, y_pred)
+
+
+def _profile(name, model):
+    return MODEL_PROFILES.get(name, (1.0, "n_jobs" in model.get_params()))
+
+
+def evaluate_pipeline(preprocessor, X, y, fold_cache: FoldCache = None, models=None):
     """
     This will return a Dataframe for the preprocessor pipepline with Columns :
     "Model", "R2", "MAE"
+
+    Out-of-fold predictions as cross_val_predict(Pipeline(preprocessor, model)) gives them,
+    but the preprocessor is fitted once per fold (held in fold_cache, which can be shared
+    between calls) instead of once per fold and model. Folds already in the on-disk
+    fit_cache are not fitted again.
     """
     try :
-        models = {
-            "linear_regression" : LinearRegression(),
-            "random_forest" : RandomForestRegressor(),
-            "gradient_boosting" : GradientBoostingRegressor(),
-            "svr" : SVR(),
-            "xgboost" : XGBRegressor()
-            }
+        models = models or default_models()
+        fold_cache = fold_cache or FoldCache(X, y)
 
         results = []
 
-        kf = KFold(n_splits=5, shuffle=True, random_state=42)
-
         for name, model in models.items():
-            pipeline = Pipeline(steps=[("preprocessor", preprocessor), ("model", model)])
+            keys, entries, missing = _cached_fits(fold_cache, preprocessor, model)
+            if missing:
+                folds = fold_cache.folds(preprocessor)
+                fitted = fit_folds(model, [folds[i] for i in missing], threaded=_profile(name, model)[1])
+                _store_fits(keys, entries, missing, fitted)
 
-            y_pred = cross_val_predict(pipeline, X, y, cv=kf, n_jobs=-1)
-
-            r2 = r2_score(y,y_pred)
-
-            mae = mean_absolute_error(y,y_pred)
+            r2, mae = _oof_scores(entries, fold_cache.splits, y)
 
             results.append((name, r2, mae))
 
+        logging.info(f"Fold cache: {fold_cache.stats()}")
+        fit_cache.log_stats("model selection")
         return pd.DataFrame(results, columns=["Model", "R2", "MAE"])
-    
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def evaluate_candidates(preprocessors: dict, X, y, fold_cache: FoldCache = None, models=None, total_cores=None):
+    """
+    Same leaderboard as evaluate_pipeline for every {encoding: preprocessor} (rows in
+    encoding, then model order, with an "Encoding" column), but all (model, encoding)
+    candidates run concurrently on a CoreScheduler sharing total_cores. Only folds missing
+    from the on-disk fit_cache are scheduled.
+    Returns (leaderboard, scheduler) so callers can report per-candidate time and utilization.
+    """
+    try:
+        models = models or default_models()
+        fold_cache = fold_cache or FoldCache(X, y)
+
+        jobs, cached = [], {}
+        for encoding, preprocessor in preprocessors.items():
+            for name, model in models.items():
+                keys, entries, missing = cached[f"{name}/{encoding}"] = _cached_fits(fold_cache, preprocessor, model)
+                if not missing:
+                    continue
+                folds = fold_cache.folds(preprocessor)
+                cost, threaded = _profile(name, model)
+                jobs.append(Job(
+                    name=f"{name}/{encoding}", fn=fit_folds, args=(model, [folds[i] for i in missing]),
+                    kwargs={"threaded": threaded},
+                    max_cores=len(missing) * ((os.cpu_count() or 1) if threaded else 1), cost=cost * len(missing)
+                ))
+
+        scheduler = CoreScheduler(total_cores)
+        fitted = scheduler.run(jobs)
+        for name, fits in fitted.items():
+            _store_fits(*cached[name], fits)
+        fit_cache.log_stats("model selection")
+
+        results = [
+            (name, *_oof_scores(cached[f"{name}/{encoding}"][1], fold_cache.splits, y), encoding)
+            for encoding in preprocessors for name in models
+        ]
+        return pd.DataFrame(results, columns=["Model", "R2", "MAE", "Encoding"]), scheduler
+
     except Exception as e:
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
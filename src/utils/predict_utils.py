@@ -1,3 +1,7 @@
+import numpy as np
+import pandas as pd
+
+
 def calculate_ppi(resolution: str, screen_size: float) -> float:
     """
     Convert resolution string and screen size to PPI.
@@ -9,4 +13,21 @@ def calculate_ppi(resolution: str, screen_size: float) -> float:
         ppi = ((width**2 + height**2)**0.5) / screen_size
         return round(ppi, 2)
     except Exception:
-        return 0  # fallback if input invalid
\ No newline at end of file
+        return 0  # fallback if input invalid
+
+
+def calculate_ppi_vectorized(resolution: pd.Series, screen_size: pd.Series) -> np.ndarray:
+    """
+    Column-wise version of calculate_ppi for a whole batch of records.
+    Invalid resolutions or screen sizes fall back to 0, same as calculate_ppi.
+    """
+    res = resolution.astype(str).str.lower().str.extract(r'^\s*(\d+)\s*x\s*(\d+)\s*$')
+    width = pd.to_numeric(res[0], errors='coerce').to_numpy(dtype=float)
+    height = pd.to_numeric(res[1], errors='coerce').to_numpy(dtype=float)
+    size = pd.to_numeric(screen_size, errors='coerce').to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ppi = np.sqrt(width**2 + height**2) / size
+
+    ppi = np.where(np.isfinite(ppi), ppi, 0)
+    return np.round(ppi, 2)
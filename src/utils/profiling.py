@@ -0,0 +1,179 @@
+import os
+import re
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from src.utils.logger import logging, logs_path
+
+
+@dataclass
+class ProfilingConfig:
+    # off by default: tracemalloc slows allocation-heavy code down noticeably
+    enabled: bool = os.environ.get("PROFILE", "0") == "1"
+    # tracemalloc peak per section
+    memory: bool = os.environ.get("PROFILE_MEMORY", "1") != "0"
+    # cProfile dump (<output_dir>/profile_<section>.pstats) per outermost section
+    cprofile: bool = os.environ.get("PROFILE_CPROFILE", "0") == "1"
+    # the run's log directory
+    output_dir: str = logs_path
+    # functions listed in the hotspot table
+    top_functions: int = 15
+
+
+class Profiler:
+    """
+    Opt-in wall time, CPU time, tracemalloc peak and cProfile dumps per named section
+    (the stages' initiate_* methods, feature selectors, ...). Sections may nest: an
+    enclosing section's memory peak includes its children's. Sections run in worker
+    processes are recorded there and handed back with submit / collect; memory
+    peaks are per process.
+    """
+
+    def __init__(self, config: ProfilingConfig = None):
+        self.config = config or ProfilingConfig()
+        self.records = []
+        self.dumps = []
+        self._frames = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._frames, "stack"):
+            self._frames.stack = []
+        return self._frames.stack
+
+    @contextmanager
+    def section(self, name):
+        if not self.config.enabled:
+            yield
+            return
+
+        stack = self._stack()
+        frame = {"name": name, "peak": 0}
+        if self.config.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if stack:
+                # the enclosing section keeps the peak it reached before this one started
+                stack[-1]["peak"] = max(stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+        # one cProfile at a time per thread, so only outermost sections get a dump; it
+        # counts CPU time, so waiting on worker processes doesn't show up as a hotspot
+        profile = cProfile.Profile(time.process_time) if self.config.cprofile and not stack else None
+        stack.append(frame)
+        wall_start, cpu_start = time.perf_counter(), _cpu_seconds()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            wall, cpu = time.perf_counter() - wall_start, _cpu_seconds() - cpu_start
+            stack.pop()
+
+            peak = 0
+            if self.config.memory:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+                else:
+                    tracemalloc.stop()
+
+            dump_path = None
+            if profile:
+                os.makedirs(self.config.output_dir, exist_ok=True)
+                file_name = re.sub(r"[^\w.-]", "_", f"profile_{name}_{os.getpid()}.pstats")
+                dump_path = os.path.join(self.config.output_dir, file_name)
+                profile.dump_stats(dump_path)
+                self.dumps.append(dump_path)
+
+            self.records.append({
+                "section": name, "parent": stack[-1]["name"] if stack else None, "depth": len(stack), "pid": os.getpid(), "seconds": wall,
+                "cpu_seconds": cpu, "peak_mb": peak / 1024 / 1024, "pstats": dump_path
+            })
+            logging.info(f"Profile {name}: {wall:.3f}s wall, {cpu:.3f}s CPU, peak {peak / 1024 / 1024:.1f} MB")
+
+    def call(self, name, fn, *args, **kwargs):
+        with self.section(name):
+            return fn(*args, **kwargs)
+
+    def submit(self, pool, name, fn, *args, **kwargs):
+        """
+        call() on an executor: the future's result, (result, worker records, worker
+        dumps), goes through collect() in the parent.
+        """
+        return pool.submit(_remote_call, self.config, name, fn, args, kwargs)
+
+    def collect(self, outcome):
+        result, records, dumps = outcome
+        # nested under whatever section is open here
+        stack = self._stack()
+        self.records.extend({
+            **record, "depth": record["depth"] + len(stack),
+            "parent": record["parent"] or (stack[-1]["name"] if stack else None)
+        } for record in records)
+        self.dumps.extend(dumps)
+        return result
+
+    def summary(self) -> list:
+        """
+        Sections ranked by wall time, with their share of the profiled run (the sum of
+        the outermost sections).
+        """
+        total = sum(record["seconds"] for record in self.records if record["depth"] == 0)
+        ranked = sorted(self.records, key=lambda record: record["seconds"], reverse=True)
+        return [{**record, "share": record["seconds"] / total if total else 0.0} for record in ranked]
+
+    def print_summary(self):
+        if not self.config.enabled or not self.records:
+            return
+        print("Profile hotspots (sections by wall time)")
+        print(f"{'section':<56}{'in':<24}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}{'share':>8}")
+        for record in self.summary():
+            print(f"{record['section']:<56}{record['parent'] or '-':<24}{record['seconds']:>10.2f}{record['cpu_seconds']:>10.2f}"
+                  f"{record['peak_mb']:>10.1f}{record['share']:>8.1%}")
+
+        dumps = [path for path in self.dumps if os.path.isfile(path)]
+        if dumps:
+            print(f"Top {self.config.top_functions} functions by own CPU time over {len(dumps)} cProfile dumps in {self.config.output_dir}")
+            pstats.Stats(*dumps).sort_stats("tottime").print_stats(self.config.top_functions)
+
+    def reset(self):
+        self.records, self.dumps = [], []
+
+
+def _cpu_seconds():
+    # the whole process (all threads) plus its finished worker processes
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _remote_call(config, name, fn, args, kwargs):
+    worker = Profiler(config)
+    result = worker.call(name, fn, *args, **kwargs)
+    return result, worker.records, worker.dumps
+
+
+profiler = Profiler()
+
+
+def profiled(name):
+    """
+    Decorator recording every call of the function as the profiler section `name`
+    (a plain call when profiling is off).
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not profiler.config.enabled:
+                return fn(*args, **kwargs)
+            with profiler.section(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (KLL). Values are kept in levels of sorted
+    compactors, an item at level h standing for 2**h input values; a level over its
+    capacity is sorted and every other item (random offset) moves up a level. Memory
+    stays around 3k values whatever the input size, with a rank error of roughly 1/k.
+    Up to about k values nothing is compacted and quantiles are exact (linear
+    interpolation, as pandas / numpy compute them).
+
+    Sketches built on separate parts of the data (chunks, files, processes) are
+    combined with merge().
+    """
+
+    def __init__(self, k=1000, seed=42):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        # the top level holds k items, each level below 2/3 of the one above
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        """
+        Adds a batch of values (NaNs are skipped).
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch"):
+        """
+        Adds everything `other` has seen; the result is a sketch of both inputs.
+        """
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with different k ({self.k} and {other.k})")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # with an odd count, the smallest or largest item stays at this level
+                if len(items) % 2:
+                    if self._rng.integers(2):
+                        kept, items = items[-1:], items[:-1]
+                    else:
+                        kept, items = items[:1], items[1:]
+                else:
+                    kept = items[:0]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self._rng.integers(2)::2]])
+            level += 1
+
+    def quantile(self, q):
+        """
+        Approximate q-quantile(s), q in [0, 1].
+        """
+        if not self.n:
+            return np.nan
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, weights = values[order], weights[order]
+
+        # each item sits at the middle of the ranks it stands for
+        ranks = np.cumsum(weights) - weights + (weights - 1) / 2
+        result = np.interp(np.asarray(q, dtype=np.float64) * (self.n - 1), ranks, values)
+        return float(result) if np.ndim(result) == 0 else result
+
+    @property
+    def retained(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(items.nbytes for items in self.levels)
@@ -0,0 +1,113 @@
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+
+from src.utils.exception import CustomException
+from src.utils.logger import logging
+
+
+@dataclass
+class Job:
+    name: str
+    # module-level function, called in a worker process as fn(*args, n_cores=k, **kwargs)
+    fn: object
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    # most cores the job can keep busy (e.g. folds x estimator threads)
+    max_cores: int = 1
+    # relative run time; heavier jobs start first and get a larger share of the cores
+    cost: float = 1.0
+
+
+def split_cores(n_cores, n_folds, threaded):
+    """
+    (fold_jobs, estimator_threads) for a job given n_cores: folds run side by side first,
+    cores left over go to estimators that can use threads (n_jobs).
+    """
+    fold_jobs = max(1, min(n_cores, n_folds))
+    estimator_threads = max(1, n_cores // fold_jobs) if threaded else 1
+    return fold_jobs, estimator_threads
+
+
+def _run_job(fn, args, kwargs, n_cores):
+    from joblib import parallel_config
+    from threadpoolctl import threadpool_limits
+
+    # inner parallelism stays inside this process (threads), within the allocated cores
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with threadpool_limits(limits=n_cores), parallel_config(backend="threading"):
+        result = fn(*args, n_cores=n_cores, **kwargs)
+    return result, time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+
+class CoreScheduler:
+    """
+    Runs independent jobs concurrently on a fixed core budget. Each job gets a core
+    allocation when it starts (heaviest first, in proportion to its cost, capped by its
+    max_cores and what is free) and must keep its inner parallelism within it, so cheap
+    jobs don't leave cores idle and heavy ones don't oversubscribe them.
+    """
+
+    def __init__(self, total_cores=None):
+        self.total_cores = total_cores or os.cpu_count() or 1
+        self.report = []
+
+    def _allocate(self, job, free, pending_cost):
+        # the free cores split over the jobs still waiting, rounded up in favour of the heavier ones
+        share = math.ceil(free * job.cost / pending_cost) if pending_cost else free
+        return max(1, min(job.max_cores, share, free))
+
+    def run(self, jobs) -> dict:
+        """
+        Returns {job name: result}; per-job wall time, CPU time, cores and utilization
+        are kept in self.report.
+        """
+        try:
+            pending = sorted(jobs, key=lambda job: job.cost, reverse=True)
+            running, results, self.report = {}, {}, []
+            free = self.total_cores
+            start = time.perf_counter()
+
+            with ProcessPoolExecutor(max_workers=self.total_cores) as pool:
+                while pending or running:
+                    while pending and free > 0:
+                        job = pending.pop(0)
+                        cores = self._allocate(job, free, job.cost + sum(j.cost for j in pending))
+                        free -= cores
+                        running[pool.submit(_run_job, job.fn, job.args, job.kwargs, cores)] = (job, cores)
+                        logging.info(f"Scheduler: started {job.name} on {cores} cores ({free} free)")
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job, cores = running.pop(future)
+                        free += cores
+                        result, wall, cpu = future.result()
+                        results[job.name] = result
+                        self.report.append({
+                            "job": job.name, "cores": cores, "seconds": round(wall, 2), "cpu_seconds": round(cpu, 2),
+                            "utilization": round(cpu / (wall * cores), 2) if wall else 0.0
+                        })
+
+            elapsed = time.perf_counter() - start
+            total_cpu = sum(entry["cpu_seconds"] for entry in self.report)
+            self.summary = {
+                "total_cores": self.total_cores,
+                "seconds": round(elapsed, 2),
+                "cpu_seconds": round(total_cpu, 2),
+                "core_utilization": round(total_cpu / (elapsed * self.total_cores), 2) if elapsed else 0.0
+            }
+            logging.info(f"Scheduler report: {self.report}, summary: {self.summary}")
+            return results
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def print_report(self):
+        print(f"{'job':<36}{'cores':>6}{'seconds':>10}{'cpu s':>10}{'util':>7}")
+        for entry in self.report:
+            print(f"{entry['job']:<36}{entry['cores']:>6}{entry['seconds']:>10.2f}{entry['cpu_seconds']:>10.2f}{entry['utilization']:>7.2f}")
+        print(f"{'total':<36}{self.summary['total_cores']:>6}{self.summary['seconds']:>10.2f}"
+              f"{self.summary['cpu_seconds']:>10.2f}{self.summary['core_utilization']:>7.2f}")
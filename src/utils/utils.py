@@ -12,4 +12,33 @@ def save_obj(file_path, obj):
         logging.info(f"Object saved successfully at {file_path}")
     
     except Exception as e:
-        raise CustomException(e, sys)
\ No newline at end of file
+        raise CustomException(e, sys)
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB (VmHWM, since the last reset_peak_rss()).
+    """
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    import resource
+    # ru_maxrss is KB on Linux, bytes on macOS, and can't be reset
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def reset_peak_rss():
+    """
+    Resets the peak RSS watermark to the current RSS (Linux only, a no-op elsewhere),
+    so peak_rss_mb() measures just the code that runs after it.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
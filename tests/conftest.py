@@ -0,0 +1,26 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.components.data_cleaning import DataCleaning
+from src.components.feature_engg import FeatureEngineering
+
+RAW_DATA_PATH = os.path.join("notebook", "data", "laptop_data.csv")
+
+
+@pytest.fixture(scope="session")
+def cleaned():
+    return DataCleaning().data_cleaning(pd.read_csv(RAW_DATA_PATH))
+
+
+@pytest.fixture(scope="session")
+def features(cleaned):
+    """
+    The real listings as the model stages see them: engineered features, lower-case
+    columns and log price.
+    """
+    df = FeatureEngineering().feature_engineering(cleaned.copy())
+    df.columns = df.columns.str.lower()
+    df["price"] = np.log(df["price"])
+    return df.drop(columns=["ips", "touch_screen", "flash"]).reset_index(drop=True)
@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+
+from src.pipeline import batch_scoring
+from src.pipeline.batch_scoring import score_chunk
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS
+
+
+@pytest.fixture(autouse=True)
+def worker_pipeline(features, monkeypatch):
+    # what _init_worker loads in every pool process
+    preprocessor = ColumnTransformer(transformers=[
+        ("cat_encode", OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1),
+         ["company", "typename", "cpu brand", "gpu_name", "os"]),
+        ("num_scale", StandardScaler(), ["ram", "ppi", "ssd", "hdd"])
+    ])
+    pipeline = Pipeline([("preprocessor", preprocessor), ("model", LinearRegression())])
+    monkeypatch.setattr(batch_scoring, "_pipeline", pipeline.fit(features[FEATURE_COLUMNS], features["price"]))
+
+
+@pytest.fixture
+def raw():
+    return pd.read_csv(os.path.join("notebook", "data", "laptop_data.csv")).drop(columns=["Unnamed: 0"]).iloc[:6]
+
+
+def test_bad_rows_are_reported_and_good_rows_scored(raw):
+    raw.loc[[1, 4], "Ram"] = "lotsGB"
+    predictions, errors = score_chunk(raw)
+
+    assert predictions["row_id"].tolist() == [0, 2, 3, 5]
+    assert (predictions["predicted_price"] > 0).all()
+    assert errors["row_id"].tolist() == [1, 4]
+
+
+def test_chunk_where_every_row_fails(raw):
+    chunk = raw.iloc[:2].copy()
+    chunk["Ram"] = "lotsGB"
+    predictions, errors = score_chunk(chunk)
+
+    assert predictions.empty
+    assert list(predictions.columns) == ["row_id", "predicted_price"]
+    assert errors["row_id"].tolist() == [0, 1]
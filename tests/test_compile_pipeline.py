@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+
+from src.pipeline.compile_pipeline import FEATURE_COLUMNS, check_parity, compile_pipeline
+from src.utils.predict_utils import calculate_ppi
+
+CAT_COLUMNS = ["company", "typename", "cpu brand", "gpu_name", "os"]
+NUM_COLUMNS = ["ram", "ppi", "ssd", "hdd"]
+
+
+def _ordinal_preprocessor():
+    return ColumnTransformer(transformers=[
+        ("cat_encode", OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1), CAT_COLUMNS),
+        ("num_scale", StandardScaler(), NUM_COLUMNS)
+    ], remainder="passthrough")
+
+
+def _target_preprocessor():
+    from category_encoders import TargetEncoder
+
+    return ColumnTransformer(transformers=[
+        ("cat_encode", TargetEncoder(), CAT_COLUMNS),
+        ("num_scale", StandardScaler(), NUM_COLUMNS)
+    ], remainder="passthrough")
+
+
+@pytest.fixture(scope="module")
+def split(features):
+    X = features[FEATURE_COLUMNS]
+    return train_test_split(X, features["price"], test_size=0.2, random_state=42)
+
+
+def _with_unknown_categories(X):
+    # every categorical column gets a value the encoders never saw, a few rows each
+    X = X.copy()
+    for i, column in enumerate(CAT_COLUMNS):
+        X.iloc[i * 3:(i + 1) * 3, X.columns.get_loc(column)] = f"unseen {column}"
+    return X
+
+
+@pytest.mark.parametrize("make_preprocessor", [_ordinal_preprocessor, _target_preprocessor])
+@pytest.mark.parametrize("model", [LinearRegression(), RandomForestRegressor(n_estimators=20, random_state=42)])
+def test_compiled_matches_sklearn_on_held_out_rows(split, make_preprocessor, model):
+    X_train, X_test, y_train, _ = split
+    pipeline = Pipeline([("preprocessor", make_preprocessor()), ("model", model)]).fit(X_train, y_train)
+    compiled = compile_pipeline(pipeline)
+
+    assert check_parity(compiled, pipeline, X_test) <= 1e-9
+    assert check_parity(compiled, pipeline, _with_unknown_categories(X_test)) <= 1e-9
+
+
+def test_compiled_single_form_matches_sklearn(split):
+    X_train, X_test, y_train, _ = split
+    pipeline = Pipeline([("preprocessor", _ordinal_preprocessor()), ("model", LinearRegression())]).fit(X_train, y_train)
+    compiled = compile_pipeline(pipeline)
+
+    row = X_test.iloc[0]
+    form = {
+        "company": row["company"], "typename": row["typename"], "ram": row["ram"], "resolution": "1920x1080",
+        "screen_size": 15.6, "cpu_brand": row["cpu brand"], "ssd": row["ssd"], "hdd": row["hdd"],
+        "gpu_name": row["gpu_name"], "os": row["os"]
+    }
+    expected_row = X_test.iloc[[0]].copy()
+    expected_row["ppi"] = calculate_ppi("1920x1080", 15.6)
+    assert np.isclose(compiled.predict_form(form), pipeline.predict(expected_row)[0], rtol=0, atol=1e-9)
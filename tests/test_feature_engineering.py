@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.benchmark.feature_engineering import check_equivalence, reference_feature_engineering, synthetic_frame
+from src.components.feature_engg import FeatureEngineering
+
+
+def _edge_rows(cleaned):
+    """
+    Real rows with the raw strings swapped for formats the real data rarely or never has.
+    """
+    edge = pd.DataFrame([
+        ("IPS Panel Retina Display 2560x1600", "1.5TB SSD", "Intel Core i7 8550U 1.8GHz", "Nvidia GeForce GTX 1050", "Windows 10"),
+        ("Touchscreen 3,200x1800", "2TB SSD +  1.0TB Hybrid", "AMD Ryzen 1700 3GHz", "AMD Radeon RX 580", "Linux"),
+        ("IPS Panel Full HD / Touchscreen 1920x1080", "256GB SSD +  512GB SSD +  2TB HDD", "Intel Core M m3 1.2GHz", "Intel HD Graphics 615", "Windows 10 S"),
+        ("1366x768", "32GB Flash Storage", "Intel Celeron Dual Core N3350 1.1GHz", "Intel HD Graphics 500", "Chrome OS"),
+        ("1440x900", "1.0TB HDD +  1TB HDD", "Samsung Cortex A72&A53 2.0GHz", "ARM Mali T860 MP4", "Chrome OS"),
+        ("Full HD 1920x1080", "128GB Flash Storage +  1TB HDD", "Intel Core i3 6006U 2GHz", "Nvidia GeForce 930MX", "Mac OS X"),
+        ("4K Ultra HD 3840x2160", "512GB SSD", "Intel Core i5 7200U 2.5GHz", "Intel HD Graphics 620", "macOS"),
+        ("1600x900", "?", "Intel Pentium Quad Core N4200 1.1GHz", "Intel HD Graphics 505", "No OS"),
+    ], columns=["ScreenResolution", "Memory", "Cpu", "Gpu", "OpSys"])
+    rows = cleaned.iloc[:len(edge)].copy()
+    for column in edge.columns:
+        rows[column] = edge[column].to_numpy()
+    return rows
+
+
+def test_real_listings(cleaned):
+    check_equivalence(cleaned)
+
+
+def test_edge_case_rows(cleaned):
+    check_equivalence(_edge_rows(cleaned))
+
+
+def test_missing_values(cleaned):
+    rows = cleaned.iloc[:6].copy()
+    rows.loc[rows.index[[0, 3]], "Gpu"] = np.nan
+    rows.loc[rows.index[[1, 4]], "OpSys"] = np.nan
+    rows.loc[rows.index[[2, 5]], "Memory"] = np.nan
+    check_equivalence(rows)
+
+
+def test_resampled_listings(cleaned):
+    check_equivalence(synthetic_frame(cleaned, 20_000, seed=7))
+
+
+def test_arm_rows_are_dropped(cleaned):
+    rows = _edge_rows(cleaned)
+    result = FeatureEngineering().feature_engineering(rows.copy())
+    assert rows.index[4] not in result.index
+    assert len(result) == len(reference_feature_engineering(rows.copy()))
+
+
+def test_every_row_filtered(cleaned):
+    rows = cleaned.iloc[:3].copy()
+    rows["Gpu"] = "ARM Mali T860 MP4"
+    check_equivalence(rows)
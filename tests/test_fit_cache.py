@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+
+from src.utils.fit_cache import LIBRARY_VERSIONS, FitCache
+
+
+def _frame():
+    X = pd.DataFrame({"ram": [4, 8, 16, 32], "ssd": [0, 256, 512, 1024]})
+    return X, pd.Series([10.0, 10.5, 11.0, 11.5])
+
+
+def test_corrupted_entry_is_a_miss_and_removed(tmp_path):
+    cache = FitCache(cache_dir=str(tmp_path), enabled=True)
+    X, y = _frame()
+    key = cache.key(cache.data_key(X, y), np.arange(2), np.arange(2, 4), Ridge())
+    cache.put(key, {"score": 0.5})
+    assert cache.get(key) == {"score": 0.5}
+
+    with open(cache._path(key), "wb") as f:
+        f.write(b"not a pickle")
+
+    assert cache.get(key) is None
+    assert not os.path.exists(cache._path(key))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_data_key_follows_in_place_changes():
+    cache = FitCache(enabled=True)
+    X, y = _frame()
+    before = cache.data_key(X, y)
+    X.loc[0, "ram"] = 64
+    assert cache.data_key(X, y) != before
+
+
+def test_key_includes_library_versions(monkeypatch):
+    cache = FitCache(enabled=True)
+    X, y = _frame()
+    data_key = cache.data_key(X, y)
+    key = cache.key(data_key, np.arange(2), np.arange(2, 4), Ridge())
+    monkeypatch.setitem(LIBRARY_VERSIONS, "scikit-learn", "0.0")
+    assert cache.key(data_key, np.arange(2), np.arange(2, 4), Ridge()) != key
+
+
+def test_disabled_by_default():
+    assert not FitCache().enabled
@@ -0,0 +1,49 @@
+import time
+import threading
+import pandas as pd
+
+from src.pipeline.micro_batcher import MicroBatcher
+
+
+def _predict_fn(calls):
+    def predict(df):
+        calls.append(len(df))
+        return df["x"].to_numpy() * 2.0
+    return predict
+
+
+def test_lone_request_does_not_wait():
+    calls = []
+    batcher = MicroBatcher(_predict_fn(calls), max_batch_size=32, max_wait_us=2_000_000)
+    try:
+        start = time.perf_counter()
+        assert batcher.predict(pd.DataFrame({"x": [3.0]})).tolist() == [6.0]
+        assert time.perf_counter() - start < 0.5
+    finally:
+        batcher.close()
+
+
+def test_expected_callers_are_batched_together():
+    calls = []
+    batcher = MicroBatcher(_predict_fn(calls), max_batch_size=4, max_wait_us=2_000_000)
+    ready = threading.Barrier(4)
+    results = {}
+
+    def caller(i):
+        with batcher.expect():
+            ready.wait()
+            # the first request reaches the queue well before the others
+            time.sleep(0 if i == 0 else 0.05)
+            results[i] = batcher.predict(pd.DataFrame({"x": [float(i)]}))
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        batcher.close()
+
+    assert calls == [4]
+    assert {i: result.tolist() for i, result in results.items()} == {i: [2.0 * i] for i in range(4)}
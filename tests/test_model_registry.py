@@ -0,0 +1,50 @@
+import time
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig, publish_version
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS
+
+
+@pytest.fixture(scope="module")
+def pipeline(features):
+    preprocessor = ColumnTransformer(transformers=[
+        ("cat_encode", OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1),
+         ["company", "typename", "cpu brand", "gpu_name", "os"]),
+        ("num_scale", StandardScaler(), ["ram", "ppi", "ssd", "hdd"])
+    ])
+    pipeline = Pipeline([("preprocessor", preprocessor), ("model", LinearRegression())])
+    return pipeline.fit(features[FEATURE_COLUMNS], features["price"])
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_watcher_survives_a_corrupt_version(tmp_path, pipeline):
+    config = ModelRegistryConfig(pipelines_dir=str(tmp_path), model_format="pickle", load_price_table=False)
+    registry = ModelRegistry(config)
+
+    corrupt_dir = tmp_path / "20240101_000000"
+    corrupt_dir.mkdir()
+    (corrupt_dir / config.prediction_pipeline_file).write_bytes(b"half a pickle")
+
+    registry.start_watching(interval_seconds=0.05)
+    try:
+        # the watcher has tried (and failed) the corrupt version at least once
+        time.sleep(0.3)
+        assert registry.status()["active_version"] is None
+        assert registry._watcher.is_alive()
+
+        publish_version(pipeline, pipeline.named_steps["preprocessor"], config=config, version="20240102_000000")
+        assert _wait_for(lambda: registry.status()["active_version"] == "20240102_000000")
+    finally:
+        registry.stop_watching()
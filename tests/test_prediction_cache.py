@@ -0,0 +1,18 @@
+import numpy as np
+
+from src.pipeline.prediction_cache import PredictionCache, row_key
+
+
+def test_key_keeps_the_values_the_model_sees():
+    row = ("Dell", "Notebook", np.int64(8), np.float64(141.21), "Intel Core i5", 256, 0, "Intel", "Windows")
+    assert row_key(row) == ("Dell", "Notebook", 8, 141.21, "Intel Core i5", 256, 0, "Intel", "Windows")
+    assert row_key(("Dell ",) + row[1:]) != row_key(row)
+
+
+def test_padded_category_is_a_miss():
+    cache = PredictionCache(max_size=8)
+    row = ("Dell", "Notebook", 8, 141.21, "Intel Core i5", 256, 0, "Intel", "Windows")
+    cache.put(row_key(row), 11.2, "v1")
+
+    assert cache.get(row_key(row), "v1") == 11.2
+    assert cache.get(row_key(("Dell ",) + row[1:]), "v1") is None
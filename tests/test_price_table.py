@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OrdinalEncoder, StandardScaler
+
+from src.components.price_table_builder import PriceTableBuilder, split_thresholds
+from src.pipeline.compile_pipeline import FEATURE_COLUMNS, compile_pipeline
+from src.pipeline.price_table import PriceTable
+
+
+def _pipeline(model, features):
+    preprocessor = ColumnTransformer(transformers=[
+        ("cat_encode", OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1),
+         ["company", "typename", "cpu brand", "gpu_name", "os"]),
+        ("num_scale", StandardScaler(), ["ram", "ppi", "ssd", "hdd"])
+    ])
+    pipeline = Pipeline([("preprocessor", preprocessor), ("model", model)])
+    return pipeline.fit(features[FEATURE_COLUMNS], features["price"])
+
+
+def _xgboost():
+    from xgboost import XGBRegressor
+    return XGBRegressor(n_estimators=50, random_state=42)
+
+
+@pytest.mark.parametrize("make_model", [
+    lambda: GradientBoostingRegressor(n_estimators=50, random_state=42),
+    lambda: RandomForestRegressor(n_estimators=20, random_state=42),
+    _xgboost
+])
+def test_lookup_matches_the_model_at_any_ppi(features, make_model):
+    pipeline = _pipeline(make_model(), features)
+    builder = PriceTableBuilder()
+    combos = builder.combos(features)
+    price_table = PriceTable(*builder.build_table(compile_pipeline(pipeline), combos))
+
+    rng = np.random.default_rng(0)
+    rows = []
+    for _ in range(500):
+        row = dict(zip(builder.config.features, combos[rng.integers(len(combos))]))
+        # off-knot, training and far out of range screens
+        row["ppi"] = float(rng.choice([rng.uniform(50, 400), features["ppi"].iloc[rng.integers(len(features))]]))
+        rows.append(row)
+
+    looked_up = np.array([price_table.lookup(row) for row in rows])
+    live = pipeline.predict(pd.DataFrame(rows)[FEATURE_COLUMNS])
+    assert np.abs(looked_up - live).max() < 1e-5
+
+
+def test_unknown_combination_falls_back(features):
+    pipeline = _pipeline(GradientBoostingRegressor(n_estimators=10, random_state=42), features)
+    builder = PriceTableBuilder()
+    price_table = PriceTable(*builder.build_table(compile_pipeline(pipeline), builder.combos(features)))
+
+    row = dict(zip(builder.config.features, builder.combos(features)[0]), ppi=141.21)
+    row["ram"] = 3
+    assert price_table.lookup(row) is None
+
+
+def test_no_table_for_models_that_are_not_trees(features):
+    compiled = compile_pipeline(_pipeline(LinearRegression(), features))
+    with pytest.raises(TypeError):
+        split_thresholds(compiled.model, 0)
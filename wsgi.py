@@ -0,0 +1,3 @@
+## slim serving entry point: gunicorn -c gunicorn.conf.py wsgi:app
+## only the prediction path is imported, none of the training components
+from app import app, start_background_threads